@@ -0,0 +1,241 @@
+"""
+So sánh kết quả benchmark với baseline, báo lỗi (exit code 1) khi một metric chậm đi quá ngưỡng
+hoặc một metric của baseline không còn trong kết quả mới (trừ khi có --allow-missing).
+
+Metric được theo dõi là mọi giá trị số trong file JSON của benchmark có tên p50_ms, p95_ms (thấp hơn là tốt),
+frames_per_s, samples_per_s (cao hơn là tốt) và peak_rss_mb, đặt tên theo đường dẫn trong file
+(vd. `stages/trainer/train_epoch/samples_per_s`). Để giảm nhiễu, baseline và kết quả mới đều có thể gộp
+từ nhiều lần chạy (lấy median); độ dao động giữa các lần chạy được cộng vào ngưỡng cho phép.
+
+Chạy từ thư mục ai_model_capstone (report của backend_capstone cũng dùng chính script này):
+    python -m benchmark.compare save --baseline benchmark/baselines/throughput.json run1.json run2.json run3.json
+    python -m benchmark.compare check --baseline benchmark/baselines/throughput.json new1.json new2.json --threshold 0.1
+    python -m benchmark.compare check --baseline ../backend_capstone/benchmark/baselines/e2e.json ../backend_capstone/benchmark/results/e2e.json
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import fnmatch
+import statistics
+
+# Tên metric -> hướng tốt
+TRACKED_METRICS = {
+    "p50_ms": "lower",
+    "p95_ms": "lower",
+    "frames_per_s": "higher",
+    "samples_per_s": "higher",
+    "peak_rss_mb": "lower",
+}
+# Key môi trường phải giống nhau thì kết quả mới so sánh được
+ENVIRONMENT_KEYS = ("platform", "cpu_count", "torch", "torch_threads")
+
+
+def flatten_metrics(report, prefix=""):
+    """Trả về {đường dẫn: giá trị} của các metric được theo dõi trong một report."""
+    metrics = {}
+    if isinstance(report, dict):
+        items = report.items()
+    elif isinstance(report, list):
+        # Phần tử có `name` (vd. từng video) được đặt tên theo name thay vì chỉ số
+        items = ((item.get("name", i) if isinstance(item, dict) else i, item) for i, item in enumerate(report))
+    else:
+        return metrics
+
+    for key, value in items:
+        path = f"{prefix}/{key}" if prefix else str(key)
+        if key in TRACKED_METRICS and isinstance(value, (int, float)) and not isinstance(value, bool):
+            metrics[path] = float(value)
+        elif isinstance(value, (dict, list)) and key != "environment":
+            metrics.update(flatten_metrics(value, path))
+    return metrics
+
+
+def load_reports(paths):
+    reports = []
+    for path in paths:
+        with open(path, "r", encoding="utf-8") as f:
+            reports.append(json.load(f))
+    return reports
+
+
+def aggregate(reports):
+    """Gộp nhiều lần chạy: median, min, max và số lần chạy của từng metric."""
+    values = {}
+    for report in reports:
+        for path, value in flatten_metrics(report).items():
+            values.setdefault(path, []).append(value)
+    return {path: {"median": statistics.median(v), "min": min(v), "max": max(v), "runs": len(v)}
+            for path, v in sorted(values.items())}
+
+
+def relative_spread(stats):
+    """Độ dao động (max - min) / median giữa các lần chạy, 0 khi chỉ có một lần."""
+    return (stats["max"] - stats["min"]) / stats["median"] if stats["median"] else 0.0
+
+
+def metric_direction(path):
+    return TRACKED_METRICS[path.rsplit("/", 1)[-1]]
+
+
+def metric_threshold(path, default, overrides):
+    """Ngưỡng của metric: pattern cuối cùng khớp với đường dẫn (fnmatch) trong `overrides`, ngược lại `default`."""
+    threshold = default
+    for pattern, value in overrides.items():
+        if fnmatch.fnmatch(path, pattern):
+            threshold = value
+    return threshold
+
+
+def min_abs_delta(path, min_abs_ms, min_abs_mb):
+    """Chênh lệch tuyệt đối nhỏ hơn mức này được coi là nhiễu (phần trăm lớn trên latency rất nhỏ)."""
+    if path.endswith("_ms"):
+        return min_abs_ms
+    if path.endswith("_mb"):
+        return min_abs_mb
+    return 0.0
+
+
+def compare(baseline, current, threshold=0.1, overrides=None, min_abs_ms=1.0, min_abs_mb=16.0):
+    """
+    So sánh metric đã gộp của kết quả mới với baseline.
+    Trả về danh sách dòng {metric, baseline, current, change, limit, status} với status là
+    "ok", "improved", "REGRESSION", "new" (không có trong baseline) hoặc "missing" (không có trong kết quả mới).
+    """
+    rows = []
+    for path in sorted(set(baseline) | set(current)):
+        base, cur = baseline.get(path), current.get(path)
+        row = {"metric": path, "baseline": base and base["median"], "current": cur and cur["median"],
+               "change": None, "limit": None}
+        if base is None or cur is None:
+            rows.append(row | {"status": "new" if base is None else "missing"})
+            continue
+
+        # Ngưỡng được nới thêm bằng độ dao động đo được giữa các lần chạy
+        limit = metric_threshold(path, threshold, overrides or {}) + relative_spread(base) + relative_spread(cur)
+        delta = cur["median"] - base["median"]
+        change = delta / base["median"] if base["median"] else 0.0
+        # Quy về "dương là chậm đi / tệ hơn" cho cả hai hướng
+        worse = change if metric_direction(path) == "lower" else -change
+
+        if worse > limit and abs(delta) > min_abs_delta(path, min_abs_ms, min_abs_mb):
+            status = "REGRESSION"
+        elif -worse > limit:
+            status = "improved"
+        else:
+            status = "ok"
+        rows.append(row | {"change": change, "limit": limit, "status": status})
+    return rows
+
+
+def format_table(rows, show_all=False):
+    """Bảng so sánh dạng text; mặc định ẩn các dòng "ok"."""
+    def fmt(value, percent=False):
+        if value is None:
+            return "-"
+        return f"{value:+.1%}" if percent else f"{value:.3f}"
+
+    shown = [row for row in rows if show_all or row["status"] != "ok"]
+    header = ("Metric", "Baseline", "Current", "Change", "Limit", "Status")
+    lines = [(row["metric"], fmt(row["baseline"]), fmt(row["current"]), fmt(row["change"], True),
+              "-" if row["limit"] is None else f"±{row['limit']:.1%}", row["status"]) for row in shown]
+    widths = [max(len(str(line[i])) for line in [header] + lines) for i in range(len(header))]
+
+    def render(line):
+        return "  ".join(str(cell).ljust(w) if i == 0 else str(cell).rjust(w) for i, (cell, w) in enumerate(zip(line, widths)))
+
+    out = [render(header), "  ".join("-" * w for w in widths)] + [render(line) for line in lines] if shown else []
+    hidden = len(rows) - len(shown)
+    if hidden:
+        out.append(f"({hidden} metric(s) within threshold, --all to show)")
+    return "\n".join(out)
+
+
+def environment_warnings(baseline_env, reports):
+    warnings = []
+    for report in reports:
+        env = report.get("environment") or {}
+        for key in ENVIRONMENT_KEYS:
+            if key in env and key in (baseline_env or {}) and env[key] != baseline_env[key]:
+                warnings.append(f"{key}: baseline {baseline_env[key]!r}, current {env[key]!r}")
+    return sorted(set(warnings))
+
+
+def parse_overrides(values):
+    overrides = {}
+    for value in values or []:
+        pattern, _, threshold = value.rpartition("=")
+        if not pattern:
+            raise ValueError(f"Expected <pattern>=<threshold>, got {value}")
+        overrides[pattern] = float(threshold)
+    return overrides
+
+
+def save(args):
+    reports = load_reports(args.results)
+    baseline = {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "sources": [os.path.basename(p) for p in args.results],
+        "environment": reports[0].get("environment"),
+        "thresholds": {"default": args.threshold, "overrides": parse_overrides(args.metric_threshold)},
+        "metrics": aggregate(reports),
+    }
+    os.makedirs(os.path.dirname(os.path.abspath(args.baseline)), exist_ok=True)
+    with open(args.baseline, "w", encoding="utf-8") as f:
+        json.dump(baseline, f, indent=4)
+    print(f"[+] Baseline with {len(baseline['metrics'])} metric(s) from {len(reports)} run(s) saved to {args.baseline}")
+    return 0
+
+
+def check(args):
+    with open(args.baseline, "r", encoding="utf-8") as f:
+        baseline = json.load(f)
+    reports = load_reports(args.results)
+
+    # Ngưỡng lưu trong baseline, ghi đè bằng tham số dòng lệnh
+    thresholds = baseline.get("thresholds") or {}
+    threshold = args.threshold if args.threshold is not None else thresholds.get("default", 0.1)
+    overrides = (thresholds.get("overrides") or {}) | parse_overrides(args.metric_threshold)
+
+    rows = compare(baseline["metrics"], aggregate(reports), threshold, overrides, args.min_abs_ms, args.min_abs_mb)
+    for warning in environment_warnings(baseline.get("environment"), reports):
+        print(f"[!] Environment differs from baseline: {warning}")
+    print(format_table(rows, args.all))
+
+    regressions = [row for row in rows if row["status"] == "REGRESSION"]
+    # Metric của baseline không còn trong kết quả (stage lỗi hoặc đổi tên) cũng làm gate thất bại
+    missing = [row for row in rows if row["status"] == "missing"]
+    if regressions:
+        print(f"[-] {len(regressions)} metric(s) regressed past the threshold")
+    if missing and not args.allow_missing:
+        print(f"[-] {len(missing)} baseline metric(s) missing from the results (--allow-missing to accept)")
+    if regressions or (missing and not args.allow_missing):
+        return 1
+    print(f"[+] No regression ({len(rows)} metric(s), {len(reports)} run(s))")
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark regression gate")
+    sub = parser.add_subparsers(dest="command", required=True)
+    for name in ("save", "check"):
+        p = sub.add_parser(name)
+        p.add_argument("--baseline", required=True, help="File baseline (ghi khi save, đọc khi check)")
+        p.add_argument("results", nargs="+", help="File JSON của benchmark, nhiều file = nhiều lần chạy")
+        p.add_argument("--threshold", type=float, default=0.1 if name == "save" else None,
+                       help="Mức tệ đi tương đối tối đa (0.1 = 10%%)")
+        p.add_argument("--metric-threshold", action="append", default=None,
+                       help="Ngưỡng riêng <pattern>=<threshold>, vd. '*/p95_ms=0.2'")
+    check_parser = sub.choices["check"]
+    check_parser.add_argument("--min-abs-ms", type=float, default=1.0, help="Bỏ qua chênh lệch latency nhỏ hơn (ms)")
+    check_parser.add_argument("--min-abs-mb", type=float, default=16.0, help="Bỏ qua chênh lệch bộ nhớ nhỏ hơn (MB)")
+    check_parser.add_argument("--all", action="store_true", help="In cả các metric trong ngưỡng")
+    check_parser.add_argument("--allow-missing", action="store_true",
+                              help="Không coi metric có trong baseline nhưng thiếu trong kết quả là lỗi")
+    args = parser.parse_args(argv)
+    return save(args) if args.command == "save" else check(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,118 @@
+"""
+Benchmark khả năng mở rộng của train data parallel trên CPU: thời gian một epoch và throughput
+khi chạy từ 1 đến N process (strong scaling: giữ nguyên global batch, hoặc --weak: giữ batch mỗi process).
+
+Chạy từ thư mục ai_model_capstone:
+    python -m benchmark.ddp_scaling --max-procs 8 --output benchmark/ddp_scaling.json
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import torch
+import torch.nn as nn
+import torch.optim as optim
+import torch.distributed as dist
+import torch.multiprocessing as mp
+from torch.utils.data import TensorDataset
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from config import Config
+from core.model import get_model
+from core.dataset import YogaDataset
+from core.trainer import Trainer
+from core.distributed import setup, cleanup, find_free_port, make_loader
+
+
+def build_dataset(args, max_frames):
+    if args.data:
+        return YogaDataset(args.data, max_frames=max_frames)
+    generator = torch.Generator().manual_seed(0)
+    inputs = torch.randn(args.num_samples, max_frames, 33, 3, generator=generator)
+    labels = torch.randint(0, args.num_classes, (args.num_samples,), generator=generator)
+    return TensorDataset(inputs, labels)
+
+
+def worker(rank, world_size, port, args, results):
+    setup(rank, world_size, master_port=port)
+    try:
+        cf = Config(args.config)
+        max_frames = int(cf.get("data.max_frame", 100))
+        dataset = build_dataset(args, max_frames)
+        batch_size = args.batch_size if args.weak else max(1, args.batch_size // world_size)
+        loader = make_loader(dataset, batch_size, shuffle=True)
+
+        torch.manual_seed(0)
+        model = get_model(cf)
+        trainer = Trainer(model, optim.Adam(model.parameters(), lr=float(cf.get("train.lr", 1e-5))), nn.CrossEntropyLoss(),
+                          "ddp_benchmark", None, cf.get("model.model_name"), bool(cf.get("model.pretrained")),
+                          temporal_edges=bool(cf.get("model.temporal_edges")))
+        trainer.verbose = False
+
+        # Epoch warmup (khởi tạo DDP bucket, allocator) không tính giờ
+        trainer.forward(loader, "train")
+        dist.barrier()
+        start = time.perf_counter()
+        for epoch in range(args.epochs):
+            loader.sampler.set_epoch(epoch + 1)
+            trainer.forward(loader, "train")
+        dist.barrier()
+        elapsed = (time.perf_counter() - start) / args.epochs
+
+        if rank == 0:
+            results.put({"epoch_s": elapsed, "num_samples": len(dataset), "batch_size_per_proc": batch_size,
+                         "threads_per_proc": torch.get_num_threads()})
+    finally:
+        cleanup()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Data-parallel CPU scaling benchmark")
+    parser.add_argument("--config", default="config/hyperparams.yaml")
+    parser.add_argument("--max-procs", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--procs", type=int, nargs="+", default=None, help="Danh sách số process (mặc định 1, 2, 4, ... N)")
+    parser.add_argument("--data", default=None, help="Thư mục keypoints (mặc định dữ liệu ngẫu nhiên)")
+    parser.add_argument("--num-samples", type=int, default=512)
+    parser.add_argument("--num-classes", type=int, default=4)
+    parser.add_argument("--batch-size", type=int, default=32, help="Global batch (strong) hoặc batch mỗi process (--weak)")
+    parser.add_argument("--weak", action="store_true")
+    parser.add_argument("--epochs", type=int, default=2)
+    parser.add_argument("--output", default="benchmark/ddp_scaling.json")
+    args = parser.parse_args()
+
+    procs = args.procs
+    if procs is None:
+        procs = []
+        n = 1
+        while n < args.max_procs:
+            procs.append(n)
+            n *= 2
+        procs.append(args.max_procs)
+
+    ctx = mp.get_context("spawn")
+    report = {"scaling": "weak" if args.weak else "strong", "runs": []}
+    baseline = None
+    for world_size in procs:
+        print(f"[*] Benchmark {world_size} process(es)")
+        results = ctx.SimpleQueue()
+        mp.spawn(worker, args=(world_size, find_free_port(), args, results), nprocs=world_size, join=True)
+        run = results.get()
+
+        run["world_size"] = world_size
+        run["samples_per_s"] = round(run["num_samples"] / run["epoch_s"], 2)
+        baseline = baseline or run["epoch_s"]
+        run["speedup"] = round(baseline / run["epoch_s"], 3)
+        run["efficiency"] = round(run["speedup"] / world_size, 3)
+        run["epoch_s"] = round(run["epoch_s"], 4)
+        report["runs"].append(run)
+        print(f"\t=> {run}")
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=4)
+    print(f"[+] Report saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""
+Benchmark chi phí dựng đồ thị GCN mỗi bước train: cách cũ (dựng lại batch bằng `repeat_interleave`,
+edge_index chỉ nối node 0-32), builder block-diagonal khi chưa cache / đã cache, và một bước
+forward + backward của YogaGCN với từng loại đồ thị.
+
+Chạy từ thư mục ai_model_capstone:
+    python -m benchmark.graph --batch-size 32 --frames 100
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import statistics
+import torch
+import torch.nn as nn
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from core.model import YogaGCN
+from core.graph import NUM_JOINTS, get_edge_index, to_graph_inputs, _build_graph
+
+
+def _sync(device):
+    if device.type == "cuda":
+        torch.cuda.synchronize(device)
+
+
+def timeit(fn, device, warmup, iters):
+    """Median thời gian (ms) của `fn()`."""
+    times = []
+    for i in range(warmup + iters):
+        _sync(device)
+        start = time.perf_counter()
+        fn()
+        _sync(device)
+        if i >= warmup:
+            times.append((time.perf_counter() - start) * 1000)
+    return statistics.median(times)
+
+
+def legacy_graph(inputs):
+    """Cách dựng đồ thị trước đây trong Trainer.forward (chỉ frame đầu của sample đầu có cạnh)."""
+    batch_size, num_frames, num_keypoints, keypoint_dim = inputs.shape
+    x = inputs.reshape(batch_size * num_frames * num_keypoints, keypoint_dim)
+    batch = torch.arange(batch_size, device=inputs.device).repeat_interleave(num_frames * num_keypoints)
+    edge_index = get_edge_index().to(inputs.device)
+    return x, edge_index, batch
+
+
+def uncached_graph(inputs, temporal):
+    _build_graph.cache_clear()
+    return to_graph_inputs(inputs, temporal)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark GCN graph construction per step")
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--frames", type=int, default=100)
+    parser.add_argument("--hidden-dim", type=int, default=256)
+    parser.add_argument("--num-classes", type=int, default=4)
+    parser.add_argument("--warmup", type=int, default=3)
+    parser.add_argument("--iters", type=int, default=20)
+    parser.add_argument("--output", default="benchmark/graph.json")
+    args = parser.parse_args()
+
+    device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+    inputs = torch.randn(args.batch_size, args.frames, NUM_JOINTS, 3, device=device)
+    labels = torch.randint(0, args.num_classes, (args.batch_size,), device=device)
+    model = YogaGCN(in_channels=3, hidden_dim=args.hidden_dim, num_classes=args.num_classes).to(device)
+    optimizer = torch.optim.Adam(model.parameters())
+    criterion = nn.CrossEntropyLoss()
+
+    def train_step(build):
+        def step():
+            optimizer.zero_grad()
+            loss = criterion(model(*build()), labels)
+            loss.backward()
+            optimizer.step()
+        return step
+
+    graphs = {
+        "legacy": lambda: legacy_graph(inputs),
+        "block_diagonal": lambda: to_graph_inputs(inputs),
+        "block_diagonal_temporal": lambda: to_graph_inputs(inputs, temporal=True),
+    }
+
+    report = {"device": str(device), "batch_size": args.batch_size, "frames": args.frames, "graphs": {}}
+    for name, build in graphs.items():
+        _, edge_index, _ = build()
+        result = {
+            "num_edges": int(edge_index.shape[1]),
+            "build_ms": round(timeit(build, device, args.warmup, args.iters), 4),
+            "train_step_ms": round(timeit(train_step(build), device, args.warmup, args.iters), 3),
+        }
+        if name != "legacy":
+            temporal = name.endswith("temporal")
+            result["build_uncached_ms"] = round(timeit(lambda: uncached_graph(inputs, temporal), device, args.warmup, args.iters), 4)
+        report["graphs"][name] = result
+        print(f"[*] {name}: {result}")
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=4)
+    print(f"[+] Report saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+So sánh các loại model (SPOTER, FrameSPOTER, YogaGCN, ST-GCN) trên CPU: số tham số, latency inference batch 1,
+latency theo batch, thời gian một bước train và accuracy trên tập validation (khi có checkpoint).
+
+Chạy từ thư mục ai_model_capstone:
+    python -m benchmark.models --checkpoint spoter=checkpoints/spoter/finetune/a.pt stgcn=checkpoints/stgcn/finetune/b.pt
+"""
+import os
+import sys
+import json
+import argparse
+import torch
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from config import Config
+from core.model import get_model
+from benchmark.modes import build_trainer, time_train_step, time_inference, predict, output_classes, load_eval_data
+
+MODEL_NAMES = ("spoter", "frame_spoter", "gcn", "stgcn")
+
+
+def parse_checkpoints(values):
+    checkpoints = {}
+    for value in values or []:
+        name, _, path = value.partition("=")
+        if name not in MODEL_NAMES or not path:
+            raise ValueError(f"Expected <model>=<path> with model in {MODEL_NAMES}, got {value}")
+        checkpoints[name] = path
+    return checkpoints
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare SPOTER / FrameSPOTER / GCN / ST-GCN accuracy and CPU latency")
+    parser.add_argument("--config", default="config/hyperparams.yaml")
+    parser.add_argument("--models", nargs="+", default=list(MODEL_NAMES), choices=MODEL_NAMES)
+    parser.add_argument("--checkpoint", nargs="*", default=None, help="Checkpoint theo model: <model>=<path>")
+    parser.add_argument("--data", default=None, help="Thư mục keypoints validation (mặc định theo config)")
+    parser.add_argument("--batch-size", type=int, default=None)
+    parser.add_argument("--threads", type=int, default=None, help="Số CPU threads (mặc định của torch)")
+    parser.add_argument("--warmup", type=int, default=5)
+    parser.add_argument("--iters", type=int, default=30)
+    parser.add_argument("--num-samples", type=int, default=128, help="Số sample ngẫu nhiên khi không có dữ liệu")
+    parser.add_argument("--output", default="benchmark/models.json")
+    args = parser.parse_args()
+
+    if args.threads:
+        torch.set_num_threads(args.threads)
+    cpu = torch.device("cpu")
+    checkpoints = parse_checkpoints(args.checkpoint)
+
+    cf = Config(args.config)
+    max_frames = int(cf.get("data.max_frame", 100))
+    batch_size = args.batch_size or int(cf.get("data.batch_size", 32))
+    if args.data is None:
+        split = "public" if cf.get("data.is_public") else "private"
+        args.data = cf.get(f"data.json_{split}_path_val")
+    batches, labels = load_eval_data(args.data, batch_size, args.num_samples, max_frames)
+
+    report = {"device": "cpu", "threads": torch.get_num_threads(), "batch_size": batch_size,
+              "eval_data": args.data if labels is not None else "random", "models": {}}
+    for name in args.models:
+        print(f"[*] Benchmark model: {name}")
+        cf.set("model.model_name", name)
+        base_model = get_model(cf)
+        if name in checkpoints:
+            checkpoint = torch.load(checkpoints[name], map_location="cpu")
+            base_model.load_state_dict(checkpoint.get("model", checkpoint))
+
+        # Đo trên CPU kể cả khi máy có GPU
+        trainer = build_trainer(cf, base_model, "fp32", False)
+        trainer.device = cpu
+        trainer.model.to(cpu)
+
+        num_classes = output_classes(trainer, max_frames)
+        preds = predict(trainer, batches)
+        batch = batches[0]
+        result = {
+            "parameters": sum(p.numel() for p in trainer.model.parameters()),
+            "inference_ms": round(time_inference(trainer, batch[:1], args.warmup, args.iters), 3),
+            "batch_inference_ms": round(time_inference(trainer, batch, args.warmup, args.iters), 3),
+            "batch_inference_size": len(batch),
+        }
+        generator = torch.Generator().manual_seed(0)
+        train_labels = torch.randint(0, num_classes, (len(batch),), generator=generator)
+        result["train_step_ms"] = round(time_train_step(trainer, batch, train_labels, args.warmup, args.iters), 3)
+        if labels is not None and name in checkpoints:
+            result["accuracy"] = round((preds == labels).float().mean().item(), 6)
+        result["checkpoint"] = checkpoints.get(name)
+
+        report["models"][name] = result
+        print(f"\t=> {result}")
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=4)
+    print(f"[+] Report saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
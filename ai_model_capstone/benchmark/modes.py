@@ -0,0 +1,196 @@
+"""
+Benchmark các chế độ chạy model (fp32 / autocast / torch.compile) trên cùng một model:
+thời gian một bước train, latency inference batch 1 và độ lệch accuracy so với fp32.
+
+Chạy từ thư mục ai_model_capstone:
+    python -m benchmark.modes --checkpoint checkpoints/spoter/finetune/xxx.pt --output benchmark/modes.json
+"""
+import os
+import sys
+import copy
+import json
+import time
+import argparse
+import statistics
+import torch
+import torch.nn as nn
+import torch.optim as optim
+from torch.utils.data import DataLoader
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from config import Config
+from core.model import get_model
+from core.dataset import YogaDataset
+from core.trainer import Trainer
+from core.precision import autocast_context
+
+# Tên mode -> (precision, compile)
+MODES = {
+    "fp32": ("fp32", False),
+    "autocast": ("autocast", False),
+    "compile": ("fp32", True),
+    "autocast+compile": ("autocast", True),
+}
+
+
+def _sync(device):
+    if device.type == "cuda":
+        torch.cuda.synchronize(device)
+
+
+def build_trainer(cf, base_model, precision, compile):
+    """Trainer trên bản sao của `base_model` để mọi mode bắt đầu từ cùng trọng số."""
+    model = copy.deepcopy(base_model)
+    optimizer = optim.Adam(model.parameters(), lr=float(cf.get("train.lr", 1e-5)))
+    return Trainer(model, optimizer, nn.CrossEntropyLoss(), "benchmark", None, cf.get("model.model_name"),
+                   bool(cf.get("model.pretrained")), precision=precision, compile=compile,
+                   temporal_edges=bool(cf.get("model.temporal_edges")))
+
+
+def time_train_step(trainer, inputs, labels, warmup, iters):
+    """Median thời gian (ms) của một bước forward + backward + optimizer step."""
+    trainer.model.train()
+    times = []
+    for i in range(warmup + iters):
+        _sync(trainer.device)
+        start = time.perf_counter()
+
+        trainer.optimizer.zero_grad()
+        with autocast_context(trainer.device, trainer.precision):
+            outputs = trainer.model_forward(inputs)
+        loss = trainer.criteria(outputs.float(), labels)
+        trainer.scaler.scale(loss).backward()
+        trainer.scaler.step(trainer.optimizer)
+        trainer.scaler.update()
+
+        _sync(trainer.device)
+        if i >= warmup:
+            times.append((time.perf_counter() - start) * 1000)
+    return statistics.median(times)
+
+
+@torch.no_grad()
+def time_inference(trainer, sample, warmup, iters):
+    """Median latency (ms) khi dự đoán một sample (batch 1)."""
+    trainer.model.eval()
+    times = []
+    for i in range(warmup + iters):
+        _sync(trainer.device)
+        start = time.perf_counter()
+        with autocast_context(trainer.device, trainer.precision):
+            trainer.model_forward(sample)
+        _sync(trainer.device)
+        if i >= warmup:
+            times.append((time.perf_counter() - start) * 1000)
+    return statistics.median(times)
+
+
+@torch.no_grad()
+def predict(trainer, batches):
+    """Dự đoán trên các batch đánh giá, trả về tensor nhãn dự đoán (CPU)."""
+    trainer.model.eval()
+    preds = []
+    for inputs in batches:
+        with autocast_context(trainer.device, trainer.precision):
+            outputs = trainer.model_forward(inputs.to(trainer.device))
+        preds.append(outputs.float().argmax(dim=1).cpu())
+    return torch.cat(preds)
+
+
+@torch.no_grad()
+def output_classes(trainer, max_frames):
+    """Số class của model, lấy từ shape output trên một batch rỗng."""
+    trainer.model.eval()
+    return trainer.model_forward(torch.zeros(1, max_frames, 33, 3, device=trainer.device)).shape[-1]
+
+
+def load_eval_data(data_path, batch_size, num_samples, max_frames):
+    """Dữ liệu validation thật nếu có, ngược lại sinh ngẫu nhiên (chỉ so được độ khớp dự đoán)."""
+    if data_path and os.path.isdir(data_path):
+        loader = DataLoader(YogaDataset(data_path, max_frames=max_frames), batch_size=batch_size, shuffle=False)
+        batches, labels = zip(*loader)
+        return list(batches), torch.cat(labels).long()
+
+    generator = torch.Generator().manual_seed(0)
+    inputs = torch.randn(num_samples, max_frames, 33, 3, generator=generator)
+    return list(inputs.split(batch_size)), None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark fp32 / autocast / torch.compile")
+    parser.add_argument("--config", default="config/hyperparams.yaml")
+    parser.add_argument("--checkpoint", default=None, help="Checkpoint để đánh giá accuracy (tùy chọn)")
+    parser.add_argument("--data", default=None, help="Thư mục keypoints validation (mặc định theo config)")
+    parser.add_argument("--modes", nargs="+", default=list(MODES), choices=list(MODES))
+    parser.add_argument("--batch-size", type=int, default=None)
+    parser.add_argument("--warmup", type=int, default=5)
+    parser.add_argument("--iters", type=int, default=30)
+    parser.add_argument("--num-samples", type=int, default=128, help="Số sample ngẫu nhiên khi không có dữ liệu")
+    parser.add_argument("--tolerance", type=float, default=0.01, help="Độ lệch accuracy tối đa so với fp32")
+    parser.add_argument("--output", default="benchmark/modes.json")
+    args = parser.parse_args()
+
+    cf = Config(args.config)
+    max_frames = int(cf.get("data.max_frame", 100))
+    batch_size = args.batch_size or int(cf.get("data.batch_size", 32))
+    base_model = get_model(cf)
+    if args.checkpoint:
+        checkpoint = torch.load(args.checkpoint, map_location="cpu")
+        base_model.load_state_dict(checkpoint.get("model", checkpoint))
+
+    num_classes = output_classes(build_trainer(cf, base_model, "fp32", False), max_frames)
+
+    if args.data is None:
+        split = "public" if cf.get("data.is_public") else "private"
+        args.data = cf.get(f"data.json_{split}_path_val")
+    batches, labels = load_eval_data(args.data, batch_size, args.num_samples, max_frames)
+
+    generator = torch.Generator().manual_seed(0)
+    train_inputs = torch.randn(batch_size, max_frames, 33, 3, generator=generator)
+    train_labels = torch.randint(0, num_classes, (batch_size,), generator=generator)
+
+    report = {"model": cf.get("model.model_name"), "batch_size": batch_size, "max_frames": max_frames,
+              "checkpoint": args.checkpoint, "eval_data": args.data if labels is not None else "random",
+              "tolerance": args.tolerance, "modes": {}}
+    reference = None
+    passed = True
+    # fp32 luôn chạy đầu tiên để làm mốc so sánh
+    for mode in ["fp32"] + [m for m in args.modes if m != "fp32"]:
+        precision, compile = MODES[mode]
+        print(f"[*] Benchmark mode: {mode}")
+
+        # Accuracy đo trên trọng số gốc, trước khi các bước train làm thay đổi model
+        trainer = build_trainer(cf, base_model, precision, compile)
+        preds = predict(trainer, batches)
+        inference_ms = time_inference(trainer, batches[0][:1].to(trainer.device), args.warmup, args.iters)
+        train_step_ms = time_train_step(trainer, train_inputs.to(trainer.device), train_labels.to(trainer.device),
+                                        args.warmup, args.iters)
+
+        result = {"precision": precision, "compile": compile,
+                  "train_step_ms": round(train_step_ms, 3), "inference_ms": round(inference_ms, 3)}
+        if labels is not None:
+            result["accuracy"] = round((preds == labels).float().mean().item(), 6)
+        if reference is None:
+            reference = result | {"preds": preds}
+        else:
+            result["agreement_with_fp32"] = round((preds == reference["preds"]).float().mean().item(), 6)
+            if labels is not None:
+                result["accuracy_delta"] = round(result["accuracy"] - reference["accuracy"], 6)
+                result["within_tolerance"] = abs(result["accuracy_delta"]) <= args.tolerance
+            else:
+                result["within_tolerance"] = 1 - result["agreement_with_fp32"] <= args.tolerance
+            passed = passed and result["within_tolerance"]
+        report["modes"][mode] = result
+        print(f"\t=> {result}")
+
+    report["passed"] = passed
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=4)
+    print(f"[+] Report saved to {args.output}")
+    if not passed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
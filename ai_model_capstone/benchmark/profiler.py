@@ -0,0 +1,196 @@
+"""
+Profile từng layer của model cấu hình trong hyperparams.yaml (`get_model(cf)`) bằng torch.profiler trên batch ngẫu nhiên:
+FLOPs, số tham số, thời gian và bộ nhớ cấp phát của mỗi layer, các op tốn thời gian nhất và Chrome trace
+(mở bằng chrome://tracing hoặc https://ui.perfetto.dev).
+
+Chạy từ thư mục ai_model_capstone:
+    python -m benchmark.profiler --model gcn --batch-size 8 --frames 100 --depth 2
+"""
+import os
+import sys
+import json
+import argparse
+import resource
+import torch
+from torch.profiler import profile, record_function, ProfilerActivity
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from config import Config
+from core.model import get_model
+from core.trainer import run_model
+from core.graph import NUM_JOINTS
+
+LAYER_PREFIX = "layer::"
+
+
+def profiled_modules(model, depth):
+    """Các module con có độ sâu tên (số dấu chấm + 1) không quá `depth`."""
+    return [(name, module) for name, module in model.named_modules() if name and name.count(".") < depth]
+
+
+def add_layer_ranges(model, depth):
+    """Bọc forward của mỗi layer trong một `record_function` để profiler gom op theo layer."""
+    handles = []
+    for name, module in profiled_modules(model, depth):
+        def pre_hook(module, inputs, name=name):
+            module._profile_range = record_function(LAYER_PREFIX + name)
+            module._profile_range.__enter__()
+
+        def post_hook(module, inputs, outputs):
+            module._profile_range.__exit__(None, None, None)
+
+        handles.append(module.register_forward_pre_hook(pre_hook))
+        handles.append(module.register_forward_hook(post_hook))
+    return handles
+
+
+def _device_time(event):
+    return getattr(event, "device_time_total", getattr(event, "cuda_time_total", 0))
+
+
+def _device_memory(event):
+    return getattr(event, "device_memory_usage", getattr(event, "cuda_memory_usage", 0))
+
+
+def _layers_of(event):
+    """Mọi layer chứa op (đi ngược theo cpu_parent), để FLOPs của layer cha gồm cả layer con như thời gian."""
+    names = []
+    parent = event.cpu_parent
+    while parent is not None:
+        if parent.name.startswith(LAYER_PREFIX):
+            names.append(parent.name[len(LAYER_PREFIX):])
+        parent = parent.cpu_parent
+    return names
+
+
+def layer_report(prof, model, depth, iters):
+    """
+    Gom FLOPs / thời gian / bộ nhớ theo layer từ các event của profiler (trung bình mỗi bước).
+    Số liệu của một layer gồm cả các layer con; bộ nhớ là tổng dung lượng cấp phát trong layer.
+    """
+    layers = {
+        name: {
+            "type": module.__class__.__name__,
+            "parameters": sum(p.numel() for p in module.parameters()),
+            "flops": 0, "cpu_ms": 0.0, "device_ms": 0.0, "cpu_memory_mb": 0.0, "device_memory_mb": 0.0,
+        }
+        for name, module in profiled_modules(model, depth)
+    }
+    for event in prof.events():
+        if event.name.startswith(LAYER_PREFIX):
+            layer = layers.get(event.name[len(LAYER_PREFIX):])
+            if layer is None:
+                continue
+            layer["cpu_ms"] += event.cpu_time_total / 1000 / iters
+            layer["device_ms"] += _device_time(event) / 1000 / iters
+            layer["cpu_memory_mb"] += event.cpu_memory_usage / 2 ** 20 / iters
+            layer["device_memory_mb"] += _device_memory(event) / 2 ** 20 / iters
+        elif getattr(event, "flops", 0):
+            # FLOPs chỉ được đếm cho matmul / conv; op như scatter của GCN có thời gian nhưng FLOPs = 0
+            for name in _layers_of(event):
+                if name in layers:
+                    layers[name]["flops"] += event.flops // iters
+
+    for layer in layers.values():
+        for key in ("cpu_ms", "device_ms", "cpu_memory_mb", "device_memory_mb"):
+            layer[key] = round(layer[key], 4)
+    return layers
+
+
+def print_layers(layers, top):
+    rows = sorted(layers.items(), key=lambda item: item[1]["cpu_ms"] + item[1]["device_ms"], reverse=True)[:top]
+    print(f"{'layer':<45}{'type':<28}{'params':>10}{'MFLOPs':>12}{'cpu ms':>10}{'dev ms':>10}{'cpu MB':>10}")
+    for name, layer in rows:
+        print(f"{name:<45}{layer['type']:<28}{layer['parameters']:>10}{layer['flops'] / 1e6:>12.2f}"
+              f"{layer['cpu_ms']:>10.3f}{layer['device_ms']:>10.3f}{layer['cpu_memory_mb']:>10.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-layer profiler (FLOPs, params, time, memory) with Chrome trace")
+    parser.add_argument("--config", default="config/hyperparams.yaml")
+    parser.add_argument("--model", default=None, help="Ghi đè model.model_name (spoter, frame_spoter, gcn, stgcn, student)")
+    parser.add_argument("--batch-size", type=int, default=1)
+    parser.add_argument("--frames", type=int, default=None, help="Số frame mỗi clip (mặc định data.max_frame)")
+    parser.add_argument("--depth", type=int, default=2, help="Độ sâu module được tách thành layer riêng")
+    parser.add_argument("--train", action="store_true", help="Profile cả backward + optimizer step")
+    parser.add_argument("--device", default="cuda" if torch.cuda.is_available() else "cpu")
+    parser.add_argument("--threads", type=int, default=None)
+    parser.add_argument("--warmup", type=int, default=3)
+    parser.add_argument("--iters", type=int, default=10)
+    parser.add_argument("--top", type=int, default=25, help="Số layer / op in ra")
+    parser.add_argument("--trace", default="benchmark/profile_trace.json", help="File Chrome trace")
+    parser.add_argument("--output", default="benchmark/profile.json")
+    args = parser.parse_args()
+
+    if args.threads:
+        torch.set_num_threads(args.threads)
+    device = torch.device(args.device)
+    cf = Config(args.config)
+    if args.model:
+        cf.set("model.model_name", args.model)
+    model_name = cf.get("model.model_name")
+    temporal_edges = bool(cf.get("model.temporal_edges"))
+    frames = args.frames or int(cf.get("data.max_frame", 100))
+
+    model = get_model(cf).to(device)
+    model.train(args.train)
+    optimizer = torch.optim.Adam(model.parameters()) if args.train else None
+    generator = torch.Generator().manual_seed(0)
+    inputs = torch.randn(args.batch_size, frames, NUM_JOINTS, 3, generator=generator).to(device)
+
+    def step():
+        with torch.set_grad_enabled(args.train):
+            outputs = run_model(model, model_name, inputs, None, temporal_edges)
+        if args.train:
+            with record_function("backward"):
+                optimizer.zero_grad()
+                outputs.float().sum().backward()
+                optimizer.step()
+        if device.type == "cuda":
+            torch.cuda.synchronize(device)
+
+    for _ in range(args.warmup):
+        step()
+
+    handles = add_layer_ranges(model, args.depth)
+    activities = [ProfilerActivity.CPU] + ([ProfilerActivity.CUDA] if device.type == "cuda" else [])
+    if device.type == "cuda":
+        torch.cuda.reset_peak_memory_stats(device)
+    with profile(activities=activities, record_shapes=True, profile_memory=True, with_flops=True) as prof:
+        for _ in range(args.iters):
+            step()
+    for handle in handles:
+        handle.remove()
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.trace)), exist_ok=True)
+    prof.export_chrome_trace(args.trace)
+
+    layers = layer_report(prof, model, args.depth, args.iters)
+    sort_by = "self_cuda_time_total" if device.type == "cuda" else "self_cpu_time_total"
+    print(prof.key_averages().table(sort_by=sort_by, row_limit=args.top))
+    print_layers(layers, args.top)
+
+    report = {
+        "model": model_name,
+        "device": str(device),
+        "threads": torch.get_num_threads(),
+        "batch_size": args.batch_size,
+        "frames": frames,
+        "mode": "train" if args.train else "inference",
+        "parameters": sum(p.numel() for p in model.parameters()),
+        "total_flops": sum(event.flops for event in prof.key_averages()) // args.iters,
+        # ru_maxrss tính theo KB trên Linux
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        "peak_device_memory_mb": round(torch.cuda.max_memory_allocated(device) / 2 ** 20, 1) if device.type == "cuda" else None,
+        "trace": args.trace,
+        "layers": layers,
+    }
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=4)
+    print(f"[+] Chrome trace saved to {args.trace}")
+    print(f"[+] Report saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+"""
+Benchmark throughput của đường dữ liệu và vòng train: đọc tập keypoints JSON (YogaDataset), duyệt DataLoader,
+một epoch train và một epoch eval của Trainer. Mỗi phần chạy lặp `--repeats` lần, báo p50 / p95 (ms) và samples/s
+để so với baseline bằng benchmark.compare.
+
+Chạy từ thư mục ai_model_capstone:
+    python -m benchmark.throughput --output benchmark/results/throughput.json
+"""
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import resource
+import tempfile
+import statistics
+import torch
+import torch.nn as nn
+import torch.optim as optim
+from torch.utils.data import DataLoader
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from config import Config
+from core.model import get_model
+from core.dataset import YogaDataset
+from core.trainer import Trainer
+from core.skeleton import skeleton_to_json, NUM_KEYPOINTS, KEYPOINT_DIM
+
+
+def write_keypoint_dataset(output_dir, num_classes, samples_per_class, max_frames):
+    """Sinh tập keypoints JSON ngẫu nhiên (cố định seed) cùng định dạng với core.extract."""
+    rng = random.Random(0)
+    for c in range(num_classes):
+        class_dir = os.path.join(output_dir, f"class_{c}")
+        os.makedirs(class_dir, exist_ok=True)
+        for i in range(samples_per_class):
+            num_frames = rng.randint(max_frames // 2, max_frames)
+            skeleton = [[[rng.random() for _ in range(KEYPOINT_DIM)] for _ in range(NUM_KEYPOINTS)] for _ in range(num_frames)]
+            data = skeleton_to_json(skeleton, {"policy": "all", "frames": list(range(num_frames))}, f"class_{c}")
+            with open(os.path.join(class_dir, f"clip_{i}.json"), "w") as f:
+                json.dump(data, f)
+
+
+def percentile(values, q):
+    ordered = sorted(values)
+    position = (len(ordered) - 1) * q / 100
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+def summarize(times_ms, num_samples):
+    """p50 / p95 (ms) của các lần chạy và samples/s tính theo p50."""
+    p50 = percentile(times_ms, 50)
+    return {"p50_ms": round(p50, 3), "p95_ms": round(percentile(times_ms, 95), 3),
+            "mean_ms": round(statistics.fmean(times_ms), 3), "runs": len(times_ms),
+            "samples_per_s": round(num_samples / (p50 / 1000), 2)}
+
+
+def measure(fn, warmup, repeats):
+    times = []
+    for i in range(warmup + repeats):
+        start = time.perf_counter()
+        fn()
+        if i >= warmup:
+            times.append((time.perf_counter() - start) * 1000)
+    return times
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Dataset / Trainer throughput benchmark")
+    parser.add_argument("--config", default="config/hyperparams.yaml")
+    parser.add_argument("--data", default=None, help="Thư mục keypoints (mặc định sinh dữ liệu ngẫu nhiên)")
+    parser.add_argument("--num-classes", type=int, default=4)
+    parser.add_argument("--samples-per-class", type=int, default=64)
+    parser.add_argument("--batch-size", type=int, default=None)
+    parser.add_argument("--num-workers", type=int, default=0)
+    parser.add_argument("--warmup", type=int, default=1)
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--threads", type=int, default=None)
+    parser.add_argument("--output", default="benchmark/results/throughput.json")
+    args = parser.parse_args()
+
+    if args.threads:
+        torch.set_num_threads(args.threads)
+    cf = Config(args.config)
+    max_frames = int(cf.get("data.max_frame", 100))
+    batch_size = args.batch_size or int(cf.get("data.batch_size", 32))
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        data_dir = args.data
+        if data_dir is None:
+            data_dir = tmp_dir
+            write_keypoint_dataset(data_dir, args.num_classes, args.samples_per_class, max_frames)
+
+        # Đọc JSON + padding (YogaDataset.__init__)
+        dataset = None
+
+        def build():
+            nonlocal dataset
+            dataset = YogaDataset(data_dir, max_frames=max_frames)
+
+        build_times = measure(build, 0, args.repeats)
+
+    num_samples = len(dataset)
+    loader = DataLoader(dataset, batch_size=batch_size, shuffle=True, num_workers=args.num_workers)
+
+    def iterate():
+        for _ in loader:
+            pass
+
+    torch.manual_seed(0)
+    model = get_model(cf)
+    trainer = Trainer(model, optim.Adam(model.parameters(), lr=float(cf.get("train.lr", 1e-5))), nn.CrossEntropyLoss(),
+                      "throughput_benchmark", None, cf.get("model.model_name"), bool(cf.get("model.pretrained")),
+                      precision=str(cf.get("train.precision", "fp32")), temporal_edges=bool(cf.get("model.temporal_edges")))
+    trainer.verbose = False
+
+    stages = {
+        "dataset/build": build_times,
+        "dataset/iterate": measure(iterate, args.warmup, args.repeats),
+        "trainer/train_epoch": measure(lambda: trainer.forward(loader, "train"), args.warmup, args.repeats),
+        "trainer/eval_epoch": measure(lambda: trainer.forward(loader, "valid"), args.warmup, args.repeats),
+    }
+    report = {"benchmark": "throughput", "model": cf.get("model.model_name"), "num_samples": num_samples,
+              "batch_size": batch_size, "max_frames": max_frames, "data": args.data or "random",
+              "torch_threads": torch.get_num_threads(), "stages": {}}
+    for stage, times in stages.items():
+        report["stages"][stage] = summarize(times, num_samples)
+        print(f"[*] {stage}: {report['stages'][stage]}")
+    # ru_maxrss tính theo KB trên Linux
+    report["peak_rss_mb"] = round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=4)
+    print(f"[+] Report saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
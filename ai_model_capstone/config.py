@@ -12,6 +12,14 @@ class Config:
             value = value.get(k, {})
         return value if value else default
 
+    def set(self, key, value):
+        """Ghi đè giá trị theo đường dẫn dạng `a.b.c` (dùng cho sweep)."""
+        keys = key.split(".")
+        node = self.config
+        for k in keys[:-1]:
+            node = node.setdefault(k, {})
+        node[keys[-1]] = value
+
 
 if __name__ == "__main__":
     pass
\ No newline at end of file
@@ -0,0 +1,96 @@
+import os
+import copy
+import queue
+import random
+import threading
+import numpy as np
+import torch
+
+
+def snapshot(obj):
+    """
+    Sao chép sâu một state (dict/list lồng nhau) với mọi tensor được clone về CPU,
+    để thread ghi file không bị ảnh hưởng khi training tiếp tục cập nhật trọng số.
+    """
+    if isinstance(obj, torch.Tensor):
+        return obj.detach().to("cpu", copy=True)
+    if isinstance(obj, dict):
+        return {k: snapshot(v) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return type(obj)(snapshot(v) for v in obj)
+    return copy.deepcopy(obj)
+
+
+def get_rng_state():
+    state = {
+        "python": random.getstate(),
+        "numpy": np.random.get_state(),
+        "torch": torch.get_rng_state(),
+    }
+    if torch.cuda.is_available():
+        state["cuda"] = torch.cuda.get_rng_state_all()
+    return state
+
+
+def set_rng_state(state):
+    if not state:
+        return
+    random.setstate(state["python"])
+    np.random.set_state(state["numpy"])
+    torch.set_rng_state(state["torch"])
+    if "cuda" in state and torch.cuda.is_available():
+        torch.cuda.set_rng_state_all(state["cuda"])
+
+
+def atomic_save(state, path):
+    """Ghi ra file tạm cùng thư mục rồi `os.replace`, không bao giờ để lại checkpoint ghi dở."""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    torch.save(state, tmp_path)
+    os.replace(tmp_path, path)
+
+
+class CheckpointWriter:
+    """
+    Thread nền ghi checkpoint theo thứ tự. `submit` nhận state đã snapshot và trả về ngay;
+    lỗi khi ghi được raise lại ở lần gọi tiếp theo.
+    """
+
+    def __init__(self):
+        self._queue = queue.Queue()
+        self._error = None
+        self._thread = threading.Thread(target=self._run, name="checkpoint-writer", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            try:
+                if item is None:
+                    return
+                state, path = item
+                atomic_save(state, path)
+            except Exception as e:
+                self._error = e
+            finally:
+                self._queue.task_done()
+
+    def _raise_error(self):
+        if self._error is not None:
+            error, self._error = self._error, None
+            raise RuntimeError(f"Background checkpoint write failed: {error}") from error
+
+    def submit(self, state, path):
+        self._raise_error()
+        self._queue.put((state, path))
+
+    def wait(self):
+        """Chờ mọi checkpoint đang chờ được ghi xong."""
+        self._queue.join()
+        self._raise_error()
+
+    def close(self):
+        if self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join()
+        self._raise_error()
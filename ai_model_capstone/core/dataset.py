@@ -3,11 +3,16 @@ from torch.utils.data import Dataset, DataLoader
 import numpy as np
 import os
 import json
+from core.skeleton import pad_skeleton, normalize_skeleton
 # Hàm đọc file JSON và chuyển thành numpy array
 def json_to_numpy(json_file, class_name):
     with open(json_file, "r") as f:
         data = json.load(f)
 
+    # File mới lưu {"sampling": ..., "frames": [...]}, file cũ là list các frame
+    if isinstance(data, dict):
+        data = data.get("frames", [])
+
     if not data:
         print(f"Warning: Empty JSON file {json_file}")
         return None, None
@@ -24,12 +29,28 @@ def json_to_numpy(json_file, class_name):
 
     return keypoints_array, class_name  # Trả về tên class dạng string
 
+def clip_max_frames(config):
+    """
+    Số frame tối đa giữ lại mỗi clip. Khi bật `data.bucketing`, batch chỉ pad tới clip dài nhất nên
+    clip dài được giữ tới `data.bucket_max_frame` (nếu có) thay vì bị cắt đuôi ở `data.max_frame`.
+    Chuẩn hóa vẫn theo `data.max_frame` (xem YogaDataset.norm_frames) nên clip không dài hơn
+    `data.max_frame` giống hệt lúc serving (Config.MAX_FRAMES của backend).
+    """
+    max_frames = int(config.get('data.max_frame'))
+    if config.get('data.bucketing') and config.get('data.bucket_max_frame'):
+        max_frames = max(max_frames, int(config.get('data.bucket_max_frame')))
+    return max_frames
+
 # Dataset PyTorch
 class YogaDataset(Dataset):
-    def __init__(self, json_folder, max_frames=100):
+    def __init__(self, json_folder, max_frames=100, norm_frames=None):
         self.data = []
         self.labels = []
+        self.lengths = []  # Số frame thật của mỗi clip (trước padding), dùng cho bucketing
         self.max_frames = max_frames
+        # Độ dài padding khi chuẩn hóa, bằng MAX_FRAMES lúc serving (mean tính cả frame padding);
+        # khác max_frames khi bucketing giữ clip dài hơn data.max_frame
+        self.norm_frames = max_frames if norm_frames is None else min(norm_frames, max_frames)
         self.label_map = {}  # Mapping từ tên class thành số
 
         # Lấy danh sách class từ thư mục
@@ -49,30 +70,29 @@ class YogaDataset(Dataset):
                 keypoints, label = json_to_numpy(json_path, class_name)  # label là string
                 
                 if keypoints is not None:
-                    # **Padding hoặc Truncation**
-                    padded_keypoints = np.zeros((self.max_frames, 33, 3), dtype=np.float32)  # Sửa (33, 2) thành (33, 3)
-                    num_frames = min(len(keypoints), self.max_frames)
-                    padded_keypoints[:num_frames, :, :] = keypoints[:num_frames, :, :]  # Cắt hoặc giữ nguyên
-                    
-                    self.data.append(padded_keypoints)
+                    # Chỉ giữ frame thật (cắt ở max_frames), padding làm trong __getitem__
+                    # để bộ nhớ không tăng theo max_frames khi giữ clip dài
+                    self.data.append(keypoints[:self.max_frames])
+                    self.lengths.append(max(1, min(len(keypoints), self.max_frames)))
                     self.labels.append(self.label_map[str(label)])  # Đảm bảo label là string trước khi tra cứu
 
 
     def normalize_skeleton(self,skeleton):
         """Chuẩn hóa skeleton về trung tâm bằng cách trừ đi tọa độ trung bình."""
-        mean_pose = np.mean(skeleton[:, :, :2], axis=(0, 1))  # Trung bình trên trục x, y
-        skeleton[:, :, :2] -= mean_pose  # Dịch keypoints về trung tâm
-        return skeleton
+        return normalize_skeleton(skeleton)
 
 
     def __len__(self):
         return len(self.data)
 
     def __getitem__(self, idx):
+        # **Padding** tới norm_frames rồi chuẩn hóa như lúc serving (clip dài hơn: mean trên frame thật),
+        # sau đó pad tiếp tới max_frames; pad_collate cắt lại theo clip dài nhất trong batch
         keypoints = self.data[idx]
         label = self.labels[idx]
         
-        keypoints = self.normalize_skeleton(keypoints)  
+        keypoints = self.normalize_skeleton(pad_skeleton(keypoints, max(len(keypoints), self.norm_frames)))
+        keypoints = pad_skeleton(keypoints, self.max_frames)
         return torch.tensor(keypoints, dtype=torch.float32), torch.tensor(label, dtype=torch.long)
 
 if __name__ == "__main__":
@@ -0,0 +1,90 @@
+import os
+import copy
+import torch
+import torch.nn as nn
+import torch.nn.functional as F
+from core.model import load_checkpoint_model
+from core.trainer import Trainer, run_model
+
+
+def load_teacher(cf, model_name, checkpoint_path, device="cpu"):
+    """Teacher đã fine-tune, đóng băng (không tính gradient)."""
+    teacher = load_checkpoint_model(cf, model_name, checkpoint_path, device)
+    teacher.requires_grad_(False)
+    return teacher
+
+
+class DistillationLoss(nn.Module):
+    """
+    Loss knowledge distillation: alpha * KL(soft targets của teacher || student) * T^2 + (1 - alpha) * cross entropy.
+    Soft targets của batch hiện tại được gán vào `soft_targets` trước khi gọi loss (DistillTrainer);
+    khi không có (đánh giá) chỉ tính cross entropy nên valid loss so sánh được với các model khác.
+    """
+
+    def __init__(self, temperature=4.0, alpha=0.7):
+        super().__init__()
+        self.temperature = temperature
+        self.alpha = alpha
+        self.soft_targets = None
+
+    def forward(self, outputs, labels):
+        hard_loss = F.cross_entropy(outputs, labels)
+        soft_targets, self.soft_targets = self.soft_targets, None
+        if soft_targets is None:
+            return hard_loss
+
+        log_probs = F.log_softmax(outputs / self.temperature, dim=-1)
+        kd_loss = F.kl_div(log_probs, soft_targets, reduction="batchmean") * self.temperature ** 2
+        return self.alpha * kd_loss + (1 - self.alpha) * hard_loss
+
+
+class DistillTrainer(Trainer):
+    """
+    Trainer cho student: khi train, mỗi batch (đã augment) được đưa qua các teacher đã đóng băng,
+    soft targets là trung bình softmax(logits / T) của các teacher. Mọi thứ khác (AMP, DDP, checkpoint,
+    tracking) giữ nguyên như Trainer.
+    """
+
+    def __init__(self, model, teachers, optimizer, criterion, checkpoint_name, **kwargs):
+        super().__init__(model, optimizer, criterion, checkpoint_name, model_name="student", **kwargs)
+        # model_name -> teacher
+        self.teachers = {name: teacher.to(self.device).eval() for name, teacher in teachers.items()}
+
+    @torch.no_grad()
+    def soft_targets(self, inputs, lengths=None):
+        temperature = self.criteria.temperature
+        probs = [
+            run_model(teacher, name, inputs, lengths, self.temporal_edges).float().div(temperature).softmax(dim=-1)
+            for name, teacher in self.teachers.items()
+        ]
+        return torch.stack(probs).mean(dim=0)
+
+    def model_forward(self, inputs, lengths=None):
+        if self.model.training:
+            self.criteria.soft_targets = self.soft_targets(inputs, lengths)
+        return super().model_forward(inputs, lengths)
+
+
+def export_student(model, path, export_format="torchscript", max_frames=100):
+    """
+    Export student (CPU, eval) để chạy trên điện thoại. Input (B, T, 33, 3), output logits (B, num_classes).
+    TorchScript được tối ưu cho mobile (gộp Conv + BN); ONNX cho phép đổi batch và số frame.
+    """
+    model = copy.deepcopy(model).cpu().eval()
+    example = torch.zeros(1, max_frames, 33, 3)
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+    if export_format == "torchscript":
+        from torch.utils.mobile_optimizer import optimize_for_mobile
+        traced = torch.jit.trace(model, example)
+        torch.jit.save(optimize_for_mobile(traced), path)
+    elif export_format == "onnx":
+        torch.onnx.export(
+            model, example, path,
+            input_names=["keypoints"], output_names=["logits"],
+            dynamic_axes={"keypoints": {0: "batch", 1: "frames"}, "logits": {0: "batch"}},
+            opset_version=17
+        )
+    else:
+        raise ValueError(f"Unsupported export format: {export_format}")
+    return path
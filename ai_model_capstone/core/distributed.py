@@ -0,0 +1,106 @@
+import os
+import math
+import socket
+import torch
+import torch.distributed as dist
+from torch.nn.parallel import DistributedDataParallel
+from torch.utils.data import DataLoader, Sampler
+from torch.utils.data.distributed import DistributedSampler
+
+# Data parallel nhiều process trên CPU (backend gloo): mỗi rank train trên một phần dữ liệu,
+# gradient được all-reduce bởi DistributedDataParallel.
+
+
+def is_distributed():
+    return dist.is_available() and dist.is_initialized()
+
+
+def get_rank():
+    return dist.get_rank() if is_distributed() else 0
+
+
+def get_world_size():
+    return dist.get_world_size() if is_distributed() else 1
+
+
+def is_main_process():
+    return get_rank() == 0
+
+
+def find_free_port():
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def setup(rank, world_size, master_addr="127.0.0.1", master_port=29500, backend="gloo", num_threads=None):
+    """Khởi tạo process group và chia đều CPU threads cho các rank trên máy."""
+    os.environ["MASTER_ADDR"] = master_addr
+    os.environ["MASTER_PORT"] = str(master_port)
+    dist.init_process_group(backend, rank=rank, world_size=world_size)
+    torch.set_num_threads(num_threads or max(1, (os.cpu_count() or 1) // world_size))
+
+
+def cleanup():
+    if is_distributed():
+        dist.destroy_process_group()
+
+
+def wrap_model(model):
+    """Bọc model bằng DistributedDataParallel khi đang chạy distributed (CPU, không có device_ids)."""
+    if not is_distributed():
+        return model
+    return DistributedDataParallel(model)
+
+
+def all_reduce_sum(tensor):
+    """Cộng tensor trên mọi rank (trả về chính tensor nếu không distributed)."""
+    if is_distributed():
+        dist.all_reduce(tensor, op=dist.ReduceOp.SUM)
+    return tensor
+
+
+def all_reduce_max(tensor):
+    """Lấy giá trị lớn nhất của tensor trên mọi rank (trả về chính tensor nếu không distributed)."""
+    if is_distributed():
+        dist.all_reduce(tensor, op=dist.ReduceOp.MAX)
+    return tensor
+
+
+class ShardSampler(Sampler):
+    """
+    Chia dataset cho các rank theo kiểu xen kẽ, không padding/lặp sample như `DistributedSampler`,
+    để metric đánh giá sau khi all-reduce đúng bằng khi chạy một process.
+    """
+
+    def __init__(self, dataset, rank=None, world_size=None):
+        self.num_samples = len(dataset)
+        self.rank = get_rank() if rank is None else rank
+        self.world_size = get_world_size() if world_size is None else world_size
+
+    def __iter__(self):
+        return iter(range(self.rank, self.num_samples, self.world_size))
+
+    def __len__(self):
+        return math.ceil(max(self.num_samples - self.rank, 0) / self.world_size)
+
+
+def make_loader(dataset, batch_size, shuffle=False, seed=42):
+    """
+    DataLoader cho dataset. Khi distributed: train (shuffle) dùng `DistributedSampler` để mọi rank
+    có cùng số batch (DDP yêu cầu), đánh giá dùng `ShardSampler` để không đếm trùng sample.
+    """
+    if not is_distributed():
+        return DataLoader(dataset, batch_size=batch_size, shuffle=shuffle)
+    if shuffle:
+        sampler = DistributedSampler(dataset, shuffle=True, seed=seed)
+    else:
+        sampler = ShardSampler(dataset)
+    return DataLoader(dataset, batch_size=batch_size, sampler=sampler)
+
+
+def set_epoch(dataloader, epoch):
+    """Đổi thứ tự shuffle của `DistributedSampler` / `BucketBatchSampler` theo epoch (giống nhau trên mọi rank)."""
+    for sampler in (getattr(dataloader, "sampler", None), getattr(dataloader, "batch_sampler", None)):
+        if hasattr(sampler, "set_epoch"):
+            sampler.set_epoch(epoch)
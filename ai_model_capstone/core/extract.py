@@ -1,57 +1,51 @@
 import os
-import cv2
 import json
-import numpy as np
-import mediapipe as mp
+import cv2
+from collections import Counter
+from core.skeleton import extract_skeleton, skeleton_to_json
+from core.extract_index import ExtractionIndex, INDEX_FILENAME, file_hash
 
-def extract_skeleton_with_selected_frames(video_path, output_json, fps, action_name):
+def extract_skeleton_with_selected_frames(video_path, output_json, fps, action_name, policy="fps_stride", max_frames=None):
     if not os.path.exists(os.path.dirname(output_json)):
         os.makedirs(os.path.dirname(output_json))
 
-    mp_pose = mp.solutions.pose
-    pose = mp_pose.Pose()
+    skeleton, sampling = extract_skeleton(video_path, policy=policy, fps=fps, max_frames=max_frames)
 
-    keypoint_names = [
-        "nose", "left_eye_inner", "left_eye", "left_eye_outer", "right_eye_inner",
-        "right_eye", "right_eye_outer", "left_ear", "right_ear", "mouth_left",
-        "mouth_right", "left_shoulder", "right_shoulder", "left_elbow", "right_elbow",
-        "left_wrist", "right_wrist", "left_pinky", "right_pinky", "left_index", "right_index",
-        "left_thumb", "right_thumb", "left_hip", "right_hip", "left_knee", "right_knee",
-        "left_ankle", "right_ankle", "left_heel", "right_heel", "left_foot_index", "right_foot_index"
-    ]
+    # Ghi ra file tạm rồi os.replace: lần chạy bị ngắt không để lại JSON dở dang mà index tin là hợp lệ
+    tmp_json = f"{output_json}.tmp"
+    with open(tmp_json, "w") as f:
+        json.dump(skeleton_to_json(skeleton, sampling, action_name), f, indent=4)
+    os.replace(tmp_json, output_json)
 
+def _video_properties(video_path):
+    """(fps, số frame) đọc từ header của video, giống giá trị extract_skeleton lưu trong "sampling"."""
     cap = cv2.VideoCapture(video_path)
-    video_fps = cap.get(cv2.CAP_PROP_FPS)
-    total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
-    selected_frames = np.arange(0, total_frames, step=int(video_fps // fps), dtype=int)
-
-    skeleton_data = []
-
-    for idx in selected_frames:
-        cap.set(cv2.CAP_PROP_POS_FRAMES, idx)
-        ret, frame = cap.read()
-        if not ret:
-            continue
-
-        frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        results = pose.process(frame_rgb)
-
-        frame_keypoints = {"frame": int(idx), "name": action_name, "pose": {}}
-        
-        if results.pose_landmarks:
-            for i, lm in enumerate(results.pose_landmarks.landmark):
-                frame_keypoints["pose"][keypoint_names[i]] = [lm.x, lm.y, lm.z]
-        else:
-            frame_keypoints["pose"] = {kp: [0, 0, 0] for kp in keypoint_names}  # Gán 0 nếu không nhận diện được
-
-        skeleton_data.append(frame_keypoints)
-
-    cap.release()
-
-    with open(output_json, "w") as f:
-        json.dump(skeleton_data, f, indent=4)
-
-def process_videos(video_root_folder, output_root_folder, fps):
+    try:
+        return cap.get(cv2.CAP_PROP_FPS), int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    finally:
+        cap.release()
+
+
+def _sampling_matches(output_json, params, video_path):
+    """
+    File JSON (định dạng mới) đã được trích xuất từ đúng video này với đúng tham số hay chưa.
+    Ngoài tham số sampling còn so fps / số frame với video hiện tại và yêu cầu JSON mới hơn video,
+    để clip được quay lại (cùng tên) không giữ keypoints cũ.
+    """
+    try:
+        with open(output_json, "r") as f:
+            sampling = json.load(f).get("sampling", {})
+        if os.path.getmtime(output_json) < os.path.getmtime(video_path):
+            return False
+    except (OSError, ValueError, AttributeError):
+        return False
+    if not all(sampling.get(k) == v for k, v in params.items()):
+        return False
+    video_fps, total_frames = _video_properties(video_path)
+    return sampling.get("video_fps") == video_fps and sampling.get("total_frames") == total_frames
+
+
+def process_videos(video_root_folder, output_root_folder, fps, policy="fps_stride", max_frames=None):
     if not os.path.exists(video_root_folder):
         print(f"Warning: Folder '{video_root_folder}' not found.")
         return
@@ -60,6 +54,11 @@ def process_videos(video_root_folder, output_root_folder, fps):
     # example type of subfolders
     # subfolders = ['D:\\User\\AI-Enhanced-for-Improved-Athletic-Performance-and-Customized-Rehabilitation\\data\\processed_video\\public_data\\train\\Lunge_Pose']
 
+    # Index lưu fingerprint của video nguồn + tham số trích xuất cho từng file JSON
+    index = ExtractionIndex(os.path.join(output_root_folder, INDEX_FILENAME))
+    params = {"policy": policy, "fps": fps if policy == "fps_stride" else None, "max_frames": max_frames}
+    seen_sources = set()
+
     for class_path in subfolders:
         class_name = os.path.basename(class_path)
         output_class_folder = os.path.join(output_root_folder, class_name)
@@ -68,22 +67,47 @@ def process_videos(video_root_folder, output_root_folder, fps):
         video_files = [f for f in os.listdir(class_path) if f.endswith((".mp4", ".avi", ".mov"))]
         #Examle of name types
         #video_files= ['sample6.mp4', 'sample7.mp4']
+        # a.mp4 và a.avi cùng thư mục sẽ ghi đè lên cùng a.json: khi trùng tên thì giữ cả đuôi (a.mp4.json)
+        stem_counts = Counter(os.path.splitext(f)[0] for f in video_files)
         for video_file in video_files:
+            source = f"{class_name}/{video_file}"
+            seen_sources.add(source)
             try:
                 video_path = os.path.join(class_path, video_file)
-                output_json = os.path.join(output_class_folder, f"{os.path.splitext(video_file)[0]}.json")
                 action_name = os.path.splitext(video_file)[0]  # Lấy tên video làm tên động tác
+                output_name = video_file if stem_counts[action_name] > 1 else action_name
+                output_json = os.path.join(output_class_folder, f"{output_name}.json")
 
-                # Nếu file JSON đã tồn tại, bỏ qua
-                if os.path.exists(output_json):
+                # Bỏ qua nếu video không đổi và tham số trích xuất giống lần trước
+                if index.is_up_to_date(source, video_path, params, output_json):
                     print(f"Skipping {video_file} (Already processed)")
                     continue
 
+                # Tên output đổi (vừa xuất hiện video trùng tên): xóa file cũ để không bị tính hai lần
+                entry = index.get(source)
+                if entry is not None and entry["output"] != output_json and os.path.exists(entry["output"]):
+                    os.remove(entry["output"])
+
+                # JSON đã có nhưng chưa nằm trong index (ví dụ index mới tạo)
+                if index.get(source) is None and _sampling_matches(output_json, params, video_path):
+                    index.record(source, video_path, params, output_json)
+                    print(f"Skipping {video_file} (Already processed, indexed)")
+                    continue
+
                 print(f"Processing {video_file} in class {class_name}...")
-                extract_skeleton_with_selected_frames(video_path, output_json, fps, action_name)
+                content_hash = file_hash(video_path)
+                extract_skeleton_with_selected_frames(video_path, output_json, fps, action_name, policy, max_frames)
+                index.record(source, video_path, params, output_json, content_hash)
             except Exception as e:
                 print(f"Error processing file {video_file}: {e}")
-            
+
+    # Xóa keypoints của những video nguồn đã bị xóa (bỏ qua khi không thấy video nào, vd. thư mục chưa mount)
+    if not seen_sources:
+        print(f"Warning: No videos found in '{video_root_folder}', keeping existing keypoints.")
+    for source in index.prune(seen_sources):
+        print(f"Removed keypoints of deleted video {source}")
+    index.close()
+
 
 if __name__ == "__main__":
     FPS =10
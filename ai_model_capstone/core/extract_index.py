@@ -0,0 +1,118 @@
+import os
+import json
+import time
+import sqlite3
+import hashlib
+
+INDEX_FILENAME = ".extract_index.sqlite"
+
+
+def file_hash(path, chunk_size=1024 * 1024):
+    """Tính sha256 của nội dung file (đọc theo từng chunk 1MB)."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(chunk_size):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ExtractionIndex:
+    """
+    Index SQLite ánh xạ mỗi video nguồn (size, mtime, sha256) và tham số trích xuất
+    sang file keypoints tương ứng, để các lần chạy sau chỉ xử lý những gì đã thay đổi.
+    """
+
+    def __init__(self, db_path):
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        self.db_path = db_path
+        self.conn = sqlite3.connect(db_path)
+        self.conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS videos (
+                source TEXT PRIMARY KEY,
+                size INTEGER NOT NULL,
+                mtime REAL NOT NULL,
+                content_hash TEXT NOT NULL,
+                params TEXT NOT NULL,
+                output TEXT NOT NULL,
+                updated_at REAL NOT NULL
+            )
+            """
+        )
+        self.conn.commit()
+
+    @staticmethod
+    def encode_params(params):
+        return json.dumps(params, sort_keys=True)
+
+    def get(self, source):
+        row = self.conn.execute(
+            "SELECT size, mtime, content_hash, params, output FROM videos WHERE source = ?", (source,)
+        ).fetchone()
+        if row is None:
+            return None
+        return {"size": row[0], "mtime": row[1], "content_hash": row[2], "params": row[3], "output": row[4]}
+
+    def sources(self):
+        return {row[0]: row[1] for row in self.conn.execute("SELECT source, output FROM videos")}
+
+    def is_up_to_date(self, source, video_path, params, output=None):
+        """
+        Kiểm tra video đã được trích xuất với đúng tham số và nội dung chưa đổi
+        (và vào đúng file `output` nếu có). Chỉ tính lại hash khi size/mtime thay đổi;
+        nếu nội dung giống thì cập nhật lại stat.
+        """
+        entry = self.get(source)
+        if entry is None or entry["params"] != self.encode_params(params):
+            return False
+        if output is not None and entry["output"] != output:
+            return False
+        if not os.path.exists(entry["output"]):
+            return False
+
+        stat = os.stat(video_path)
+        if entry["size"] == stat.st_size and entry["mtime"] == stat.st_mtime:
+            return True
+
+        if entry["size"] != stat.st_size or entry["content_hash"] != file_hash(video_path):
+            return False
+
+        # File được copy/touch lại nhưng nội dung không đổi
+        self.conn.execute("UPDATE videos SET mtime = ? WHERE source = ?", (stat.st_mtime, source))
+        self.conn.commit()
+        return True
+
+    def record(self, source, video_path, params, output, content_hash=None):
+        stat = os.stat(video_path)
+        self.conn.execute(
+            "INSERT OR REPLACE INTO videos (source, size, mtime, content_hash, params, output, updated_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (source, stat.st_size, stat.st_mtime, content_hash or file_hash(video_path),
+             self.encode_params(params), output, time.time())
+        )
+        self.conn.commit()
+
+    def remove(self, source):
+        self.conn.execute("DELETE FROM videos WHERE source = ?", (source,))
+        self.conn.commit()
+
+    def prune(self, seen_sources):
+        """
+        Xóa file keypoints và bản ghi của những video nguồn không còn tồn tại.
+        Không làm gì khi `seen_sources` rỗng: thư mục video trống hoặc chưa mount
+        không được xóa toàn bộ keypoints đã trích xuất.
+        """
+        removed = []
+        if not seen_sources:
+            return removed
+        for source, output in self.sources().items():
+            if source in seen_sources:
+                continue
+            if os.path.exists(output):
+                os.remove(output)
+            self.remove(source)
+            removed.append(source)
+        return removed
+
+    def close(self):
+        self.conn.close()
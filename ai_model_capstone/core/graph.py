@@ -0,0 +1,64 @@
+from functools import lru_cache
+import torch
+
+# Đồ thị skeleton dùng chung cho train, evaluation và backend.
+# Bản sao ở backend_capstone/src/v1/ai/graph.py phải được giữ giống hệt file này.
+
+NUM_JOINTS = 33  # Keypoints của Mediapipe
+
+# Cạnh nối các keypoints trong một frame
+SKELETON_EDGES = [
+    (0, 1), (1, 2), (2, 3), (3, 7),
+    (0, 4), (4, 5), (5, 6), (6, 8),
+    (9, 10), (11, 12),
+    (11, 13), (13, 15), (15, 17), (15, 19), (15, 21),
+    (12, 14), (14, 16), (16, 18), (16, 20), (16, 22),
+    (11, 23), (12, 24), (23, 24),
+    (23, 25), (25, 27), (27, 29), (27, 31), (29, 31),
+    (24, 26), (26, 28), (28, 30), (28, 32), (30, 32)
+]
+
+
+def get_edge_index():
+    """Ma trận kề (edge_index) của một frame, shape (2, num_edges)."""
+    return torch.tensor(SKELETON_EDGES, dtype=torch.long).t().contiguous()
+
+
+@lru_cache(maxsize=256)  # Đủ cho mọi độ dài batch khi dùng length bucketing
+def _build_graph(batch_size, num_frames, device, temporal):
+    frame_edges = get_edge_index().to(device)
+
+    # Mỗi frame của mỗi sample là một khối riêng: cộng offset 33 * (chỉ số frame) vào chỉ số node
+    num_graphs = batch_size * num_frames
+    offsets = torch.arange(num_graphs, device=device) * NUM_JOINTS
+    edge_index = (frame_edges[:, None, :] + offsets[None, :, None]).reshape(2, -1)
+
+    if temporal and num_frames > 1:
+        # Nối cùng một khớp giữa hai frame liên tiếp trong cùng sample
+        frame_ids = torch.arange(num_graphs, device=device).view(batch_size, num_frames)[:, :-1].reshape(-1)
+        joints = torch.arange(NUM_JOINTS, device=device)
+        source = (frame_ids[:, None] * NUM_JOINTS + joints[None, :]).reshape(-1)
+        temporal_edges = torch.stack([source, source + NUM_JOINTS])
+        edge_index = torch.cat([edge_index, temporal_edges], dim=1)
+
+    batch = torch.arange(batch_size, device=device).repeat_interleave(num_frames * NUM_JOINTS)
+    return edge_index.contiguous(), batch
+
+
+def batch_graph(batch_size, num_frames, device="cpu", temporal=False):
+    """
+    Trả về (edge_index, batch) cho input GCN đã flatten thành B * T * 33 node.
+
+    edge_index là block-diagonal: mỗi frame có đủ cạnh skeleton với chỉ số node được dịch theo frame,
+    cộng thêm cạnh thời gian giữa các frame liên tiếp nếu `temporal`. Kết quả được cache theo
+    (B, T, device, temporal) nên chỉ xây một lần cho mỗi kích thước batch.
+    """
+    return _build_graph(int(batch_size), int(num_frames), torch.device(device), bool(temporal))
+
+
+def to_graph_inputs(inputs, temporal=False):
+    """(B, T, 33, 3) -> (x, edge_index, batch) cho YogaGCN."""
+    batch_size, num_frames, num_joints, keypoint_dim = inputs.shape
+    x = inputs.reshape(batch_size * num_frames * num_joints, keypoint_dim)
+    edge_index, batch = batch_graph(batch_size, num_frames, inputs.device, temporal)
+    return x, edge_index, batch
@@ -0,0 +1,138 @@
+import math
+import torch
+
+# Cặp keypoint trái/phải của Mediapipe, dùng để hoán đổi khi lật ngang
+LEFT_RIGHT_PAIRS = [
+    (1, 4), (2, 5), (3, 6), (7, 8), (9, 10), (11, 12), (13, 14), (15, 16),
+    (17, 18), (19, 20), (21, 22), (23, 24), (25, 26), (27, 28), (29, 30), (31, 32)
+]
+
+
+def _flip_permutation(num_keypoints=33):
+    perm = list(range(num_keypoints))
+    for left, right in LEFT_RIGHT_PAIRS:
+        perm[left], perm[right] = right, left
+    return torch.tensor(perm, dtype=torch.long)
+
+
+class KeypointAugmenter:
+    """
+    Augmentation trên keypoints (B, T, 33, 3) thay cho việc encode lại video rồi chạy Mediapipe:
+    rotation 2D quanh tâm, lật ngang (đảo x + hoán đổi trái/phải), thay đổi tốc độ (resample theo thời gian)
+    và frame dropout. Toàn bộ được vector hóa theo batch, random theo seed cố định.
+    """
+
+    def __init__(self, rotation_p=0.5, max_angle=15.0, flip_p=0.5, speed_p=0.5, min_speed=0.8,
+                 max_speed=1.2, dropout_p=0.5, drop_ratio=0.2, seed=42):
+        self.rotation_p = rotation_p
+        self.max_angle = max_angle
+        self.flip_p = flip_p
+        self.speed_p = speed_p
+        self.min_speed = min_speed
+        self.max_speed = max_speed
+        self.dropout_p = dropout_p
+        self.drop_ratio = drop_ratio
+        self.generator = torch.Generator().manual_seed(seed)
+        self.flip_perm = _flip_permutation()
+
+    @classmethod
+    def from_config(cls, cf):
+        """Tạo augmenter từ mục `augment` trong hyperparams.yaml, trả về None nếu tắt."""
+        if not cf.get('augment.enabled'):
+            return None
+        return cls(
+            rotation_p=float(cf.get('augment.rotation.p', 0.0)),
+            max_angle=float(cf.get('augment.rotation.max_angle', 15)),
+            flip_p=float(cf.get('augment.flip.p', 0.0)),
+            speed_p=float(cf.get('augment.speed.p', 0.0)),
+            min_speed=float(cf.get('augment.speed.min_factor', 0.8)),
+            max_speed=float(cf.get('augment.speed.max_factor', 1.2)),
+            dropout_p=float(cf.get('augment.dropout.p', 0.0)),
+            drop_ratio=float(cf.get('augment.dropout.ratio', 0.2)),
+            seed=int(cf.get('augment.seed', 42))
+        )
+
+    def state_dict(self):
+        """Trạng thái generator, lưu vào checkpoint để train tiếp (resume) sinh đúng chuỗi augmentation."""
+        return {"generator": self.generator.get_state()}
+
+    def load_state_dict(self, state):
+        self.generator.set_state(state["generator"])
+
+    def _rand(self, *shape, device):
+        return torch.rand(*shape, generator=self.generator).to(device)
+
+    def __call__(self, inputs):
+        inputs = inputs.clone()
+        batch_size, num_frames = inputs.shape[:2]
+        device = inputs.device
+
+        # Frame hợp lệ: các keypoints không trùng nhau (frame padding có 33 điểm giống hệt)
+        valid = (inputs - inputs[:, :, :1]).abs().amax(dim=(2, 3)) > 0  # (B, T)
+        positions = torch.arange(num_frames, device=device)
+        lengths = torch.where(valid, positions + 1, torch.zeros_like(positions)).amax(dim=1)  # (B,)
+        pad_frame = torch.where((lengths < num_frames)[:, None, None], inputs[:, -1], torch.zeros_like(inputs[:, -1]))
+
+        # Tâm (x, y) của từng sample, chỉ tính trên frame hợp lệ
+        weights = valid.to(inputs.dtype)[:, :, None]
+        center = (inputs[..., :2].mean(dim=2) * weights).sum(dim=1) / weights.sum(dim=1).clamp(min=1)  # (B, 2)
+        center = center[:, None, None, :]
+
+        if self.rotation_p > 0:
+            inputs = self.rotate(inputs, center, self._rand(batch_size, device=device) < self.rotation_p)
+        if self.flip_p > 0:
+            inputs = self.flip(inputs, center, self._rand(batch_size, device=device) < self.flip_p)
+        if self.speed_p > 0:
+            inputs, lengths = self.change_speed(inputs, lengths, pad_frame, self._rand(batch_size, device=device) < self.speed_p)
+        if self.dropout_p > 0:
+            inputs = self.frame_dropout(inputs, lengths, pad_frame, self._rand(batch_size, device=device) < self.dropout_p)
+        return inputs
+
+    def rotate(self, inputs, center, apply):
+        angle = (self._rand(inputs.shape[0], device=inputs.device) * 2 - 1) * math.radians(self.max_angle)
+        angle = torch.where(apply, angle, torch.zeros_like(angle))
+        cos, sin = torch.cos(angle)[:, None, None], torch.sin(angle)[:, None, None]
+
+        xy = inputs[..., :2] - center
+        x = xy[..., 0] * cos - xy[..., 1] * sin
+        y = xy[..., 0] * sin + xy[..., 1] * cos
+        inputs[..., :2] = torch.stack([x, y], dim=-1) + center
+        return inputs
+
+    def flip(self, inputs, center, apply):
+        flipped = inputs[:, :, self.flip_perm.to(inputs.device)]
+        flipped[..., 0] = 2 * center[..., 0] - flipped[..., 0]
+        return torch.where(apply[:, None, None, None], flipped, inputs)
+
+    def change_speed(self, inputs, lengths, pad_frame, apply):
+        """Resample L frame hợp lệ thành round(L * factor) frame (giống `change_speed` của video)."""
+        batch_size, num_frames = inputs.shape[:2]
+        device = inputs.device
+        factor = self.min_speed + self._rand(batch_size, device=device) * (self.max_speed - self.min_speed)
+        factor = torch.where(apply, factor, torch.ones_like(factor))
+
+        new_lengths = (lengths.to(factor.dtype) * factor).round().long().clamp(1, num_frames)
+        new_lengths = torch.where(lengths > 0, new_lengths, lengths)
+        scale = (lengths - 1).clamp(min=0).to(factor.dtype) / (new_lengths - 1).clamp(min=1).to(factor.dtype)
+
+        positions = torch.arange(num_frames, device=device)
+        source = (positions[None, :] * scale[:, None]).round().long().clamp(max=num_frames - 1)  # (B, T)
+        resampled = inputs.gather(1, source[:, :, None, None].expand_as(inputs))
+        keep = positions[None, :] < new_lengths[:, None]
+        return torch.where(keep[:, :, None, None], resampled, pad_frame[:, None]), new_lengths
+
+    def frame_dropout(self, inputs, lengths, pad_frame, apply):
+        """Bỏ ngẫu nhiên `drop_ratio` frame hợp lệ, dồn các frame còn lại lên đầu."""
+        batch_size, num_frames = inputs.shape[:2]
+        device = inputs.device
+        positions = torch.arange(num_frames, device=device)
+        in_clip = positions[None, :] < lengths[:, None]
+
+        dropped = (self._rand(batch_size, num_frames, device=device) < self.drop_ratio) & apply[:, None]
+        keep = in_clip & ~dropped
+
+        # Sắp xếp ổn định: frame giữ lại lên trước, đúng thứ tự thời gian
+        order = torch.argsort((~keep).long() * num_frames + positions[None, :], dim=1)
+        compacted = inputs.gather(1, order[:, :, None, None].expand_as(inputs))
+        kept = positions[None, :] < keep.sum(dim=1, keepdim=True)
+        return torch.where(kept[:, :, None, None], compacted, pad_frame[:, None])
@@ -0,0 +1,52 @@
+import torch
+
+
+class MetricsAccumulator:
+    """
+    Tích lũy confusion matrix (tensor trên device của model) qua các batch, mỗi batch chỉ một lần `bincount`.
+    Accuracy, precision, recall, F1 (micro và macro) được tính một lần ở cuối epoch từ confusion matrix,
+    nên bộ nhớ không tăng theo số batch/epoch.
+    """
+
+    def __init__(self, num_classes, device="cpu"):
+        self.num_classes = num_classes
+        self.confusion = torch.zeros(num_classes, num_classes, dtype=torch.long, device=device)
+
+    def reset(self):
+        self.confusion.zero_()
+
+    def update(self, preds, labels):
+        """Cộng một batch vào confusion matrix (hàng: nhãn thật, cột: dự đoán)."""
+        index = labels.detach().long().flatten() * self.num_classes + preds.detach().long().flatten()
+        self.confusion += torch.bincount(index, minlength=self.num_classes ** 2).view(self.num_classes, self.num_classes)
+
+    def accuracy(self):
+        total = self.confusion.sum()
+        return (self.confusion.diagonal().sum().float() / total.clamp(min=1)).item()
+
+    def compute(self):
+        confusion = self.confusion.double()
+        true_positive = confusion.diagonal()
+        predicted = confusion.sum(dim=0)
+        actual = confusion.sum(dim=1)
+        total = confusion.sum().clamp(min=1)
+
+        # Micro: với bài toán single-label, precision = recall = f1 = accuracy
+        accuracy = (true_positive.sum() / total).item()
+
+        # Macro: trung bình trên các class có mặt (nhãn thật hoặc dự đoán), giống sklearn với labels quan sát được
+        present = (predicted + actual) > 0
+        precision = torch.where(predicted > 0, true_positive / predicted.clamp(min=1), torch.zeros_like(predicted))
+        recall = torch.where(actual > 0, true_positive / actual.clamp(min=1), torch.zeros_like(actual))
+        f1 = torch.where(precision + recall > 0, 2 * precision * recall / (precision + recall).clamp(min=1e-12), torch.zeros_like(precision))
+        num_present = present.sum().clamp(min=1)
+
+        return {
+            'accuracy': round(accuracy, 10),
+            'precision': round(accuracy, 10),
+            'recall': round(accuracy, 10),
+            'f1': round(accuracy, 10),
+            'precision_macro': round((precision * present).sum().item() / num_present.item(), 10),
+            'recall_macro': round((recall * present).sum().item() / num_present.item(), 10),
+            'f1_macro': round((f1 * present).sum().item() / num_present.item(), 10)
+        }
@@ -1,4 +1,5 @@
 import copy
+import math
 import torch
 import os
 import sys
@@ -7,6 +8,8 @@ from typing import Optional
 from dataclasses import dataclass
 from torch import Tensor
 import torch_geometric.nn as gnn
+from core.graph import NUM_JOINTS, SKELETON_EDGES
+from core.dataset import clip_max_frames
 
 def _get_clones(mod, n):
     return nn.ModuleList([copy.deepcopy(mod) for _ in range(n)])
@@ -84,6 +87,71 @@ class SPOTER(nn.Module):
         return res  # Trả về đúng shape: (batch_size, num_classes)
 
 
+def lengths_to_mask(lengths, max_len):
+    """Padding mask (B, max_len) từ số frame hợp lệ của mỗi sample, True ở vị trí padding."""
+    positions = torch.arange(max_len, device=lengths.device)
+    return positions[None, :] >= lengths[:, None]
+
+
+def infer_padding_mask(inputs):
+    """
+    Padding mask cho batch đã pad sẵn (B, T, 33, 3): frame padding (sau khi chuẩn hóa) có 33 keypoints
+    trùng nhau. Frame đầu luôn được giữ để attention không bị mask toàn bộ.
+    """
+    mask = (inputs - inputs[:, :, :1]).abs().amax(dim=(2, 3)) == 0
+    mask[:, 0] = False
+    return mask
+
+
+def sinusoidal_encoding(max_len, dim):
+    position = torch.arange(max_len, dtype=torch.float32)[:, None]
+    div_term = torch.exp(torch.arange(0, dim, 2, dtype=torch.float32) * (-math.log(10000.0) / dim))
+    encoding = torch.zeros(max_len, dim)
+    encoding[:, 0::2] = torch.sin(position * div_term)
+    encoding[:, 1::2] = torch.cos(position * div_term)[:, :dim // 2]
+    return encoding
+
+
+class FrameSPOTER(nn.Module):
+    """
+    Biến thể SPOTER coi mỗi frame là một token: chiếu 33 x 3 keypoints của từng frame lên hidden_dim,
+    cộng positional encoding rồi attention trên các frame với `src_key_padding_mask`.
+    Nhận clip có độ dài bất kỳ (tối đa `max_frame`), frame padding được bỏ qua nhờ mask.
+    """
+
+    def __init__(self, num_classes, hidden_dim, max_frame, num_heads, encoder_layers, decoder_layers):
+        super().__init__()
+        self.max_frame = max_frame
+        self.input_projection = nn.Linear(33 * 3, hidden_dim)  # 99 → hidden_dim cho mỗi frame
+        self.register_buffer("pos_encoding", sinusoidal_encoding(max_frame, hidden_dim))
+        self.class_query = nn.Parameter(torch.rand(1, hidden_dim))
+        self.transformer = nn.Transformer(hidden_dim, num_heads, encoder_layers, decoder_layers)
+        self.linear_class = nn.Linear(hidden_dim, num_classes)
+
+        custom_decoder_layer = SPOTERTransformerDecoderLayer(self.transformer.d_model, self.transformer.nhead, 2048, 0.1, "relu")
+        self.transformer.decoder.layers = _get_clones(custom_decoder_layer, self.transformer.decoder.num_layers)
+
+    def forward(self, inputs, lengths=None, mask=None):
+        """
+        inputs: (B, T, 33, 3) với T <= max_frame.
+        lengths: (B,) số frame hợp lệ, hoặc mask: (B, T) True ở frame padding.
+        Không truyền cả hai thì mask được suy ra từ các frame padding.
+        """
+        batch_size, num_frames = inputs.shape[:2]
+        if num_frames > self.max_frame:
+            raise ValueError(f"Clip has {num_frames} frames, more than max_frame={self.max_frame}")
+        if mask is None:
+            mask = lengths_to_mask(lengths, num_frames) if lengths is not None else infer_padding_mask(inputs)
+
+        h = self.input_projection(inputs.flatten(start_dim=2).float())  # (B, T, hidden_dim)
+        h = h + self.pos_encoding[:num_frames]
+        h = h.permute(1, 0, 2)  # (T, B, hidden_dim)
+
+        class_query = self.class_query.unsqueeze(1).repeat(1, batch_size, 1)  # (1, B, hidden_dim)
+        h = self.transformer(h, class_query, src_key_padding_mask=mask, memory_key_padding_mask=mask)  # (1, B, hidden_dim)
+        return self.linear_class(h.squeeze(0))  # (B, num_classes)
+
+
 class YogaGCN(nn.Module):
     def __init__(self, in_channels=3, hidden_dim=128, num_classes=4):
         super(YogaGCN, self).__init__()
@@ -101,7 +169,112 @@ class YogaGCN(nn.Module):
         x = gnn.global_mean_pool(x, batch)
         x = self.fc(x)
         return x
+
+
+def normalized_adjacency(num_joints=NUM_JOINTS, edges=SKELETON_EDGES):
+    """Ma trận kề chuẩn hóa D^-1/2 (A + I) D^-1/2 của skeleton (vô hướng, có self-loop)."""
+    adjacency = torch.eye(num_joints)
+    for i, j in edges:
+        adjacency[i, j] = adjacency[j, i] = 1
+    degree = adjacency.sum(dim=1).pow(-0.5)
+    return degree[:, None] * adjacency * degree[None, :]
+
+
+class STGCNBlock(nn.Module):
+    """Graph conv theo không gian (ma trận kề cố định) + conv theo thời gian, có residual."""
+
+    def __init__(self, in_channels, out_channels, temporal_kernel=9, stride=1, dropout=0.1):
+        super().__init__()
+        padding = (temporal_kernel - 1) // 2
+        self.spatial = nn.Conv2d(in_channels, out_channels, kernel_size=1)
+        self.spatial_bn = nn.BatchNorm2d(out_channels)
+        self.temporal = nn.Sequential(
+            nn.Conv2d(out_channels, out_channels, kernel_size=(temporal_kernel, 1), stride=(stride, 1), padding=(padding, 0)),
+            nn.BatchNorm2d(out_channels),
+            nn.Dropout(dropout)
+        )
+        if in_channels == out_channels and stride == 1:
+            self.residual = nn.Identity()
+        else:
+            self.residual = nn.Sequential(
+                nn.Conv2d(in_channels, out_channels, kernel_size=1, stride=(stride, 1)),
+                nn.BatchNorm2d(out_channels)
+            )
+
+    def forward(self, x, adjacency):
+        res = self.residual(x)
+        x = torch.einsum("nctv,vw->nctw", self.spatial(x), adjacency)  # Tổng hợp đặc trưng từ các khớp kề
+        x = self.spatial_bn(x).relu()
+        x = self.temporal(x)
+        return (x + res).relu()
+
+
+class STGCN(nn.Module):
+    """
+    ST-GCN trên tensor dày (B, C, T, V): graph conv với ma trận kề chuẩn hóa cố định của 33 khớp
+    xen kẽ temporal conv, sau đó pooling trung bình trên (T, V) và phân loại.
+    Nhận trực tiếp batch (B, T, 33, 3) như SPOTER hoặc (B, C, T, 33).
+    """
+
+    def __init__(self, in_channels=3, hidden_dim=64, num_classes=4, num_layers=4, temporal_kernel=9, dropout=0.1):
+        super().__init__()
+        self.register_buffer("adjacency", normalized_adjacency())
+        self.data_bn = nn.BatchNorm1d(in_channels * NUM_JOINTS)
+
+        blocks = []
+        channels = in_channels
+        for i in range(num_layers):
+            # Giảm một nửa số frame ở giữa mạng để các block sau nhẹ hơn trên CPU
+            stride = 2 if num_layers > 1 and i == num_layers // 2 else 1
+            blocks.append(STGCNBlock(channels, hidden_dim, temporal_kernel, stride, dropout))
+            channels = hidden_dim
+        self.blocks = nn.ModuleList(blocks)
+        self.fc = nn.Linear(hidden_dim, num_classes)
+
+    def forward(self, inputs):
+        x = inputs.float()
+        if x.shape[-1] != NUM_JOINTS:
+            x = x.permute(0, 3, 1, 2)  # (B, T, V, C) -> (B, C, T, V)
+        batch_size, channels, num_frames, num_joints = x.shape
+
+        # Chuẩn hóa theo từng (khớp, kênh) trên toàn bộ thời gian
+        x = x.permute(0, 3, 1, 2).reshape(batch_size, num_joints * channels, num_frames)
+        x = self.data_bn(x)
+        x = x.view(batch_size, num_joints, channels, num_frames).permute(0, 2, 3, 1).contiguous()
+
+        for block in self.blocks:
+            x = block(x, self.adjacency)
+        x = x.mean(dim=(2, 3))  # (B, hidden_dim)
+        return self.fc(x)
    
+class KeypointTCN(nn.Module):
+    """
+    Student nhỏ để chạy trên điện thoại: vài lớp temporal conv (Conv1d) trên 33 * 3 tọa độ của mỗi frame,
+    pooling trung bình theo thời gian rồi phân loại. Chỉ dùng conv/BN/linear nên export được sang ONNX / TorchScript.
+    """
+
+    def __init__(self, num_classes=4, hidden_dim=64, num_layers=3, kernel_size=5, dropout=0.1):
+        super().__init__()
+        layers = []
+        channels = NUM_JOINTS * 3
+        for i in range(num_layers):
+            # Từ lớp thứ hai giảm một nửa số frame
+            layers += [
+                nn.Conv1d(channels, hidden_dim, kernel_size, stride=1 if i == 0 else 2, padding=kernel_size // 2),
+                nn.BatchNorm1d(hidden_dim),
+                nn.ReLU(inplace=True),
+                nn.Dropout(dropout),
+            ]
+            channels = hidden_dim
+        self.features = nn.Sequential(*layers)
+        self.fc = nn.Linear(hidden_dim, num_classes)
+
+    def forward(self, inputs):
+        x = inputs.float().flatten(2).transpose(1, 2)  # (B, T, 33, 3) -> (B, 99, T)
+        x = self.features(x).mean(dim=2)  # (B, hidden_dim)
+        return self.fc(x)
+
+
 def modify_model_for_finetune(model, cf):
     """
     Chỉnh sửa model khi fine-tune (is_pretrain == False), giữ nguyên feature extractor
@@ -119,9 +292,9 @@ def modify_model_for_finetune(model, cf):
     checkpoint = torch.load(checkpoint_path, map_location="cuda" if torch.cuda.is_available() else "cpu")
     state_dict = checkpoint['model']
 
-    if model_name == "spoter":
-        new_num_classes = int(cf.get('model.finetune_config.spoter.num_classes'))
-        hidden_dim = int(cf.get('model.finetune_config.spoter.hidden_dim'))
+    if model_name in ("spoter", "frame_spoter"):
+        new_num_classes = int(cf.get(f'model.finetune_config.{model_name}.num_classes'))
+        hidden_dim = int(cf.get(f'model.finetune_config.{model_name}.hidden_dim'))
         old_num_classes = state_dict["linear_class.weight"].shape[0]
 
         # Xóa lớp classification cũ
@@ -136,12 +309,12 @@ def modify_model_for_finetune(model, cf):
         nn.init.xavier_uniform_(model.linear_class.weight)
         model.linear_class.bias.data.zero_()
 
-        print(f"SPOTER fine-tune: num_classes thay đổi từ {old_num_classes} → {new_num_classes}")
+        print(f"{model_name.upper()} fine-tune: num_classes thay đổi từ {old_num_classes} → {new_num_classes}")
 
-    elif model_name == "gcn":
+    elif model_name in ("gcn", "stgcn", "student"):
         
-        new_num_classes = int(cf.get('model.finetune_config.gcn.num_classes'))
-        hidden_dim = int(cf.get('model.finetune_config.gcn.hidden_dim'))
+        new_num_classes = int(cf.get(f'model.finetune_config.{model_name}.num_classes'))
+        hidden_dim = int(cf.get(f'model.finetune_config.{model_name}.hidden_dim'))
         old_num_classes = state_dict["fc.weight"].shape[0]
 
         # Xóa lớp classification cũ
@@ -156,7 +329,7 @@ def modify_model_for_finetune(model, cf):
         nn.init.xavier_uniform_(model.fc.weight)
         model.fc.bias.data.zero_()
 
-        print(f"GCN fine-tune: num_classes thay đổi từ {old_num_classes} → {new_num_classes}")
+        print(f"{model_name.upper()} fine-tune: num_classes thay đổi từ {old_num_classes} → {new_num_classes}")
 
     return model
 
@@ -180,12 +353,36 @@ def get_model(cf):
             encoder_layers=int(cf.get('model.pretrain_config.spoter.encoder_layers')), 
             decoder_layers=int(cf.get('model.pretrain_config.spoter.decoder_layers'))
         )
+    elif model_name == "frame_spoter":
+        model = FrameSPOTER(
+            num_classes=int(cf.get('model.pretrain_config.frame_spoter.num_classes')),
+            hidden_dim=int(cf.get('model.pretrain_config.frame_spoter.hidden_dim')),
+            max_frame=clip_max_frames(cf),
+            num_heads=int(cf.get('model.pretrain_config.frame_spoter.num_heads')),
+            encoder_layers=int(cf.get('model.pretrain_config.frame_spoter.encoder_layers')),
+            decoder_layers=int(cf.get('model.pretrain_config.frame_spoter.decoder_layers'))
+        )
     elif model_name == "gcn":
         model = YogaGCN(
             in_channels=int(cf.get('model.pretrain_config.gcn.in_channels')), 
             hidden_dim=int(cf.get('model.pretrain_config.gcn.hidden_dim')), 
             num_classes=int(cf.get('model.pretrain_config.gcn.num_classes'))
         )
+    elif model_name == "stgcn":
+        model = STGCN(
+            in_channels=int(cf.get('model.pretrain_config.stgcn.in_channels')),
+            hidden_dim=int(cf.get('model.pretrain_config.stgcn.hidden_dim')),
+            num_classes=int(cf.get('model.pretrain_config.stgcn.num_classes')),
+            num_layers=int(cf.get('model.pretrain_config.stgcn.num_layers', 4)),
+            temporal_kernel=int(cf.get('model.pretrain_config.stgcn.temporal_kernel', 9))
+        )
+    elif model_name == "student":
+        model = KeypointTCN(
+            num_classes=int(cf.get('model.pretrain_config.student.num_classes')),
+            hidden_dim=int(cf.get('model.pretrain_config.student.hidden_dim')),
+            num_layers=int(cf.get('model.pretrain_config.student.num_layers', 3)),
+            kernel_size=int(cf.get('model.pretrain_config.student.kernel_size', 5))
+        )
     else:
         raise ValueError(f"Không tìm thấy model phù hợp: {model_name}")
 
@@ -193,4 +390,35 @@ def get_model(cf):
     if not is_pretrain:
         model = modify_model_for_finetune(model, cf)
 
-    return model 
\ No newline at end of file
+    return model 
+
+
+# Tên layer phân loại cuối của từng loại model, dùng để đọc số class từ checkpoint
+HEAD_WEIGHTS = {
+    "spoter": "linear_class.weight",
+    "frame_spoter": "linear_class.weight",
+    "gcn": "fc.weight",
+    "stgcn": "fc.weight",
+    "student": "fc.weight",
+}
+
+
+def load_checkpoint_model(cf, model_name, checkpoint_path, device="cpu", strict=True):
+    """
+    Khởi tạo model `model_name` theo `model.pretrain_config` của `cf` và load checkpoint đã train (eval mode).
+    Số class lấy từ layer phân loại trong checkpoint nên dùng được cho cả checkpoint pretrain và fine-tune.
+    """
+    checkpoint = torch.load(checkpoint_path, map_location="cpu", weights_only=False)
+    state_dict = checkpoint.get("model", checkpoint)
+
+    model_cf = copy.deepcopy(cf)
+    model_cf.set("model.model_name", model_name)
+    model_cf.set("model.pretrained", True)  # Không tự load pretrain / đổi head trong get_model
+    model_cf.set(f"model.pretrain_config.{model_name}.num_classes", state_dict[HEAD_WEIGHTS[model_name]].shape[0])
+
+    model = get_model(model_cf)
+    result = model.load_state_dict(state_dict, strict=strict)
+    if not strict and (result.missing_keys or result.unexpected_keys):
+        print(f"[!] {checkpoint_path}: missing keys {result.missing_keys}, unexpected keys {result.unexpected_keys}")
+    return model.to(device).eval()
+
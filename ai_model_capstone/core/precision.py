@@ -0,0 +1,26 @@
+import torch
+
+# Bản sao ở backend_capstone/src/v1/ai/precision.py phải được giữ giống hệt file này.
+
+# Chế độ chạy model: "fp32" (eager, mặc định) hoặc "autocast" (bf16 trên CPU, fp16 trên CUDA)
+PRECISION_MODES = ("fp32", "autocast")
+
+
+def autocast_dtype(device):
+    device = torch.device(device)
+    return torch.float16 if device.type == "cuda" else torch.bfloat16
+
+
+def autocast_context(device, precision="fp32"):
+    """Context manager autocast theo device; không làm gì khi precision là fp32."""
+    if precision not in PRECISION_MODES:
+        raise ValueError(f"Unknown precision mode: {precision}. Expected one of {PRECISION_MODES}")
+    device = torch.device(device)
+    return torch.autocast(device_type=device.type, dtype=autocast_dtype(device), enabled=precision == "autocast")
+
+
+def maybe_compile(model, compile=False):
+    """Trả về model đã `torch.compile` nếu được bật, ngược lại trả về model gốc."""
+    if not compile:
+        return model
+    return torch.compile(model, dynamic=True)
@@ -0,0 +1,112 @@
+import torch
+from torch.utils.data import Dataset, DataLoader, Sampler
+from core.distributed import get_rank, get_world_size
+
+
+class BucketBatchSampler(Sampler):
+    """
+    Gom các clip có độ dài gần nhau vào cùng batch: xáo trộn index, chia thành các pool
+    `batch_size * pool_batches` phần tử, sắp xếp mỗi pool theo độ dài rồi cắt thành batch,
+    cuối cùng xáo trộn thứ tự batch. Mỗi batch chỉ cần pad tới clip dài nhất của nó.
+
+    Khi distributed, mỗi rank lấy một phần batch (train cắt bớt để mọi rank có cùng số batch).
+    """
+
+    def __init__(self, lengths, batch_size, shuffle=True, pool_batches=50, drop_last=False, seed=42,
+                 rank=None, world_size=None):
+        self.lengths = torch.as_tensor(lengths, dtype=torch.long)
+        self.batch_size = batch_size
+        self.shuffle = shuffle
+        self.pool_batches = pool_batches
+        self.drop_last = drop_last
+        self.seed = seed
+        self.epoch = 0
+        self.rank = get_rank() if rank is None else rank
+        self.world_size = get_world_size() if world_size is None else world_size
+
+    def set_epoch(self, epoch):
+        self.epoch = epoch
+
+    def _all_batches(self):
+        if self.shuffle:
+            generator = torch.Generator().manual_seed(self.seed + self.epoch)
+            order = torch.randperm(len(self.lengths), generator=generator)
+        else:
+            generator = None
+            order = torch.arange(len(self.lengths))
+
+        pool_size = self.batch_size * self.pool_batches if self.shuffle else len(order)
+        batches = []
+        for pool in order.split(max(pool_size, 1)):
+            # Sắp xếp ổn định theo độ dài trong pool
+            pool = pool[torch.argsort(self.lengths[pool], stable=True)]
+            for batch in pool.split(self.batch_size):
+                if self.drop_last and len(batch) < self.batch_size:
+                    continue
+                batches.append(batch.tolist())
+
+        if self.shuffle:
+            batches = [batches[i] for i in torch.randperm(len(batches), generator=generator).tolist()]
+            # DDP cần mọi rank chạy cùng số bước
+            batches = batches[:len(batches) - len(batches) % self.world_size] if self.world_size > 1 else batches
+        return batches
+
+    def __iter__(self):
+        return iter(self._all_batches()[self.rank::self.world_size])
+
+    def __len__(self):
+        # Số batch phụ thuộc cách chia pool nên đếm trực tiếp (chỉ thao tác trên index)
+        return len(range(self.rank, len(self._all_batches()), self.world_size))
+
+    def padding_stats(self, max_frames):
+        """So sánh số frame phải xử lý khi pad theo batch và khi pad mọi clip tới `max_frames`."""
+        real_frames = 0
+        bucketed_frames = 0
+        num_samples = 0
+        for batch in self._all_batches():
+            lengths = self.lengths[batch]
+            real_frames += int(lengths.sum())
+            bucketed_frames += int(lengths.max()) * len(batch)
+            num_samples += len(batch)
+        fixed_frames = max_frames * num_samples
+        return {
+            "real_frames": real_frames,
+            "bucketed_frames": bucketed_frames,
+            "fixed_frames": fixed_frames,
+            "padding_bucketed": round(1 - real_frames / max(bucketed_frames, 1), 4),
+            "padding_fixed": round(1 - real_frames / max(fixed_frames, 1), 4),
+            "frames_saved": round(1 - bucketed_frames / max(fixed_frames, 1), 4),
+        }
+
+
+class LengthDataset(Dataset):
+    """Bọc dataset để mỗi item trả về thêm số frame hợp lệ: (keypoints, label, length)."""
+
+    def __init__(self, dataset, lengths):
+        self.dataset = dataset
+        self.lengths = lengths
+
+    def __len__(self):
+        return len(self.dataset)
+
+    def __getitem__(self, idx):
+        return (*self.dataset[idx], torch.tensor(self.lengths[idx], dtype=torch.long))
+
+
+def pad_collate(batch):
+    """
+    Ghép batch và cắt phần padding chung: chỉ giữ tới clip dài nhất trong batch.
+    Trả về (inputs (B, L, 33, 3), labels, lengths).
+    """
+    inputs, labels, lengths = zip(*batch)
+    lengths = torch.stack(lengths)
+    max_len = max(int(lengths.max()), 1)
+    inputs = torch.stack([x[:max_len] for x in inputs])
+    return inputs, torch.stack(labels), lengths
+
+
+def make_bucket_loader(dataset, batch_size, shuffle=False, lengths=None, seed=42):
+    """DataLoader theo bucket độ dài; `lengths` mặc định lấy từ `dataset.lengths` (YogaDataset)."""
+    lengths = dataset.lengths if lengths is None else lengths
+    sampler = BucketBatchSampler(lengths, batch_size, shuffle=shuffle, seed=seed)
+    return DataLoader(LengthDataset(dataset, lengths), batch_sampler=sampler, collate_fn=pad_collate)
@@ -0,0 +1,173 @@
+import cv2
+import numpy as np
+import mediapipe as mp
+
+# Engine trích xuất skeleton dùng chung cho extract (train), test (evaluation) và backend.
+# Bản sao ở backend_capstone/src/v1/ai/skeleton.py phải được giữ giống hệt file này.
+
+KEYPOINT_NAMES = [
+    "nose", "left_eye_inner", "left_eye", "left_eye_outer", "right_eye_inner",
+    "right_eye", "right_eye_outer", "left_ear", "right_ear", "mouth_left",
+    "mouth_right", "left_shoulder", "right_shoulder", "left_elbow", "right_elbow",
+    "left_wrist", "right_wrist", "left_pinky", "right_pinky", "left_index", "right_index",
+    "left_thumb", "right_thumb", "left_hip", "right_hip", "left_knee", "right_knee",
+    "left_ankle", "right_ankle", "left_heel", "right_heel", "left_foot_index", "right_foot_index"
+]
+NUM_KEYPOINTS = len(KEYPOINT_NAMES)  # 33 keypoints của Mediapipe
+KEYPOINT_DIM = 3  # x, y, z
+
+SAMPLING_POLICIES = ("fps_stride", "uniform_k", "all")
+
+_pose = None
+
+
+def get_pose_estimator():
+    """Khởi tạo Mediapipe Pose một lần cho cả process."""
+    global _pose
+    if _pose is None:
+        _pose = mp.solutions.pose.Pose()
+    return _pose
+
+
+def select_frame_indices(total_frames, policy="fps_stride", video_fps=None, fps=10, max_frames=None):
+    """
+    Trả về chỉ số các frame cần lấy (đã sắp xếp, có thể lặp lại với `uniform_k`).
+
+    - fps_stride: lấy mỗi `video_fps // fps` frame, cắt còn `max_frames` frame đầu (nếu có).
+    - uniform_k: lấy đúng `max_frames` frame trải đều trên toàn video.
+    - all: lấy mọi frame, cắt còn `max_frames` frame đầu (nếu có).
+    """
+    if policy not in SAMPLING_POLICIES:
+        raise ValueError(f"Unknown sampling policy: {policy}. Expected one of {SAMPLING_POLICIES}")
+    if total_frames <= 0:
+        raise ValueError("Video has no frames!")
+
+    if policy == "uniform_k":
+        if not max_frames:
+            raise ValueError("Sampling policy 'uniform_k' requires max_frames")
+        return np.linspace(0, total_frames - 1, max_frames, dtype=int)
+
+    if policy == "fps_stride":
+        step = max(1, int((video_fps or fps) // fps))
+    else:
+        step = 1
+
+    indices = np.arange(0, total_frames, step=step, dtype=int)
+    if max_frames:
+        indices = indices[:max_frames]
+    return indices
+
+
+def iter_video_frames(cap, indices):
+    """
+    Đọc tuần tự (streaming) và trả về (idx, frame) cho các chỉ số đã chọn.
+    Frame bị bỏ qua chỉ được `grab()` (không decode sang ảnh), không dùng seek.
+    """
+    if len(indices) == 0:
+        return
+
+    position = 0
+    pointer = 0
+    last_index = int(indices[-1])
+    while position <= last_index:
+        if not cap.grab():
+            break
+
+        if position == indices[pointer]:
+            ret, frame = cap.retrieve()
+            if ret:
+                # uniform_k có thể chọn cùng một frame nhiều lần khi video ngắn
+                while pointer < len(indices) and indices[pointer] == position:
+                    yield position, frame
+                    pointer += 1
+            else:
+                while pointer < len(indices) and indices[pointer] == position:
+                    pointer += 1
+
+            if pointer >= len(indices):
+                break
+
+        position += 1
+
+
+def estimate_keypoints(frame, pose=None):
+    """Chạy Mediapipe Pose trên một frame BGR, trả về mảng (33, 3) hoặc None nếu không nhận diện được."""
+    pose = pose or get_pose_estimator()
+    results = pose.process(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+    if not results.pose_landmarks:
+        return None
+
+    keypoints = np.array([[lm.x, lm.y, lm.z] for lm in results.pose_landmarks.landmark], dtype=np.float32)
+    if keypoints.shape != (NUM_KEYPOINTS, KEYPOINT_DIM):
+        return None
+    return keypoints
+
+
+def extract_skeleton(video_path, policy="fps_stride", fps=10, max_frames=None, pose=None):
+    """
+    Trích xuất keypoints từ video theo sampling policy.
+
+    Returns:
+        skeleton: np.ndarray (num_frames, 33, 3), frame không nhận diện được gán 0
+        sampling: dict mô tả policy đã dùng và các frame đã lấy
+    """
+    cap = cv2.VideoCapture(video_path)
+    if not cap.isOpened():
+        raise FileNotFoundError(f"Cannot open video: {video_path}")
+
+    try:
+        video_fps = cap.get(cv2.CAP_PROP_FPS)
+        total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        indices = select_frame_indices(total_frames, policy, video_fps, fps, max_frames)
+
+        frames = []
+        skeleton = []
+        for idx, frame in iter_video_frames(cap, indices):
+            keypoints = estimate_keypoints(frame, pose)
+            if keypoints is None:
+                keypoints = np.zeros((NUM_KEYPOINTS, KEYPOINT_DIM), dtype=np.float32)
+            frames.append(int(idx))
+            skeleton.append(keypoints)
+    finally:
+        cap.release()
+
+    skeleton = np.array(skeleton, dtype=np.float32).reshape(-1, NUM_KEYPOINTS, KEYPOINT_DIM)
+    sampling = {
+        "policy": policy,
+        "fps": fps if policy == "fps_stride" else None,
+        "max_frames": max_frames,
+        "video_fps": video_fps,
+        "total_frames": total_frames,
+        "frames": frames,
+    }
+    return skeleton, sampling
+
+
+def pad_skeleton(skeleton, max_frames):
+    """Padding (bằng 0) hoặc cắt skeleton về đúng `max_frames` frame như lúc train."""
+    padded = np.zeros((max_frames, NUM_KEYPOINTS, KEYPOINT_DIM), dtype=np.float32)
+    num_frames = min(len(skeleton), max_frames)
+    padded[:num_frames] = skeleton[:num_frames]
+    return padded
+
+
+def normalize_skeleton(skeleton):
+    """Chuẩn hóa skeleton về trung tâm bằng cách trừ đi tọa độ trung bình (x, y)."""
+    if skeleton.size == 0:
+        raise ValueError("Empty skeleton, cannot normalize!")
+
+    mean_pose = np.mean(skeleton[:, :, :2], axis=(0, 1))
+    skeleton[:, :, :2] -= mean_pose
+    return skeleton
+
+
+def skeleton_to_json(skeleton, sampling, action_name):
+    """Chuyển skeleton sang định dạng JSON của tập keypoints (kèm thông tin sampling)."""
+    frames = []
+    for idx, keypoints in zip(sampling["frames"], skeleton):
+        frames.append({
+            "frame": int(idx),
+            "name": action_name,
+            "pose": {name: [float(v) for v in kp] for name, kp in zip(KEYPOINT_NAMES, keypoints)}
+        })
+    return {"sampling": sampling, "frames": frames}
@@ -0,0 +1,132 @@
+import time
+import atexit
+import threading
+from mlflow.tracking import MlflowClient
+from mlflow.entities import Metric, Param, RunTag
+
+# Giới hạn của MLflow cho một lần gọi `log_batch`
+MAX_ENTITIES_PER_BATCH = 1000
+MAX_PARAMS_PER_BATCH = 100
+MAX_TAGS_PER_BATCH = 100
+
+TRACKING_MODES = ("async", "sync", "off")
+
+
+class Tracker:
+    """
+    Gom metric/param/tag vào buffer và ghi vào MLflow run bằng `log_batch` từ một thread nền,
+    thay vì mỗi `mlflow.log_metric` là một lần ghi đồng bộ vào tracking store.
+
+    - async: flush định kỳ (`flush_interval` giây) hoặc khi buffer đầy, từ thread nền.
+    - sync: flush ngay sau mỗi lần log (vẫn theo batch).
+    - off: bỏ qua mọi lần log (no-op), dùng khi benchmark.
+
+    Dùng như context manager để chắc chắn flush khi kết thúc hoặc khi có exception.
+    """
+
+    def __init__(self, run_id=None, mode="async", flush_interval=5.0, max_buffer=MAX_ENTITIES_PER_BATCH):
+        if mode not in TRACKING_MODES:
+            raise ValueError(f"Unknown tracking mode: {mode}. Expected one of {TRACKING_MODES}")
+        if mode != "off" and run_id is None:
+            raise ValueError("run_id is required unless tracking mode is 'off'")
+
+        self.run_id = run_id
+        self.mode = mode
+        self.flush_interval = flush_interval
+        self.max_buffer = max_buffer
+        self._metrics = []
+        self._params = {}
+        self._tags = {}
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._closed = False
+        self._thread = None
+
+        if mode != "off":
+            self.client = MlflowClient()
+            atexit.register(self.close)
+        if mode == "async":
+            self._thread = threading.Thread(target=self._run, name="mlflow-tracker", daemon=True)
+            self._thread.start()
+
+    @property
+    def enabled(self):
+        return self.mode != "off"
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+    def log_metric(self, key, value, step=None):
+        self.log_metrics({key: value}, step)
+
+    def log_metrics(self, metrics, step=None):
+        if not self.enabled:
+            return
+        timestamp = int(time.time() * 1000)
+        with self._lock:
+            self._metrics.extend(Metric(key, float(value), timestamp, step or 0) for key, value in metrics.items())
+            full = len(self._metrics) >= self.max_buffer
+        self._after_log(full)
+
+    def log_params(self, params):
+        if not self.enabled:
+            return
+        with self._lock:
+            self._params.update({key: str(value) for key, value in params.items()})
+        self._after_log(False)
+
+    def set_tags(self, tags):
+        if not self.enabled:
+            return
+        with self._lock:
+            self._tags.update({key: str(value) for key, value in tags.items()})
+        self._after_log(False)
+
+    def _after_log(self, full):
+        if self.mode == "sync":
+            self.flush()
+        elif full:
+            self._wakeup.set()
+
+    def _run(self):
+        while not self._closed:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"[!] MLflow tracking flush failed: {e}")
+
+    def flush(self):
+        """Ghi toàn bộ buffer vào MLflow, chia nhỏ theo giới hạn của `log_batch`."""
+        if not self.enabled:
+            return
+        with self._lock:
+            metrics, self._metrics = self._metrics, []
+            params = [Param(key, value) for key, value in self._params.items()]
+            tags = [RunTag(key, value) for key, value in self._tags.items()]
+            self._params, self._tags = {}, {}
+
+        while metrics or params or tags:
+            batch_params, params = params[:MAX_PARAMS_PER_BATCH], params[MAX_PARAMS_PER_BATCH:]
+            batch_tags, tags = tags[:MAX_TAGS_PER_BATCH], tags[MAX_TAGS_PER_BATCH:]
+            # Tổng số metric + param + tag trong một batch không vượt quá MAX_ENTITIES_PER_BATCH
+            num_metrics = MAX_ENTITIES_PER_BATCH - len(batch_params) - len(batch_tags)
+            batch_metrics, metrics = metrics[:num_metrics], metrics[num_metrics:]
+            self.client.log_batch(self.run_id, metrics=batch_metrics, params=batch_params, tags=batch_tags)
+
+    def close(self):
+        """Dừng thread nền và flush phần còn lại; gọi nhiều lần không sao."""
+        if self._closed:
+            return
+        self._closed = True
+        if self._thread is not None:
+            self._wakeup.set()
+            self._thread.join()
+        self.flush()
+        if self.enabled:
+            atexit.unregister(self.close)
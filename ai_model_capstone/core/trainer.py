@@ -3,22 +3,59 @@ import sys
 import time
 import torch
 from datetime import timedelta
-import sklearn.metrics as metrics
-import mlflow
+from core.metrics import MetricsAccumulator
+from core.precision import autocast_context, maybe_compile
+from core.graph import get_edge_index, to_graph_inputs
+from core.checkpoint import CheckpointWriter, snapshot, get_rng_state, set_rng_state
+from core.tracking import Tracker
+from core.distributed import is_distributed, is_main_process, get_world_size, wrap_model, all_reduce_sum, all_reduce_max, set_epoch
+
+
+def run_model(model, model_name, inputs, lengths=None, temporal_edges=False):
+    """Forward `model` trên batch (B, T, 33, 3) theo định dạng input của từng loại model."""
+    if model_name == 'spoter':
+        return model(inputs).squeeze(1)
+
+    if model_name == 'frame_spoter':
+        # Không có lengths thì mask frame padding được suy ra trong model
+        return model(inputs, lengths=lengths)
+
+    if model_name in ('stgcn', 'student'):
+        # ST-GCN và student nhận trực tiếp tensor dày (B, T, 33, 3)
+        return model(inputs)
+
+    if model_name == 'gcn':
+        # edge_index block-diagonal theo từng frame và batch vector được cache theo (B, T, device)
+        return model(*to_graph_inputs(inputs, temporal_edges))
+
+    raise ValueError(f"Model name {model_name} is not supported.")
 
 
 class Trainer:
-    def __init__(self, model, optimizer, criterion,checkpoint_name,scheduler= None,model_name="spoter",is_pretrain=True):
-        self.device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+    def __init__(self, model, optimizer, criterion,checkpoint_name,scheduler= None,model_name="spoter",is_pretrain=True,augmenter=None,precision="fp32",compile=False,tracker=None,temporal_edges=False):
+        # Chế độ distributed chạy data parallel trên CPU (gloo)
+        self.device = torch.device("cuda" if torch.cuda.is_available() and not is_distributed() else "cpu")
         self.model = model.to(self.device)
+        # model dùng cho forward (có thể đã bọc DDP / compile); state_dict vẫn lấy từ self.model
+        self.forward_model = maybe_compile(wrap_model(self.model), compile)
+        # Đánh giá không cần đồng bộ gradient nên mỗi rank chạy model gốc trên phần dữ liệu của mình
+        self.eval_model = maybe_compile(self.model, compile) if is_distributed() else self.forward_model
+        self.verbose = is_main_process()  # Chỉ rank 0 in log
+        self.precision = precision
+        # GradScaler chỉ cần cho fp16 trên CUDA, bf16 trên CPU không cần
+        self.scaler = torch.amp.GradScaler("cuda", enabled=precision == "autocast" and self.device.type == "cuda")
         self.optimizer = optimizer
         self.criteria = criterion
         self.scheduler = scheduler
         self.best_acc = 0
-        self.all_preds = []
-        self.all_labels = []
+        self.epoch = 0  # Số epoch đã train xong (dùng khi resume)
+        self.checkpoint_writer = None
+        self.confusion = {}  # Confusion matrix của epoch gần nhất cho từng split (train/valid)
         self.is_pretrain = is_pretrain
         self.model_name = model_name
+        self.augmenter = augmenter  # KeypointAugmenter, chỉ áp dụng khi train
+        self.temporal_edges = temporal_edges  # GCN: thêm cạnh nối cùng khớp giữa các frame liên tiếp
+        self.tracker = tracker or Tracker(mode="off")  # Không truyền tracker thì không log metric
         self.cache = {
             "train_loss": [],
             "train_acc": [],
@@ -30,66 +67,84 @@ class Trainer:
 
     def get_edge_index(self):
         """
-        Trả về ma trận kề (edge_index) cho 33 keypoints của Mediapipe.
+        Trả về ma trận kề (edge_index) cho 33 keypoints của Mediapipe (một frame).
         """
-        edges = [
-            (0, 1), (1, 2), (2, 3), (3, 7),  
-            (0, 4), (4, 5), (5, 6), (6, 8),  
-            (9, 10), (11, 12), 
-            (11, 13), (13, 15), (15, 17), (15, 19), (15, 21),  
-            (12, 14), (14, 16), (16, 18), (16, 20), (16, 22),  
-            (11, 23), (12, 24), (23, 24),  
-            (23, 25), (25, 27), (27, 29), (27, 31), (29, 31),  
-            (24, 26), (26, 28), (28, 30), (28, 32), (30, 32)   
-        ]
-        edge_index = torch.tensor(edges, dtype=torch.long).t().contiguous()  # (2, num_edges)
-        return edge_index
+        return get_edge_index()
+
+    def checkpoint_paths(self, checkpoint_dir):
+        """Đường dẫn checkpoint tốt nhất (theo valid accuracy) và checkpoint của epoch gần nhất."""
+        best_path = os.path.join(checkpoint_dir, f"{self.checkpoint_name}.pt")
+        last_path = os.path.join(checkpoint_dir, f"{self.checkpoint_name}_last.pt")
+        return best_path, last_path
+
+    def state_dict(self):
+        return {
+            'model': self.model.state_dict(),
+            'optimizer': self.optimizer.state_dict(),
+            'scheduler': self.scheduler.state_dict() if self.scheduler is not None else None,
+            'scaler': self.scaler.state_dict(),
+            'cache': self.cache,
+            'epoch': self.epoch,
+            'best_acc': self.best_acc,
+            'rng': get_rng_state(),
+            'augmenter': self.augmenter.state_dict() if self.augmenter is not None else None
+        }
 
     def save_checkpoint(self, checkpoint_dir):
-        if not self.cache["valid_acc"]:
+        """
+        Snapshot state về CPU trên thread train rồi giao cho thread nền ghi file (atomic rename).
+        Luôn ghi checkpoint `_last`, ghi đè checkpoint tốt nhất khi valid accuracy không giảm.
+        """
+        if checkpoint_dir is None or not is_main_process():
             return
-        
-        acc = self.cache["valid_acc"][-1]["accuracy"]
-        if acc >= self.best_acc:
-            self.best_acc = acc
-
-            os.makedirs(checkpoint_dir, exist_ok=True)
-            checkpoint_path = os.path.join(checkpoint_dir, f"{self.checkpoint_name}.pt")
-            params = {
-                'model': self.model.state_dict(),
-                'optimizer': self.optimizer.state_dict(),
-                'scheduler': self.scheduler.state_dict() if self.scheduler is not None else None,
-                'cache': self.cache
-            }
-            torch.save(params, checkpoint_path)
+        if self.checkpoint_writer is None:
+            self.checkpoint_writer = CheckpointWriter()
+
+        is_best = False
+        if self.cache["valid_acc"]:
+            acc = self.cache["valid_acc"][-1]["accuracy"]
+            if acc >= self.best_acc:
+                self.best_acc = acc
+                is_best = True
+
+        state = snapshot(self.state_dict())
+        best_path, last_path = self.checkpoint_paths(checkpoint_dir)
+        self.checkpoint_writer.submit(state, last_path)
+        if is_best:
+            self.checkpoint_writer.submit(state, best_path)
         print("[+] Save checkpoint successfully!")
-    
+
+    def wait_checkpoint(self):
+        """Chờ thread nền ghi xong các checkpoint đang chờ."""
+        if self.checkpoint_writer is not None:
+            self.checkpoint_writer.close()
+            self.checkpoint_writer = None
 
     def load_checkpoint(self, path):
-        checkpoint = torch.load(path)
+        checkpoint = torch.load(path, map_location=self.device, weights_only=False)
         self.model.load_state_dict(checkpoint['model'])
         self.optimizer.load_state_dict(checkpoint['optimizer'])
-        self.scheduler.load_state_dict(checkpoint['scheduler'])
+        if self.scheduler is not None and checkpoint.get('scheduler') is not None:
+            self.scheduler.load_state_dict(checkpoint['scheduler'])
+        if checkpoint.get('scaler') is not None:
+            self.scaler.load_state_dict(checkpoint['scaler'])
         self.cache = checkpoint['cache']
-        print("[+] Load checkpoint successfully!")
+        self.epoch = checkpoint.get('epoch', len(self.cache['train_loss']))
+        self.best_acc = checkpoint.get('best_acc', max([acc['accuracy'] for acc in self.cache['valid_acc']], default=0))
+        set_rng_state(checkpoint.get('rng'))
+        if self.augmenter is not None and checkpoint.get('augmenter') is not None:
+            self.augmenter.load_state_dict(checkpoint['augmenter'])
+        print(f"[+] Load checkpoint successfully! (epoch {self.epoch})")
     
 
-    def compute_metrics(self, preds, labels):
-        preds = preds.cpu().numpy() if isinstance(preds, torch.Tensor) else preds
-        labels = labels.cpu().numpy() if isinstance(labels, torch.Tensor) else labels
-
-        accuracy = sum([1 for i, j in zip(preds, labels) if i == j]) / len(labels)
-        precision = metrics.precision_score(labels, preds, average='micro')
-        recall = metrics.recall_score(labels, preds, average='micro')
-        f1 = metrics.f1_score(labels, preds, average='micro')
+    def model_forward(self, inputs, lengths=None):
+        """
+        Chạy model trên batch (B, T, 33, 3) theo từng loại model, trả về logits (B, num_classes).
+        `lengths` (B,) là số frame thật của mỗi clip khi dùng length bucketing.
+        """
+        model = self.forward_model if self.model.training else self.eval_model
+        return run_model(model, self.model_name, inputs, lengths, self.temporal_edges)
 
-        return {
-            'accuracy' : round(accuracy, 10),
-            'precision' : round(precision, 10),
-            'recall' : round(recall, 10),
-            'f1' : round(f1, 10)
-        }
-    
     def forward(self, dataloader, fw_model='train'):
 
         if not isinstance(dataloader, torch.utils.data.DataLoader):
@@ -100,112 +155,138 @@ class Trainer:
         else:
             self.model.eval()
 
-        cache = {'loss': [], 'acc': []}
+        total_loss = torch.zeros((), device=self.device)
+        metrics = None
         N = len(dataloader)
-        edge_index = self.get_edge_index().to(self.device) if self.model_name == 'gcn' else None
         for i , data in enumerate(dataloader, 1):
             if fw_model == 'train':
                 self.optimizer.zero_grad()
             
-            inputs, labels = data
+            # Loader theo bucket độ dài trả về thêm lengths
+            inputs, labels, *lengths = data
             inputs, labels = inputs.to(self.device), labels.to(self.device)
+            lengths = lengths[0].to(self.device) if lengths else None
+            if fw_model == 'train' and self.augmenter is not None:
+                inputs = self.augmenter(inputs)
+                lengths = None  # Đổi tốc độ / bỏ frame làm thay đổi độ dài, để model tự suy ra mask
 
             with torch.set_grad_enabled(fw_model == 'train'):
-                if self.model_name == 'spoter':
-                    #TODO: if spoter model ==> self.model(inputs).squeeze(1)  else: outputs = model(X_batch, edge_index, batch)
-                    outputs = self.model(inputs).squeeze(1)
-                    loss = self.criteria(outputs, labels)
-                    preds = outputs.argmax(dim=1)
-                
-                elif self.model_name == 'gcn':
-                    batch_size, num_frames, num_keypoints, keypoint_dim = inputs.shape
-                    inputs = inputs.view(batch_size * num_frames * num_keypoints, keypoint_dim)
-                    
-                    # Tạo batch tensor phù hợp
-                    batch = torch.arange(batch_size, device=self.device).repeat_interleave(num_frames * num_keypoints)
-                    
-                    # Đảm bảo edge_index không bị None
-                    if edge_index is None:
-                        raise ValueError("Edge index is required for GCN model but was not provided.")
-                    
-                    outputs = self.model(inputs, edge_index, batch)
-                    loss = self.criteria(outputs, labels.long())
-                    preds = outputs.argmax(dim=1)
-                else:
-                    raise ValueError(f"Model name {self.model_name} is not supported.")
-
-                self.all_preds.extend(preds.cpu().tolist())
-                self.all_labels.extend(labels.cpu().tolist())
+                with autocast_context(self.device, self.precision):
+                    outputs = self.model_forward(inputs, lengths)
+                outputs = outputs.float()
+                loss = self.criteria(outputs, labels.long())
+                preds = outputs.argmax(dim=1)
 
                 if fw_model == 'train':
-                    loss.backward()
-                    self.optimizer.step()
-            
-            cache['loss'].append(loss.item())
-            acc = self.compute_metrics(preds, labels)
-            cache['acc'].append(acc)
+                    self.scaler.scale(loss).backward()
+                    self.scaler.step(self.optimizer)
+                    self.scaler.update()
+
+            # Confusion matrix nằm trên device, cập nhật bằng một lần bincount mỗi batch
+            if metrics is None:
+                metrics = MetricsAccumulator(outputs.shape[-1], self.device)
+            metrics.update(preds, labels)
+            total_loss += loss.detach()
+
+            # Chỉ đồng bộ về CPU để in accuracy ở bước cuối của epoch
+            if not self.verbose:
+                continue
             print("\r",end="")
-            print(f"{fw_model.capitalize()} step: {i} / {N} - Acc: {acc['accuracy']}", end="" if i != N else "\n")
-        
-        loss = sum(cache['loss']) / len(cache['loss'])
-        acc = [[i["accuracy"] for i in cache["acc"]], [i["precision"] for i in cache["acc"]], [i["recall"] for i in cache["acc"]], [i["f1"] for i in cache["acc"]]]
-        acc = {
-            "accuracy": round(sum(acc[0]) / len(acc[0]), 10),
-            "precision": round(sum(acc[1]) / len(acc[1]), 10),
-            "recall": round(sum(acc[2]) / len(acc[2]), 10),
-            "f1": round(sum(acc[3]) / len(acc[3]), 10)
-        }
+            if i != N:
+                print(f"{fw_model.capitalize()} step: {i} / {N}", end="")
+            else:
+                print(f"{fw_model.capitalize()} step: {i} / {N} - Acc: {round(metrics.accuracy(), 10)}")
+
+        # Khi distributed, một rank có thể không nhận sample nào (tập nhỏ hơn số rank) nhưng vẫn phải
+        # tham gia các all-reduce bên dưới, nên lấy số class từ các rank khác thay vì báo lỗi
+        num_classes = all_reduce_max(torch.tensor(metrics.num_classes if metrics is not None else 0, device=self.device))
+        if int(num_classes) == 0:
+            raise ValueError(f"Empty {fw_model} dataloader")
+        if metrics is None:
+            metrics = MetricsAccumulator(int(num_classes), self.device)
+
+        # Gộp loss và confusion matrix của mọi rank (không làm gì khi chạy một process)
+        loss_stats = all_reduce_sum(torch.stack([total_loss.float(), torch.tensor(float(N), device=self.device)]))
+        loss = (loss_stats[0] / loss_stats[1].clamp(min=1)).item()
+        metrics.confusion = all_reduce_sum(metrics.confusion)
+        acc = metrics.compute()
+        self.confusion[fw_model] = metrics.confusion.cpu()
 
         self.cache[f"{fw_model}_loss"].append(loss)
         self.cache[f"{fw_model}_acc"].append(acc)
     
 
-    def fit(self, trainloader, valid_loader= None, epochs=2 , checkpoint=None):
-        print(f"Running on: {torch.cuda.get_device_name(torch.cuda.current_device())}")
-        print(f"Total update step: {len(trainloader) * epochs}")
+    def fit(self, trainloader, valid_loader= None, epochs=2 , checkpoint=None, resume=False, epoch_callback=None):
+        """
+        `epoch_callback(epoch, trainer)` được gọi sau mỗi epoch; trả về True để dừng train sớm (vd. sweep pruning).
+        Callback đọc `trainer.cache` và log qua `trainer.tracker`, không gọi MLflow trực tiếp.
+        """
+        if resume and checkpoint is not None:
+            _, last_path = self.checkpoint_paths(checkpoint)
+            if os.path.exists(last_path):
+                self.load_checkpoint(last_path)
+            else:
+                print(f"[!] No checkpoint to resume at {last_path}, training from scratch")
+
+        if self.verbose:
+            if self.device.type == "cuda":
+                print(f"Running on: {torch.cuda.get_device_name(self.device)}")
+            else:
+                print(f"Running on: CPU ({torch.get_num_threads()} threads) x {get_world_size()} process(es)")
+            print(f"Total update step: {len(trainloader) * (epochs - self.epoch)}")
+
+        try:
+            for epoch in range(self.epoch + 1, epochs + 1):
+                self.fit_epoch(trainloader, valid_loader, epoch, checkpoint)
+                if epoch_callback is not None and epoch_callback(epoch, self):
+                    print(f"[!] Stop training early at epoch {epoch}")
+                    break
+        finally:
+            self.wait_checkpoint()
 
-        for epoch in range(1, epochs + 1):
-            start_time = time.time()
+    def fit_epoch(self, trainloader, valid_loader, epoch, checkpoint=None):
+        """Train một epoch, đánh giá trên tập valid (nếu có) rồi lưu checkpoint."""
+        start_time = time.time()
+        set_epoch(trainloader, epoch)
+        if self.verbose:
             print(f"Epoch: {epoch}")
-            logs = []
-            current_lr = f"{self.optimizer.param_groups[0]['lr']:e}"
+        logs = []
+        current_lr = f"{self.optimizer.param_groups[0]['lr']:e}"
 
-            try:
-                self.forward(trainloader, 'train')
-                train_loss = round(self.cache['train_loss'][-1], 5)
-                train_acc = self.cache['train_acc'][-1]
+        try:
+            self.forward(trainloader, 'train')
+            train_loss = round(self.cache['train_loss'][-1], 5)
+            train_acc = self.cache['train_acc'][-1]
 
-                mlflow.log_metric('train_loss', train_loss, step=epoch)
-                for metric_name, metric_value in train_acc.items():
-                    mlflow.log_metric(f'train_{metric_name}', metric_value, step=epoch)
+            self.tracker.log_metrics({'train_loss': train_loss} | {f'train_{k}': v for k, v in train_acc.items()}, step=epoch)
 
 
-                train_acc = [str(k) + ": " + str(v) for k, v in self.cache['train_acc'][-1].items()]
-                train_acc = " - ".join(train_acc)
-                logs.append(f"\t=> Train epoch: loss: {train_loss} - {train_acc}")
+            train_acc = [str(k) + ": " + str(v) for k, v in self.cache['train_acc'][-1].items()]
+            train_acc = " - ".join(train_acc)
+            logs.append(f"\t=> Train epoch: loss: {train_loss} - {train_acc}")
 
-            except KeyboardInterrupt:
-                sys.exit()
+        except KeyboardInterrupt:
+            sys.exit()
 
-            if valid_loader is not None:
-                try:
-                    self.forward(valid_loader, 'valid') 
-                    valid_loss = round(self.cache['valid_loss'][-1], 5)
-                    valid_acc = self.cache['valid_acc'][-1]
+        if valid_loader is not None:
+            try:
+                self.forward(valid_loader, 'valid') 
+                valid_loss = round(self.cache['valid_loss'][-1], 5)
+                valid_acc = self.cache['valid_acc'][-1]
 
-                    mlflow.log_metric('valid_loss', valid_loss, step=epoch)
-                    for metric_name, metric_value in valid_acc.items():
-                        mlflow.log_metric(f'valid_{metric_name}', metric_value, step=epoch)
+                self.tracker.log_metrics({'valid_loss': valid_loss} | {f'valid_{k}': v for k, v in valid_acc.items()}, step=epoch)
 
-                    valid_acc = [str(k) + ": " + str(v) for k, v in self.cache['valid_acc'][-1].items()]
-                    valid_acc = " - ".join(valid_acc)
-                    logs.append(f"\t=> Valid epoch: loss: {valid_loss} - {valid_acc}")
+                valid_acc = [str(k) + ": " + str(v) for k, v in self.cache['valid_acc'][-1].items()]
+                valid_acc = " - ".join(valid_acc)
+                logs.append(f"\t=> Valid epoch: loss: {valid_loss} - {valid_acc}")
 
-                except KeyboardInterrupt:
-                    sys.exit()
+            except KeyboardInterrupt:
+                sys.exit()
 
-            total_time = round(time.time() - start_time)
-            logs.append(f"\t=> Learning Rate: {current_lr} - Time: {timedelta(seconds=int(total_time))}/step\n")
+        total_time = round(time.time() - start_time)
+        logs.append(f"\t=> Learning Rate: {current_lr} - Time: {timedelta(seconds=int(total_time))}/step\n")
+        if self.verbose:
             print("\n".join(logs))
-            self.cache["lr"].append(current_lr)
-            self.save_checkpoint(checkpoint)      
\ No newline at end of file
+        self.cache["lr"].append(current_lr)
+        self.epoch = epoch
+        self.save_checkpoint(checkpoint)      
\ No newline at end of file
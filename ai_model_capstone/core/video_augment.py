@@ -1,226 +1,213 @@
 import cv2
 import numpy as np
-import random
 import os
-
-class PublicVideoAugmentationMethod1:
-    def __init__(self, video_path):
-        self.video_path = video_path
-        self.frames = self._load_video()
-
-    def _load_video(self):
-        """ Load video và trích xuất các frame """
-        cap = cv2.VideoCapture(self.video_path)
-
-        if not cap.isOpened():
-            raise ValueError(f"Không thể mở video: {self.video_path}")
-
-        frames = []
-        while cap.isOpened():
+import json
+import zlib
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
+
+AUGMENTATIONS = ("rotation", "flip", "speedup", "dropout")
+MANIFEST_NAME = "augment_manifest.json"
+
+
+def rotation_maps(width, height, angle):
+    """
+    Tính trước map remap cho phép xoay quanh tâm frame (tương đương warpAffine),
+    để mỗi frame chỉ còn một lần cv2.remap với map dạng fixed-point.
+    """
+    M = cv2.getRotationMatrix2D((width // 2, height // 2), angle, 1.0)
+    M_inv = cv2.invertAffineTransform(M)
+    xs, ys = np.meshgrid(np.arange(width, dtype=np.float32), np.arange(height, dtype=np.float32))
+    map_x = M_inv[0, 0] * xs + M_inv[0, 1] * ys + M_inv[0, 2]
+    map_y = M_inv[1, 0] * xs + M_inv[1, 1] * ys + M_inv[1, 2]
+    return cv2.convertMaps(map_x.astype(np.float32), map_y.astype(np.float32), cv2.CV_16SC2)
+
+
+def augmentation_output_files(output_class_path, base_name):
+    return {aug_type: os.path.join(output_class_path, f"{base_name}_{aug_type}.mp4") for aug_type in AUGMENTATIONS}
+
+
+def _augmentation_counts(aug_type, num_frames, rng, speed_factor=1.2, drop_ratio=0.2):
+    """Số lần mỗi frame nguồn được ghi ra output của một augmentation."""
+    indices = np.arange(num_frames)
+    if aug_type == "speedup":
+        indices = np.linspace(0, num_frames - 1, int(num_frames * speed_factor), dtype=int)
+    elif aug_type == "dropout":
+        drop_indices = rng.choice(num_frames, int(num_frames * drop_ratio), replace=False)
+        indices = np.delete(indices, drop_indices)
+    return np.bincount(indices, minlength=num_frames)
+
+
+def probe_frame_count(video_path):
+    """ Kiểm tra video mở được và lấy số frame (không decode toàn bộ video) """
+    cap = cv2.VideoCapture(video_path)
+    if not cap.isOpened():
+        raise ValueError(f"Không thể mở video: {video_path}")
+
+    num_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    if num_frames <= 0:
+        # Một số container không ghi số frame, đếm bằng grab() (không decode ảnh)
+        num_frames = 0
+        while cap.grab():
+            num_frames += 1
+    cap.release()
+
+    if num_frames == 0:
+        raise ValueError(f"Không có frame nào được trích xuất từ video: {video_path}")
+    return num_frames
+
+
+def partial_path(path):
+    """File tạm khi đang ghi (giữ đuôi .mp4 để VideoWriter chọn đúng container)."""
+    root, ext = os.path.splitext(path)
+    return f"{root}.part{ext}"
+
+
+def augment_video_once(video_path, output_files, target_size=None, angle=10, fps=30, seed=0):
+    """
+    Decode video nguồn đúng một lần và đưa mỗi frame vào tất cả augmentation/VideoWriter
+    cùng lúc. Chỉ tạo những output chưa tồn tại. Trả về danh sách output đã ghi.
+    Mỗi output được ghi vào file tạm rồi os.replace khi xong, nên lỗi giữa chừng
+    không để lại file .mp4 dở dang (lần chạy sau sẽ tạo lại).
+    """
+    pending = {aug_type: path for aug_type, path in output_files.items() if not os.path.exists(path)}
+    if not pending:
+        return []
+
+    num_frames = probe_frame_count(video_path)
+    cap = cv2.VideoCapture(video_path)
+
+    rng = np.random.default_rng(seed)
+    counts = {aug_type: _augmentation_counts(aug_type, num_frames, rng) for aug_type in pending}
+    writers = {}
+    maps = None
+    completed = False
+
+    try:
+        for idx in range(num_frames):
             ret, frame = cap.read()
             if not ret:
                 break
-            frames.append(frame)
 
+            if target_size is not None:
+                frame = cv2.resize(frame, target_size, interpolation=cv2.INTER_AREA)
+            h, w = frame.shape[:2]
+
+            for aug_type, aug_counts in counts.items():
+                if aug_counts[idx] == 0:
+                    continue
+
+                if aug_type == "rotation":
+                    if maps is None:
+                        maps = rotation_maps(w, h, angle)
+                    out_frame = cv2.remap(frame, maps[0], maps[1], cv2.INTER_LINEAR)
+                elif aug_type == "flip":
+                    out_frame = cv2.flip(frame, 1)
+                else:
+                    out_frame = frame
+
+                if aug_type not in writers:
+                    writers[aug_type] = cv2.VideoWriter(partial_path(pending[aug_type]), cv2.VideoWriter_fourcc(*'mp4v'), fps, (w, h))
+                for _ in range(aug_counts[idx]):
+                    writers[aug_type].write(out_frame)
+        completed = True
+    finally:
         cap.release()
-
-        if len(frames) == 0:
-            raise ValueError(f"Không có frame nào được trích xuất từ video: {self.video_path}")
-
-        return np.array(frames)
-
-    def rotation(self, angle=15):
-        h, w = self.frames[0].shape[:2]
-        center = (w // 2, h // 2)
-        M = cv2.getRotationMatrix2D(center, angle, 1.0)
-        self.frames = np.array([cv2.warpAffine(frame, M, (w, h)) for frame in self.frames])
-        return self
-
-    def horizontal_flip(self):
-        self.frames = np.array([cv2.flip(frame, 1) for frame in self.frames])
-        return self
-
-    def change_speed(self, speed_factor=1.2):
-        num_frames = int(len(self.frames) * speed_factor)
-        indices = np.linspace(0, len(self.frames) - 1, num_frames, dtype=int)
-        self.frames = self.frames[indices]
-        return self
-
-    def frame_dropout(self, drop_ratio=0.2):
-        num_frames = len(self.frames)
-        num_drop = int(num_frames * drop_ratio)
-        drop_indices = random.sample(range(num_frames), num_drop)
-        self.frames = np.delete(self.frames, drop_indices, axis=0)
-        return self
-
-    def save_video(self, output_path, fps=30):
-        if os.path.exists(output_path):
-            print(f"Video {output_path} đã tồn tại, bỏ qua...")
-            return
-
-        fourcc = cv2.VideoWriter_fourcc(*'mp4v')
-        h, w = self.frames[0].shape[:2]
-        out = cv2.VideoWriter(output_path, fourcc, fps, (w, h))
-
-        for frame in self.frames:
-            out.write(frame)
-        out.release()
-        print(f"Augmented video saved to {output_path}")
-
-class PublicVideoAugmentationMethod2:
-    def __init__(self, video_path):
-        self.video_path = video_path
-        self.original_frames = self._load_video()
-        self.frames = self.original_frames.copy()
-
-    def _load_video(self):
-        """ Load video và trích xuất các frame """
-        cap = cv2.VideoCapture(self.video_path)
-
-        if not cap.isOpened():
-            raise ValueError(f"Không thể mở video: {self.video_path}")
-
-        frames = []
-        target_size = (1080, 1920)  # OpenCV nhận (width, height)
-        
-        while cap.isOpened():
-            ret, frame = cap.read()
-            if not ret:
-                break
-            
-            frame_resized = cv2.resize(frame, target_size, interpolation=cv2.INTER_AREA)
-            frames.append(frame_resized)
-
-        cap.release()
-
-        if len(frames) == 0:
-            raise ValueError(f"Không có frame nào được trích xuất từ video: {self.video_path}")
-        
-        frames_array = np.array(frames, dtype=np.uint8)
-        print(f"Kích thước frame sau khi resize: {frames_array.shape}")  # Debug
-        return frames_array
-
-    def rotation(self, angle=15):
-        self.reset_frames()
-        h, w = self.frames[0].shape[:2]
-        center = (w // 2, h // 2)
-        M = cv2.getRotationMatrix2D(center, angle, 1.0)
-        self.frames = np.array([cv2.warpAffine(frame, M, (w, h)) for frame in self.frames], dtype=np.uint8)
-        return self
-
-    def horizontal_flip(self):
-        self.reset_frames()
-        self.frames = np.array([cv2.flip(frame, 1) for frame in self.frames], dtype=np.uint8)
-        return self
-
-    def change_speed(self, speed_factor=1.2):
-        self.reset_frames()
-        num_frames = int(len(self.frames) * speed_factor)
-        indices = np.linspace(0, len(self.frames) - 1, num_frames, dtype=int)
-        self.frames = self.frames[indices]
-        return self
-
-    def frame_dropout(self, drop_ratio=0.2):
-        self.reset_frames()
-        num_frames = len(self.frames)
-        num_drop = int(num_frames * drop_ratio)
-        drop_indices = random.sample(range(num_frames), num_drop)
-        self.frames = np.delete(self.frames, drop_indices, axis=0)
-        return self
-
-    def save_video(self, output_path, fps=30):
-        if os.path.exists(output_path):
-            print(f"Video {output_path} đã tồn tại, bỏ qua...")
-            return
-
-        fourcc = cv2.VideoWriter_fourcc(*'mp4v')
-        h, w = self.frames[0].shape[:2]
-        out = cv2.VideoWriter(output_path, fourcc, fps, (w, h))
-
-        for frame in self.frames:
-            out.write(frame)
-        out.release()
-        print(f"Augmented video saved to {output_path}")
-
-
-
-class PrivateVideoAugmentation:
-    def __init__(self, video_path):
-        self.video_path = video_path
-        self.original_frames = self._load_video()  # Lưu frames gốc
-        self.frames = self.original_frames.copy()  # Bản sao để augment
-
-    def _load_video(self):
-        """ Load video và trích xuất các frame """
-        cap = cv2.VideoCapture(self.video_path)
-        if not cap.isOpened():
-            raise ValueError(f"Không thể mở video: {self.video_path}")
-
-        frames = []
-        while cap.isOpened():
-            ret, frame = cap.read()
-            if not ret:
-                break
-            frames.append(frame)
-
-        cap.release()
-        if len(frames) == 0:
-            raise ValueError(f"Không có frame nào được trích xuất từ video: {self.video_path}")
-
-        return np.array(frames)
-
-    def reset_frames(self):
-        """ Reset frames về trạng thái gốc trước khi augment """
-        self.frames = self.original_frames.copy()
-
-    def rotation(self, angle=15):
-        self.reset_frames()  # Reset về frames gốc
-        h, w = self.frames[0].shape[:2]
-        center = (w // 2, h // 2)
-        M = cv2.getRotationMatrix2D(center, angle, 1.0)
-        self.frames = np.array([cv2.warpAffine(frame, M, (w, h)) for frame in self.frames])
-        return self
-
-    def horizontal_flip(self):
-        self.reset_frames()  # Reset về frames gốc
-        self.frames = np.array([cv2.flip(frame, 1) for frame in self.frames])
-        return self
-
-    def change_speed(self, speed_factor=1.2):
-        self.reset_frames()  # Reset về frames gốc
-        num_frames = int(len(self.frames) * speed_factor)
-        indices = np.linspace(0, len(self.frames) - 1, num_frames, dtype=int)
-        self.frames = self.frames[indices]
-        return self
-
-    def frame_dropout(self, drop_ratio=0.2):
-        self.reset_frames()  # Reset về frames gốc
-        num_frames = len(self.frames)
-        num_drop = int(num_frames * drop_ratio)
-        drop_indices = random.sample(range(num_frames), num_drop)
-        self.frames = np.delete(self.frames, drop_indices, axis=0)
-        return self
-
-    def save_video(self, output_path, fps=30):
-        if os.path.exists(output_path):
-            print(f"Video {output_path} đã tồn tại, bỏ qua...")
-            return
-
-        fourcc = cv2.VideoWriter_fourcc(*'mp4v')
-        h, w = self.frames[0].shape[:2]
-        out = cv2.VideoWriter(output_path, fourcc, fps, (w, h))
-
-        for frame in self.frames:
-            out.write(frame)
-        out.release()
-        print(f"Augmented video saved to {output_path}")
-
-
-def process_videos(input_folder, output_folder, is_method2):
-    error_log = []
-    if not os.path.exists(output_folder):
-        os.makedirs(output_folder)
-
+        for writer in writers.values():
+            writer.release()
+        if not completed:
+            for aug_type in writers:
+                if os.path.exists(partial_path(pending[aug_type])):
+                    os.remove(partial_path(pending[aug_type]))
+
+    if not writers:
+        raise ValueError(f"Không có frame nào được trích xuất từ video: {video_path}")
+    for aug_type in writers:
+        os.replace(partial_path(pending[aug_type]), pending[aug_type])
+    return [pending[aug_type] for aug_type in writers]
+
+
+def _augment_job(job):
+    """Chạy trong process con: augment một video, trả về bản ghi cho manifest."""
+    video_path, output_files, target_size = job
+    record = {"outputs": output_files, "status": "ok", "written": [], "error": None}
+    try:
+        seed = zlib.crc32(os.path.basename(video_path).encode())
+        record["written"] = augment_video_once(video_path, output_files, target_size=target_size, seed=seed)
+    except Exception as e:
+        record["status"] = "failed"
+        record["error"] = f"{type(e).__name__}: {e}"
+    return video_path, record
+
+
+def _init_worker():
+    # Mỗi process tự xử lý một video, tránh OpenCV tạo thêm thread cạnh tranh CPU
+    cv2.setNumThreads(1)
+
+
+class AugmentationExecutor:
+    """
+    Phân phối việc augment các video lên process pool; mỗi video chỉ decode một lần.
+    Kết quả (output đã ghi, lỗi) được lưu vào manifest JSON trong thư mục output.
+    """
+
+    def __init__(self, output_folder, is_method2=False, workers=None):
+        self.output_folder = output_folder
+        self.target_size = (1080, 1920) if is_method2 else None  # (width, height), OpenCV nhận (width, height)
+        self.workers = workers or os.cpu_count()
+        self.manifest_path = os.path.join(output_folder, MANIFEST_NAME)
+        self.manifest = self._load_manifest()
+
+    def _load_manifest(self):
+        if os.path.exists(self.manifest_path):
+            with open(self.manifest_path, "r") as f:
+                return json.load(f)
+        return {"videos": {}}
+
+    def save_manifest(self):
+        self.manifest["updated_at"] = datetime.now().isoformat(timespec="seconds")
+        tmp_path = self.manifest_path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self.manifest, f, indent=4)
+        os.replace(tmp_path, self.manifest_path)
+
+    def failed_videos(self):
+        return [path for path, record in self.manifest["videos"].items() if record["status"] == "failed"]
+
+    def clear_resolved_failures(self):
+        """Đánh dấu ok những video từng lỗi nhưng nay đã có đủ output. Trả về số video được cập nhật."""
+        resolved = 0
+        for record in self.manifest["videos"].values():
+            if record["status"] == "failed" and all(os.path.exists(path) for path in record["outputs"].values()):
+                record["status"] = "ok"
+                record["error"] = None
+                resolved += 1
+        return resolved
+
+    def run(self, jobs):
+        jobs = [(video_path, output_files, self.target_size) for video_path, output_files in jobs]
+        if not jobs:
+            if self.clear_resolved_failures():
+                self.save_manifest()
+            return self.manifest
+
+        with ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker) as pool:
+            for video_path, record in pool.map(_augment_job, jobs):
+                self.manifest["videos"][video_path] = record
+                if record["status"] == "failed":
+                    print(f"Lỗi với file {video_path}: {record['error']}")
+                else:
+                    print(f"Augmented {video_path}: {len(record['written'])} video mới")
+
+        self.clear_resolved_failures()
+        self.save_manifest()
+        print(f"Manifest đã được lưu vào {self.manifest_path}")
+        return self.manifest
+
+
+def collect_augmentation_jobs(input_folder, output_folder, only=None):
+    """Liệt kê (video_path, output_files) cần augment; `only` giới hạn theo danh sách video."""
+    jobs = []
     for class_folder in os.listdir(input_folder):
         class_path = os.path.join(input_folder, class_folder)
         output_class_path = os.path.join(output_folder, class_folder)
@@ -228,146 +215,42 @@ def process_videos(input_folder, output_folder, is_method2):
         if not os.path.isdir(class_path):
             continue  # Bỏ qua nếu không phải thư mục
 
-        if not os.path.exists(output_class_path):
-            os.makedirs(output_class_path)
+        os.makedirs(output_class_path, exist_ok=True)
 
         for video_file in os.listdir(class_path):
             if not video_file.endswith(".mp4"):
-                continue  
-            
+                continue
+
             video_path = os.path.join(class_path, video_file)
-            base_name = os.path.splitext(video_file)[0]  # Lấy tên file không có đuôi .mp4
+            if only is not None and video_path not in only:
+                continue
 
-            output_files = {
-                "rotation": os.path.join(output_class_path, f"{base_name}_rotation.mp4"),
-                "flip": os.path.join(output_class_path, f"{base_name}_flip.mp4"),
-                "speedup": os.path.join(output_class_path, f"{base_name}_speedup.mp4"),
-                "dropout": os.path.join(output_class_path, f"{base_name}_dropout.mp4"),
-            }
+            base_name = os.path.splitext(video_file)[0]  # Lấy tên file không có đuôi .mp4
+            output_files = augmentation_output_files(output_class_path, base_name)
 
             # Nếu tất cả augmentations đã tồn tại, bỏ qua file này
             if all(os.path.exists(path) for path in output_files.values()):
                 print(f"Tất cả video augment của {video_file} đã tồn tại, bỏ qua...")
                 continue
 
-            try:
-                # Chọn phương pháp augmentation phù hợp
-                augmenter_public = PublicVideoAugmentationMethod2(video_path) if is_method2 else PublicVideoAugmentationMethod1(video_path)
-                augmenter_private = PrivateVideoAugmentation(video_path)
-                # augmenter_private = PublicVideoAugmentationMethod1(video_path)
-
-                # Danh sách augmenter để lặp qua
-                augmenters = [augmenter_public, augmenter_private]
-                # augmenters = [augmenter_private]
-
-                # Danh sách augmentations cần thực hiện
-                augmentations = {
-                    "rotation": lambda augmenter: augmenter.rotation(angle=10),
-                    "flip": lambda augmenter: augmenter.horizontal_flip(),
-                    "speedup": lambda augmenter: augmenter.change_speed(speed_factor=1.2),
-                    "dropout": lambda augmenter: augmenter.frame_dropout(drop_ratio=0.2)
-                }
-
-                # Lặp qua từng augmenter (public/private) để chạy augmentation
-                for augmenter in augmenters:
-                    for aug_type, aug_function in augmentations.items():
-                        if not os.path.exists(output_files[aug_type]):
-                            try:
-                                aug_function(augmenter).save_video(output_files[aug_type])
-                            except Exception as e:
-                                print(f"Lỗi khi augment {aug_type} trên file {video_path}: {str(e)}")
-                                error_log.append(video_path)
-
-            except (ValueError, MemoryError, np.core._exceptions._ArrayMemoryError) as e:
-                print(f"Lỗi với file {video_file}: {str(e)}")
-                error_log.append(video_path)
-                continue
-
-    # Ghi danh sách các file lỗi vào error_log.txt
-    if error_log:
-        with open("error_log.txt", "w") as f:
-            for error_file in error_log:
-                f.write(error_file + "\n")
-        print("Danh sách file lỗi đã được lưu vào error_log.txt")
-
-def process_error_video(input_folder, output_folder, error_file, is_method2):
-    error_log = []
-    
-    # Tạo thư mục output nếu chưa tồn tại
-    if not os.path.exists(output_folder):
-        os.makedirs(output_folder)
-
-    # Đọc danh sách video bị lỗi từ error_file
-    with open(error_file, "r") as f:
-        error_files = set(f.read().splitlines())  # Dùng set để tìm nhanh hơn
-
-    # Duyệt qua tất cả các thư mục lớp trong input_folder
-    for class_folder in os.listdir(input_folder):
-        class_path = os.path.join(input_folder, class_folder)
-        output_class_path = os.path.join(output_folder, class_folder)
-
-        if not os.path.isdir(class_path):
-            continue  # Bỏ qua nếu không phải thư mục
+            jobs.append((video_path, output_files))
+    return jobs
 
-        # Tạo thư mục output cho từng class nếu chưa tồn tại
-        if not os.path.exists(output_class_path):
-            os.makedirs(output_class_path)
-
-        # Duyệt qua từng file trong class_folder
-        for video_file in os.listdir(class_path):
-            if video_file not in error_files:
-                continue  # Bỏ qua nếu file không nằm trong danh sách lỗi
-            
-            video_path = os.path.join(class_path, video_file)
-            base_name = os.path.splitext(video_file)[0]  # Lấy tên file không có đuôi .mp4
 
-            output_files = {
-                "rotation": os.path.join(output_class_path, f"{base_name}_rotation.mp4"),
-                "flip": os.path.join(output_class_path, f"{base_name}_flip.mp4"),
-                "speedup": os.path.join(output_class_path, f"{base_name}_speedup.mp4"),#slowdown
-                "dropout": os.path.join(output_class_path, f"{base_name}_dropout.mp4"),
-            }
+def process_videos(input_folder, output_folder, is_method2, workers=None):
+    os.makedirs(output_folder, exist_ok=True)
+    executor = AugmentationExecutor(output_folder, is_method2=is_method2, workers=workers)
+    return executor.run(collect_augmentation_jobs(input_folder, output_folder))
 
-            # Kiểm tra nếu tất cả video augment đã tồn tại, thì bỏ qua
-            if all(os.path.exists(path) for path in output_files.values()):
-                print(f"Tất cả video augment của {video_file} đã tồn tại, bỏ qua...")
-                continue
 
-            try:
-                # Chọn phương pháp augmentation phù hợp
-                augmenter_public = PublicVideoAugmentationMethod2(video_path) if is_method2 else PublicVideoAugmentationMethod1(video_path)
-                augmenter_private = PrivateVideoAugmentation(video_path)
-
-                # Danh sách augmenter để lặp qua
-                augmenters = [augmenter_public, augmenter_private]
-
-                # Danh sách augmentations cần thực hiện
-                augmentations = {
-                    "rotation": lambda augmenter: augmenter.rotation(angle=10),
-                    "flip": lambda augmenter: augmenter.horizontal_flip(),
-                    "speedup": lambda augmenter: augmenter.change_speed(speed_factor=1.2),
-                    "dropout": lambda augmenter: augmenter.frame_dropout(drop_ratio=0.2)
-                }
-
-                # Lặp qua từng augmenter (public/private) để chạy augmentation
-                for augmenter in augmenters:
-                    for aug_type, aug_function in augmentations.items():
-                        if not os.path.exists(output_files[aug_type]):
-                            try:
-                                aug_function(augmenter).save_video(output_files[aug_type])
-                            except Exception as e:
-                                print(f"Lỗi khi augment {aug_type} trên file {video_path}: {str(e)}")
-                                error_log.append(video_path)
-
-            except (ValueError, MemoryError, np.core._exceptions._ArrayMemoryError) as e:
-                print(f"Lỗi với file {video_file}: {str(e)}")
-                error_log.append(video_path)
-
-    # Ghi lại danh sách file vẫn lỗi sau khi thử lại
-    if error_log:
-        with open(error_file, "w") as f:
-            f.write("\n".join(error_log))
-        print("Danh sách file lỗi đã được cập nhật trong error_file.txt")
+def process_error_video(input_folder, output_folder, is_method2, workers=None):
+    """Chạy lại những video bị lỗi được ghi trong manifest."""
+    executor = AugmentationExecutor(output_folder, is_method2=is_method2, workers=workers)
+    failed = set(executor.failed_videos())
+    if not failed:
+        print("Không có video lỗi trong manifest")
+        return executor.manifest
+    return executor.run(collect_augmentation_jobs(input_folder, output_folder, only=failed))
 
 
 def main():
@@ -375,6 +258,7 @@ def main():
     IS_PRIVATE = False # True nếu là private data, False nếu là public data
     ERROR_FILE = True
     IS_METHOD2 = True # True nếu sử dụng phương pháp augmentation 2, False nếu sử dụng phương pháp augmentation 1, dùng cho bộ public
+    WORKERS = None # Số process, None = số CPU
 
     data_type = "private_data" if IS_PRIVATE else "public_data" #Public_data
     # input_path = os.path.join(os.getcwd(), "data", "method_1", "raw_video", data_type, "val" if IS_PRIVATE else "val")
@@ -384,12 +268,11 @@ def main():
     output_path = "/processed_video/train_method_1"
     
     # Xử lý video chính
-    process_videos(input_path, output_path, is_method2=IS_METHOD2)
+    process_videos(input_path, output_path, is_method2=IS_METHOD2, workers=WORKERS)
 
-    # Nếu cần xử lý lỗi, chạy process_error_video()
+    # Nếu cần xử lý lỗi, chạy lại các video lỗi trong manifest
     # if ERROR_FILE:
-    #     error_file = os.path.join(os.getcwd(), "error", "error_log.txt")
-    #     process_error_video(input_path, output_path, error_file, is_private=IS_PRIVATE)
+    #     process_error_video(input_path, output_path, is_method2=IS_METHOD2, workers=WORKERS)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,185 @@
+"""
+Knowledge distillation từ các teacher đã fine-tune (SPOTER, GCN, ...) sang student KeypointTCN nhỏ để phân loại
+ngay trên điện thoại, export student sang TorchScript / ONNX và so sánh accuracy + latency CPU với các teacher.
+
+    python distill.py --teacher spoter=checkpoints/spoter/finetune/a.pt gcn=checkpoints/gcn/finetune/b.pt
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import statistics
+import mlflow
+import torch
+import torch.optim as optim
+from config import Config
+from core.model import get_model
+from core.dataset import YogaDataset
+from core.distributed import make_loader
+from core.keypoint_augment import KeypointAugmenter
+from core.tracking import Tracker
+from core.trainer import run_model
+from core.distill import load_teacher, DistillationLoss, DistillTrainer, export_student
+from core.utils import create_experiment
+
+
+def parse_teachers(values):
+    teachers = {}
+    for value in values or []:
+        name, _, path = value.partition("=")
+        if not path:
+            raise ValueError(f"Expected <model>=<path>, got {value}")
+        teachers[name] = path
+    return teachers
+
+
+@torch.no_grad()
+def evaluate(model, model_name, loader, temporal_edges=False):
+    """Accuracy trên tập validation (CPU)."""
+    model.eval()
+    correct = total = 0
+    for inputs, labels, *lengths in loader:
+        outputs = run_model(model, model_name, inputs, lengths[0] if lengths else None, temporal_edges)
+        correct += (outputs.argmax(dim=1) == labels).sum().item()
+        total += len(labels)
+    return correct / max(total, 1)
+
+
+@torch.no_grad()
+def latency_ms(fn, sample, warmup=5, iters=30):
+    """Median latency (ms) khi dự đoán một clip (batch 1) trên CPU."""
+    times = []
+    for i in range(warmup + iters):
+        start = time.perf_counter()
+        fn(sample)
+        if i >= warmup:
+            times.append((time.perf_counter() - start) * 1000)
+    return statistics.median(times)
+
+
+def load_exported(path, export_format):
+    """Hàm dự đoán từ file đã export; None nếu thiếu runtime (onnxruntime)."""
+    if export_format == "torchscript":
+        return torch.jit.load(path, map_location="cpu")
+    try:
+        import onnxruntime as ort
+    except ImportError:
+        print("[!] onnxruntime is not installed, skip latency of the exported ONNX model")
+        return None
+    session = ort.InferenceSession(path, providers=["CPUExecutionProvider"])
+    return lambda x: session.run(None, {"keypoints": x.numpy()})[0]
+
+
+def compare(models, loader, temporal_edges, export_path, export_format, warmup, iters):
+    """Số tham số, accuracy valid và latency CPU batch 1 của các teacher và student."""
+    sample = torch.as_tensor(loader.dataset[0][0]).float().unsqueeze(0)
+    report = {"threads": torch.get_num_threads(), "models": {}}
+    for name, (model_name, model) in models.items():
+        model = model.cpu().eval()
+        report["models"][name] = {
+            "parameters": sum(p.numel() for p in model.parameters()),
+            "accuracy": round(evaluate(model, model_name, loader, temporal_edges), 6),
+            "latency_ms": round(latency_ms(lambda x: run_model(model, model_name, x, None, temporal_edges), sample, warmup, iters), 3),
+        }
+
+    exported = load_exported(export_path, export_format)
+    student = report["models"]["student"]
+    student["export"] = {"format": export_format, "path": export_path, "size_kb": round(os.path.getsize(export_path) / 1024, 1)}
+    if exported is not None:
+        student["export"]["latency_ms"] = round(latency_ms(exported, sample, warmup, iters), 3)
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Distill SPOTER / GCN teachers into a small on-device student")
+    parser.add_argument("--config", default="config/hyperparams.yaml")
+    parser.add_argument("--teacher", nargs="*", default=None, help="Teacher: <model>=<checkpoint> (mặc định theo distill.teachers)")
+    parser.add_argument("--export", choices=["torchscript", "onnx"], default=None)
+    parser.add_argument("--warmup", type=int, default=5)
+    parser.add_argument("--iters", type=int, default=30)
+    args = parser.parse_args()
+
+    cf = Config(args.config)
+    teacher_paths = parse_teachers(args.teacher) or dict(cf.get("distill.teachers", {}))
+    if not teacher_paths:
+        raise ValueError("No teacher checkpoints given (--teacher or distill.teachers)")
+    export_format = args.export or str(cf.get("distill.export", "torchscript"))
+    max_frames = int(cf.get("data.max_frame", 100))
+    temporal_edges = bool(cf.get("model.temporal_edges"))
+
+    split = "public" if cf.get("data.is_public") else "private"
+    trainset = YogaDataset(str(cf.get(f"data.json_{split}_path_train")), max_frames=max_frames)
+    valset = YogaDataset(str(cf.get(f"data.json_{split}_path_val")), max_frames=max_frames)
+    trainloader = make_loader(trainset, cf.get("data.batch_size"), shuffle=True)
+    validloader = make_loader(valset, cf.get("data.batch_size"), shuffle=False)
+
+    teachers = {name: load_teacher(cf, name, path) for name, path in teacher_paths.items()}
+    with torch.no_grad():
+        dummy = torch.zeros(1, max_frames, 33, 3)
+        num_classes = {run_model(teacher, name, dummy, None, temporal_edges).shape[-1] for name, teacher in teachers.items()}
+    if len(num_classes) != 1:
+        raise ValueError(f"Teachers predict different numbers of classes: {num_classes}")
+
+    # Student train từ đầu với số class của teacher
+    cf.set("model.model_name", "student")
+    cf.set("model.pretrained", True)
+    cf.set("model.pretrain_config.student.num_classes", num_classes.pop())
+    student = get_model(cf)
+
+    criterion = DistillationLoss(float(cf.get("distill.temperature", 4.0)), float(cf.get("distill.alpha", 0.7)))
+    optimizer = optim.Adam(student.parameters(), lr=float(cf.get("distill.lr", cf.get("train.lr"))))
+    checkpoint_name = str(cf.get("distill.checkpoint_name", "student"))
+    checkpoint_dir = "checkpoints/student/distill"
+    trainer = DistillTrainer(student, teachers, optimizer, criterion, checkpoint_name,
+                             augmenter=KeypointAugmenter.from_config(cf),
+                             precision=str(cf.get("train.precision", "fp32")),
+                             temporal_edges=temporal_edges)
+
+    exp_id = create_experiment(
+        name=cf.get("mlflow.name_id"),
+        artifact_location=cf.get("mlflow.artifact_location"),
+        tags={"env": "dev", "version": "1.0.0"}
+    )
+    with mlflow.start_run(run_name=f"distill_{checkpoint_name}", experiment_id=exp_id) as run, \
+         Tracker(run.info.run_id, mode=str(cf.get("mlflow.tracking", "async"))) as tracker:
+        trainer.tracker = tracker
+        tracker.log_params({
+            "teachers": ",".join(teacher_paths),
+            "temperature": criterion.temperature,
+            "alpha": criterion.alpha,
+            "epochs": cf.get("distill.num_epochs", cf.get("train.num_epochs")),
+            "batch_size": cf.get("data.batch_size"),
+        })
+
+        try:
+            trainer.fit(trainloader, validloader, int(cf.get("distill.num_epochs", cf.get("train.num_epochs"))), checkpoint_dir)
+        except KeyboardInterrupt:
+            sys.exit()
+
+        # Export và đánh giá student tốt nhất theo valid accuracy
+        best_path, _ = trainer.checkpoint_paths(checkpoint_dir)
+        if os.path.exists(best_path):
+            student.load_state_dict(torch.load(best_path, map_location="cpu", weights_only=False)["model"])
+        extension = "pt" if export_format == "torchscript" else "onnx"
+        export_dir = str(cf.get("distill.export_dir", "checkpoints/student/export"))
+        export_path = export_student(student, os.path.join(export_dir, f"{checkpoint_name}.{extension}"), export_format, max_frames)
+        print(f"[+] Student exported to {export_path}")
+
+        models = {name: (name, teacher) for name, teacher in teachers.items()}
+        models["student"] = ("student", student)
+        report = compare(models, validloader, temporal_edges, export_path, export_format, args.warmup, args.iters)
+        for name, result in report["models"].items():
+            print(f"\t{name}: {result}")
+
+        report_path = str(cf.get("distill.report", "benchmark/distill.json"))
+        os.makedirs(os.path.dirname(os.path.abspath(report_path)), exist_ok=True)
+        with open(report_path, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=4)
+        mlflow.log_artifact(report_path)
+        mlflow.log_artifact(export_path)
+        print(f"[+] Report saved to {report_path}")
+
+
+if __name__ == "__main__":
+    main()
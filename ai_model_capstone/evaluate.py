@@ -0,0 +1,172 @@
+"""
+Đánh giá nhiều checkpoint trên video test theo một file config (thay cho test/test_method_1.py và test_method_2.py).
+
+Keypoints của video test được trích xuất một lần vào cache (`data.keypoint_dir`, có index theo nội dung video),
+mỗi checkpoint chạy inference theo batch trong một process riêng và ghi CSV, log lỗi và confusion matrix
+giống các script cũ. Chạy lại chỉ tốn thời gian forward của model.
+
+    python evaluate.py --config config/eval.yaml
+    python evaluate.py --config config/eval.yaml --runs method2
+"""
+import os
+import csv
+import argparse
+import multiprocessing as mp
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import numpy as np
+import torch
+import matplotlib
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt
+from sklearn.metrics import confusion_matrix, ConfusionMatrixDisplay
+from config import Config
+from core.extract import process_videos
+from core.extract_index import ExtractionIndex, INDEX_FILENAME
+from core.dataset import json_to_numpy
+from core.skeleton import pad_skeleton, normalize_skeleton
+from core.model import load_checkpoint_model
+from core.trainer import run_model
+
+VIDEO_EXTENSIONS = (".mp4", ".avi", ".mov")
+
+
+def load_test_set(cf):
+    """
+    Trích xuất keypoints của những video chưa có trong cache rồi đọc toàn bộ tập test.
+    Trả về (inputs (N, T, 33, 3), tên class thật, tên video, danh sách lỗi).
+    """
+    video_dir = cf.get("data.video_dir")
+    keypoint_dir = cf.get("data.keypoint_dir")
+    max_frames = int(cf.get("data.max_frame", 100))
+    process_videos(video_dir, keypoint_dir, int(cf.get("data.fps", 10)), str(cf.get("data.policy", "fps_stride")), max_frames)
+
+    index = ExtractionIndex(os.path.join(keypoint_dir, INDEX_FILENAME))
+    outputs = index.sources()
+    index.close()
+
+    inputs, actual, names, errors = [], [], [], []
+    for class_name in sorted(os.listdir(video_dir)):
+        class_path = os.path.join(video_dir, class_name)
+        if not os.path.isdir(class_path):
+            continue
+        for file_name in sorted(os.listdir(class_path)):
+            if not file_name.endswith(VIDEO_EXTENSIONS):
+                continue
+            output = outputs.get(f"{class_name}/{file_name}")
+            keypoints = json_to_numpy(output, class_name)[0] if output and os.path.exists(output) else None
+            if keypoints is None:
+                errors.append(f"[ERROR] Video: {os.path.join(class_path, file_name)}\nNo keypoints extracted\n")
+                continue
+            # Padding rồi chuẩn hóa như lúc train (YogaDataset)
+            inputs.append(normalize_skeleton(pad_skeleton(keypoints, max_frames)))
+            actual.append(class_name)
+            names.append(file_name)
+
+    inputs = np.stack(inputs) if inputs else np.zeros((0, max_frames, 33, 3), dtype=np.float32)
+    return inputs, actual, names, errors
+
+
+def save_confusion_matrix(y_true, y_pred, labels, output_path):
+    cm = confusion_matrix(y_true, y_pred, labels=labels)
+    disp = ConfusionMatrixDisplay(confusion_matrix=cm, display_labels=labels)
+    fig, ax = plt.subplots(figsize=(8, 6))
+    disp.plot(ax=ax, cmap=plt.cm.Blues, xticks_rotation=45, colorbar=False)
+    plt.title("Confusion Matrix")
+    plt.tight_layout()
+    plt.savefig(output_path)
+    plt.close()
+
+
+def init_worker(num_threads):
+    torch.set_num_threads(num_threads)
+
+
+@torch.no_grad()
+def predict(model, model_name, inputs, batch_size, temporal_edges=False):
+    """Dự đoán theo batch, trả về (chỉ số class, confidence)."""
+    preds, confidences = [], []
+    for batch in torch.from_numpy(inputs).split(batch_size):
+        probs = run_model(model, model_name, batch, None, temporal_edges).float().softmax(dim=1)
+        confidence, pred = probs.max(dim=1)
+        preds.append(pred)
+        confidences.append(confidence)
+    if not preds:
+        return [], []
+    return torch.cat(preds).tolist(), torch.cat(confidences).tolist()
+
+
+def evaluate_run(config_path, run, inputs, actual, names, errors):
+    """Đánh giá một checkpoint, ghi CSV / log lỗi / confusion matrix cho từng giá trị của `run_counts`."""
+    cf = Config(config_path)
+    model_name = run["model_name"]
+    base = Config(str(cf.get("base_config", "config/hyperparams.yaml")))
+    for key, value in (run.get("model") or {}).items():
+        base.set(f"model.pretrain_config.{model_name}.{key}", value)
+    base.set("data.max_frame", int(cf.get("data.max_frame", 100)))
+
+    classes = list(cf.get("classes"))
+    model = load_checkpoint_model(base, model_name, run["checkpoint"], strict=bool(cf.get("strict")))
+    preds, confidences = predict(model, model_name, inputs, int(cf.get("data.batch_size", 64)), bool(run.get("temporal_edges")))
+    predicted = [classes[p] for p in preds]
+
+    csv_dir, img_dir, error_dir = (cf.get(f"output.{key}") for key in ("csv_dir", "img_dir", "error_dir"))
+    for directory in (csv_dir, img_dir, error_dir):
+        os.makedirs(directory, exist_ok=True)
+
+    # Inference ở eval mode là tất định nên kết quả chỉ được tính một lần cho mọi giá trị của run_counts
+    outputs = []
+    for count in cf.get("run_counts", [1]):
+        prefix = f"{model_name}_run_{run['name']}_{count}_times"
+        output_csv = os.path.join(csv_dir, f"{prefix}.csv")
+        with open(output_csv, mode="w", newline="") as file:
+            writer = csv.writer(file)
+            writer.writerow(["Video Name", "Predicted Class", "Actual Class", "Confidence Score", "Correct", "Model", "Run Count"])
+            for _ in range(count):
+                for name, pred, label, confidence in zip(names, predicted, actual, confidences):
+                    writer.writerow([name, pred, label, confidence, pred == label, model_name, count])
+        if errors:
+            with open(os.path.join(error_dir, f"{prefix}_log_error.txt"), mode="a") as log_file:
+                log_file.writelines(errors)
+
+        cm_output_path = os.path.join(img_dir, f"{prefix}_confusion_matrix.png")
+        save_confusion_matrix(actual * count, predicted * count, classes, cm_output_path)
+        outputs.append(output_csv)
+
+    accuracy = sum(p == a for p, a in zip(predicted, actual)) / max(len(actual), 1)
+    return {"run": f"{model_name}_{run['name']}", "accuracy": accuracy, "outputs": outputs}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Evaluate checkpoints on the test videos")
+    parser.add_argument("--config", default="config/eval.yaml")
+    parser.add_argument("--runs", nargs="*", default=None, help="Chỉ chạy các run có `name` trong danh sách")
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    cf = Config(args.config)
+    runs = [run for run in cf.get("runs", []) if not args.runs or run["name"] in args.runs]
+    if not runs:
+        raise ValueError(f"No runs selected in {args.config}")
+
+    inputs, actual, names, errors = load_test_set(cf)
+    for error in errors:
+        print(error)
+    print(f"[*] {len(names)} test videos, {len(runs)} checkpoint(s)")
+
+    workers = max(1, min(args.workers or int(cf.get("workers", 1)), len(runs)))
+    num_threads = max(1, (os.cpu_count() or 1) // workers)
+    # spawn để mỗi worker có torch/OpenMP riêng, không kế thừa thread pool của process cha
+    ctx = mp.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=ctx, initializer=init_worker, initargs=(num_threads,)) as executor:
+        futures = {executor.submit(evaluate_run, args.config, run, inputs, actual, names, errors): run for run in runs}
+        for future in as_completed(futures):
+            run = futures[future]
+            try:
+                result = future.result()
+                print(f"[+] {result['run']}: accuracy {result['accuracy']:.4f} -> {', '.join(result['outputs'])}")
+            except Exception as e:
+                print(f"[!] {run['model_name']}_{run['name']} failed: {e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,40 +1,63 @@
 import mlflow
 import torch
-from core.dataset import YogaDataset
-from torch.utils.data import DataLoader
+from core.dataset import YogaDataset, clip_max_frames
 import torch.nn as nn
 from core.utils import create_experiment
 import torch.optim as optim
 from core.model import get_model
 from core.trainer import Trainer
+from core.keypoint_augment import KeypointAugmenter
+from core.tracking import Tracker
+from core.graph import to_graph_inputs
+from core.distributed import make_loader, is_main_process, get_world_size
+from core.sampler import make_bucket_loader
 from mlflow.models import infer_signature
 from torchinfo import summary
 from config import Config
 from core.visualize import plot_confusion_matrix
 import sys
 import os
-from sklearn.metrics import confusion_matrix
 
 
 
-def main(): 
-    config = Config()
+def train(config, epoch_callback=None):
+    """Train theo `config` trong một MLflow run, trả về Trainer sau khi train xong."""
+    # Length bucketing: mỗi batch chỉ pad tới clip dài nhất (cần model nhận được clip độ dài thay đổi)
+    bucketing = bool(config.get('data.bucketing'))
+    if bucketing and config.get('model.model_name') == "spoter":
+        raise ValueError("data.bucketing requires a model that accepts variable-length clips (frame_spoter, stgcn, gcn)")
+    build_loader = make_bucket_loader if bucketing else make_loader
+    max_frames = clip_max_frames(config)  # bucketing: giữ clip dài tới data.bucket_max_frame
+
     checkpoint_dir =  f"checkpoints/{str(config.get('model.model_name'))}/{'pretrain' if bool(config.get('model.pretrained')) else 'finetune'}"
 
     if bool(config.get('data.is_public')) == True:
     
-        trainset = YogaDataset(str(config.get('data.json_public_path_train')), max_frames=config.get('data.max_frame'))  # Định nghĩa số frame cố định
-        trainloader = DataLoader(trainset, batch_size=config.get('data.batch_size'), shuffle=True)
+        trainset = YogaDataset(str(config.get('data.json_public_path_train')), max_frames=max_frames, norm_frames=config.get('data.max_frame'))  # Số frame tối đa mỗi clip
+        trainloader = build_loader(trainset, config.get('data.batch_size'), shuffle=True)
 
-        valset = YogaDataset(str(config.get('data.json_public_path_val')), max_frames=config.get('data.max_frame'))  # Định nghĩa số frame cố định
-        validloader = DataLoader(valset, batch_size=config.get('data.batch_size'), shuffle=False)
+        valset = YogaDataset(str(config.get('data.json_public_path_val')), max_frames=max_frames, norm_frames=config.get('data.max_frame'))  # Số frame tối đa mỗi clip
+        validloader = build_loader(valset, config.get('data.batch_size'), shuffle=False)
     else:
-        trainset = YogaDataset(str(config.get('data.json_private_path_train')), max_frames=config.get('data.max_frame'))  # Định nghĩa số frame cố định
-        trainloader = DataLoader(trainset, batch_size=config.get('data.batch_size'), shuffle=True)
+        trainset = YogaDataset(str(config.get('data.json_private_path_train')), max_frames=max_frames, norm_frames=config.get('data.max_frame'))  # Số frame tối đa mỗi clip
+        trainloader = build_loader(trainset, config.get('data.batch_size'), shuffle=True)
+
+        valset = YogaDataset(str(config.get('data.json_private_path_val')), max_frames=max_frames, norm_frames=config.get('data.max_frame'))  # Số frame tối đa mỗi clip
+        validloader = build_loader(valset, config.get('data.batch_size'), shuffle=False)
 
-        valset = YogaDataset(str(config.get('data.json_private_path_val')), max_frames=config.get('data.max_frame'))  # Định nghĩa số frame cố định
-        validloader = DataLoader(valset, batch_size=config.get('data.batch_size'), shuffle=False)
 
+    model = get_model(config)
+    criterion = nn.CrossEntropyLoss()
+    optimizer = optim.Adam(model.parameters(), lr=config.get("train.lr"))
+    augmenter = KeypointAugmenter.from_config(config)
+    trainer = Trainer(model,optimizer,criterion,str(config.get('model.checkpoint_name')),None,config.get('model.model_name'),bool(config.get('model.pretrained')),augmenter,
+                      precision=str(config.get('train.precision', 'fp32')),compile=bool(config.get('train.compile')),
+                      temporal_edges=bool(config.get('model.temporal_edges')))
+
+    # Khi chạy distributed (train_ddp.py), chỉ rank 0 ghi MLflow, artifact và checkpoint
+    if not is_main_process():
+        trainer.fit(trainloader,validloader,config.get("train.num_epochs"),checkpoint_dir,resume=bool(config.get("train.resume")))
+        return trainer
 
     exp_id = create_experiment(
         name=config.get("mlflow.name_id"),
@@ -42,42 +65,43 @@ def main():
         tags={"env": "dev", "version": "1.0.0"}
     )
 
-    model = get_model(config)
-    criterion = nn.CrossEntropyLoss()
-    optimizer = optim.Adam(model.parameters(), lr=config.get("train.lr"))
-    trainer = Trainer(model,optimizer,criterion,str(config.get('model.checkpoint_name')),None,config.get('model.model_name'),bool(config.get('model.pretrained')))
-
-
-    with mlflow.start_run(run_name=config.get("mlflow.run_name"), experiment_id=exp_id,log_system_metrics=True) as run:
+    with mlflow.start_run(run_name=config.get("mlflow.run_name"), experiment_id=exp_id,log_system_metrics=bool(config.get("mlflow.system_metrics"))) as run, \
+         Tracker(run.info.run_id, mode=str(config.get("mlflow.tracking", "async"))) as tracker:
+        trainer.tracker = tracker
         params = {
             "epochs": config.get("train.num_epochs"),
             "learning_rate": config.get("train.lr"),
             "batch_size": config.get("data.batch_size"),
             "loss_function": criterion.__class__.__name__,
             "optimizer": optimizer.__class__.__name__,
+            "augment": bool(config.get("augment.enabled")),
+            "precision": config.get("train.precision", "fp32"),
+            "compile": bool(config.get("train.compile")),
+            "world_size": get_world_size(),
         }
-        if config.get('model.model_name') == "spoter":
-            sample_inputs, _ = next(iter(trainloader))
-            X = sample_inputs.to(device = "cuda" if torch.cuda.is_available() else "cpu")
+        if config.get('model.model_name') in ("spoter", "frame_spoter", "stgcn", "student"):
+            sample_inputs, *_ = next(iter(trainloader))  # loader bucketing trả thêm lengths
+            X = sample_inputs.to(device = trainer.device)
             signature = infer_signature(X.cpu().numpy(), model(X).detach().cpu().numpy())
         
         elif config.get('model.model_name') == "gcn":
-            sample_inputs, _ = next(iter(trainloader))
-            X = sample_inputs.to(device = "cuda" if torch.cuda.is_available() else "cpu")
-            batch_size, num_frames, num_keypoints, keypoint_dim = X.shape
-            X = X.view(batch_size * num_frames * num_keypoints, keypoint_dim)
-
-            edge_index = trainer.get_edge_index().to(X.device)
-            batch = torch.arange(batch_size, device=X.device).repeat_interleave(num_frames * num_keypoints)
+            sample_inputs, *_ = next(iter(trainloader))  # loader bucketing trả thêm lengths
+            X, edge_index, batch = to_graph_inputs(sample_inputs.to(device = trainer.device), trainer.temporal_edges)
             output = model(X, edge_index, batch).detach()
             signature = infer_signature(X.cpu().numpy(), output.cpu().numpy())
 
-        mlflow.log_params(params)
+        tracker.log_params(params)
+        if bucketing:
+            padding = trainloader.batch_sampler.padding_stats(int(config.get('data.max_frame')))  # so với pad cố định như khi tắt bucketing
+            print(f"[*] Length bucketing: {padding}")
+            tracker.log_params({f"bucketing_{k}": v for k, v in padding.items()})
         
         model_name = config.get("model.model_name")
-        summary_path = f"summary/model_{model_name}_summary.txt"
+        # Tên file theo run để các trial chạy song song (sweep) không ghi đè lên nhau
+        summary_path = f"summary/model_{model_name}_{config.get('mlflow.run_name')}_summary.txt"
+        os.makedirs("summary", exist_ok=True)
 
-        if model_name in ["spoter", "gcn"]:
+        if model_name in ["spoter", "frame_spoter", "gcn", "stgcn", "student"]:
             with open(summary_path, "w", encoding="utf-8") as f:
                 f.write(str(summary(model)))
 
@@ -85,8 +109,9 @@ def main():
             mlflow.log_artifact(summary_path)
 
         try:
-            trainer.fit(trainloader,validloader,config.get("train.num_epochs"),checkpoint_dir)
-            cm = confusion_matrix(trainer.all_labels, trainer.all_preds)
+            trainer.fit(trainloader,validloader,config.get("train.num_epochs"),checkpoint_dir,resume=bool(config.get("train.resume")),
+                        epoch_callback=epoch_callback)
+            cm = trainer.confusion.get('valid', trainer.confusion.get('train')).numpy()
             os.makedirs("image",exist_ok=True)
             name_img = f"confusion_matrix_{config.get('image.name')}.png"
             plot_confusion_matrix(cm,trainset,os.path.abspath(f'image/{name_img}'))
@@ -94,5 +119,11 @@ def main():
         except KeyboardInterrupt:
             sys.exit()   
 
+    return trainer
+
+
+def main():
+    train(Config())
+
 if __name__ == "__main__":
     main()
\ No newline at end of file
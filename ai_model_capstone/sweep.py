@@ -0,0 +1,204 @@
+"""
+Chạy sweep hyperparameter trên các key của hyperparams.yaml thay cho việc sửa file bằng tay.
+Mỗi trial là một process riêng (CPU threads được chia đều), log thành một MLflow run riêng,
+và trial bị dominated (valid metric dưới median các trial khác ở cùng epoch) bị dừng sớm.
+
+    python sweep.py --sweep config/sweep.yaml --workers 4
+"""
+import os
+import json
+import math
+import random
+import argparse
+import itertools
+import statistics
+import multiprocessing as mp
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import yaml
+import torch
+from config import Config
+
+
+def parameter_groups(parameters, tied):
+    """Gom các key `tied` thành một nhóm thay đổi cùng nhau, các key còn lại mỗi key một nhóm."""
+    groups = []
+    grouped = set()
+    for keys in tied or []:
+        lengths = {len(parameters[k]) for k in keys}
+        if len(lengths) != 1:
+            raise ValueError(f"Tied keys must have the same number of values: {keys}")
+        groups.append(list(keys))
+        grouped.update(keys)
+    groups.extend([k] for k in parameters if k not in grouped)
+    return groups
+
+
+def grid_trials(parameters, tied=None):
+    groups = parameter_groups(parameters, tied)
+    choices = [range(len(parameters[keys[0]])) for keys in groups]
+    trials = []
+    for indices in itertools.product(*choices):
+        trials.append({k: parameters[k][i] for keys, i in zip(groups, indices) for k in keys})
+    return trials
+
+
+def sample_value(spec, rng):
+    """Lấy mẫu từ {min, max, log, type}: uniform (hoặc log-uniform), làm tròn nếu type là int."""
+    low, high = float(spec["min"]), float(spec["max"])
+    if spec.get("log"):
+        value = math.exp(rng.uniform(math.log(low), math.log(high)))
+    else:
+        value = rng.uniform(low, high)
+    return int(round(value)) if spec.get("type") == "int" else value
+
+
+def random_trials(parameters, num_trials, seed=42, tied=None):
+    rng = random.Random(seed)
+    groups = parameter_groups(parameters, tied)
+    trials = []
+    for _ in range(num_trials):
+        trial = {}
+        for keys in groups:
+            spec = parameters[keys[0]]
+            if isinstance(spec, dict):
+                trial[keys[0]] = sample_value(spec, rng)
+            else:
+                i = rng.randrange(len(spec))
+                trial.update({k: parameters[k][i] for k in keys})
+        trials.append(trial)
+    return trials
+
+
+class MedianPruner:
+    """
+    Dừng trial khi giá trị tốt nhất của nó đến epoch hiện tại thấp hơn median của
+    các trial khác (đã chạy tới epoch đó). `history` là dict dùng chung giữa các process,
+    mỗi trial lưu {epoch: giá trị} để trial resume vẫn được so sánh đúng epoch.
+    """
+
+    def __init__(self, history, trial_id, metric="accuracy", warmup_epochs=5, min_trials=3):
+        self.history = history
+        self.trial_id = trial_id
+        self.metric = metric
+        self.warmup_epochs = warmup_epochs
+        self.min_trials = min_trials
+        self.pruned = False
+
+    @staticmethod
+    def best_until(values, epoch):
+        return max(value for e, value in values.items() if e <= epoch)
+
+    def __call__(self, epoch, cache):
+        if not cache["valid_acc"]:
+            return False
+        values = self.history.get(self.trial_id, {}) | {epoch: cache["valid_acc"][-1][self.metric]}
+        self.history[self.trial_id] = values  # Gán lại để Manager dict đồng bộ giữa các process
+        if epoch < self.warmup_epochs:
+            return False
+
+        others = [self.best_until(h, epoch) for tid, h in self.history.items() if tid != self.trial_id and epoch in h]
+        if len(others) < self.min_trials:
+            return False
+
+        self.pruned = self.best_until(values, epoch) < statistics.median(others)
+        return self.pruned
+
+
+def init_worker(num_threads):
+    torch.set_num_threads(num_threads)
+
+
+def run_trial(trial_id, config_path, overrides, history, pruning):
+    from main import train
+
+    cf = Config(config_path)
+    for key, value in overrides.items():
+        cf.set(key, value)
+    name = f"{cf.get('mlflow.run_name')}_trial{trial_id}"
+    cf.set("mlflow.run_name", name)
+    cf.set("model.checkpoint_name", name)
+    cf.set("image.name", name)
+
+    pruner = None
+    if pruning.get("enabled"):
+        pruner = MedianPruner(history, trial_id, pruning.get("metric", "accuracy"),
+                              int(pruning.get("warmup_epochs", 5)), int(pruning.get("min_trials", 3)))
+
+    logged = []
+
+    def epoch_callback(epoch, trainer):
+        # Log qua tracker của trainer (ghi nền theo batch), các giá trị override chỉ log một lần
+        if not logged:
+            trainer.tracker.log_params({f"sweep.{k}": v for k, v in overrides.items()} | {"sweep.trial": trial_id})
+            logged.append(True)
+        if pruner is None or not pruner(epoch, trainer.cache):
+            return False
+        trainer.tracker.set_tags({"sweep.pruned": True, "sweep.pruned_epoch": epoch})
+        return True
+
+    print(f"[*] Trial {trial_id}: {overrides}")
+    trainer = train(cf, epoch_callback=epoch_callback)
+    metric = pruning.get("metric", "accuracy")
+    return {
+        "trial": trial_id,
+        "run_name": name,
+        "overrides": overrides,
+        "epochs": trainer.epoch,
+        "pruned": bool(pruner and pruner.pruned),
+        f"best_valid_{metric}": max([acc[metric] for acc in trainer.cache["valid_acc"]], default=None),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Hyperparameter sweep over hyperparams.yaml")
+    parser.add_argument("--config", default="config/hyperparams.yaml")
+    parser.add_argument("--sweep", default="config/sweep.yaml")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--output", default="sweep_results.json")
+    args = parser.parse_args()
+
+    with open(args.sweep, "r", encoding="utf-8") as f:
+        sweep = yaml.safe_load(f)
+
+    parameters = sweep["parameters"]
+    if sweep.get("method", "grid") == "grid":
+        trials = grid_trials(parameters, sweep.get("tied"))
+    elif sweep["method"] == "random":
+        trials = random_trials(parameters, int(sweep.get("num_trials", 8)), int(sweep.get("seed", 42)), sweep.get("tied"))
+    else:
+        raise ValueError(f"Unknown sweep method: {sweep['method']}")
+
+    workers = max(1, min(args.workers or int(sweep.get("workers", 1)), len(trials)))
+    num_threads = max(1, (os.cpu_count() or 1) // workers)
+    pruning = sweep.get("pruning") or {}
+    print(f"[*] {len(trials)} trials - {workers} workers x {num_threads} threads")
+
+    # spawn để mỗi worker có torch/OpenMP riêng, không kế thừa thread pool của process cha
+    ctx = mp.get_context("spawn")
+    results = []
+    with ctx.Manager() as manager:
+        history = manager.dict()
+        with ProcessPoolExecutor(max_workers=workers, mp_context=ctx, initializer=init_worker, initargs=(num_threads,)) as executor:
+            futures = {executor.submit(run_trial, i, args.config, trial, history, pruning): i for i, trial in enumerate(trials)}
+            for future in as_completed(futures):
+                try:
+                    result = future.result()
+                except Exception as e:
+                    result = {"trial": futures[future], "overrides": trials[futures[future]], "error": str(e)}
+                    print(f"[!] Trial {futures[future]} failed: {e}")
+                results.append(result)
+
+    results.sort(key=lambda r: r["trial"])
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=4)
+
+    metric_key = f"best_valid_{pruning.get('metric', 'accuracy')}"
+    finished = [r for r in results if r.get(metric_key) is not None]
+    if finished:
+        best = max(finished, key=lambda r: r[metric_key])
+        print(f"[+] Best trial {best['trial']} ({best['run_name']}): {metric_key}={best[metric_key]} - {best['overrides']}")
+    print(f"[+] Sweep results saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,37 @@
+"""
+Train data parallel nhiều process trên CPU (torch.distributed gloo + DistributedDataParallel)
+với cùng config như main.py. Rank 0 ghi MLflow, artifact và checkpoint.
+
+    python train_ddp.py --nproc 4
+"""
+import os
+import argparse
+import torch.multiprocessing as mp
+from config import Config
+from core.distributed import setup, cleanup, find_free_port
+
+
+def worker(rank, world_size, port, config_path, num_threads):
+    setup(rank, world_size, master_port=port, num_threads=num_threads)
+    try:
+        from main import train
+        train(Config(config_path))
+    finally:
+        cleanup()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Multi-process data-parallel CPU training")
+    parser.add_argument("--nproc", type=int, default=2, help="Số process (rank) chạy trên máy")
+    parser.add_argument("--config", default="config/hyperparams.yaml")
+    parser.add_argument("--threads", type=int, default=None, help="Số CPU threads mỗi process (mặc định chia đều)")
+    parser.add_argument("--port", type=int, default=None)
+    args = parser.parse_args()
+
+    port = args.port or find_free_port()
+    print(f"[*] Launching {args.nproc} processes on 127.0.0.1:{port} ({os.cpu_count()} CPUs)")
+    mp.spawn(worker, args=(args.nproc, port, args.config, args.threads), nprocs=args.nproc, join=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,196 @@
+"""
+End-to-end performance benchmark of the prediction pipeline on synthetic videos.
+
+Each layer is timed separately on every generated video:
+frame sampling (decode), pose estimation, normalization, model inference for
+each model, and the full `POST /api/v1/predict/` request through a FastAPI
+test client backed by the in-memory MongoDB stand-in.
+
+Run from the backend_capstone directory:
+    python -m benchmark.e2e --resolutions 640x360 1280x720 --seconds 3 10 --output benchmark/results/e2e.json
+
+Compare the report against a baseline with ai_model_capstone/benchmark/compare.py, from the ai_model_capstone directory:
+    python -m benchmark.compare check --baseline ../backend_capstone/benchmark/baselines/e2e.json ../backend_capstone/benchmark/results/e2e.json
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import cv2
+import numpy as np
+import torch
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from src.v1.configs.config_model import Config
+from src.v1.ai.skeleton import (select_frame_indices, iter_video_frames, estimate_keypoints, get_pose_estimator,
+                                pad_skeleton, normalize_skeleton, NUM_KEYPOINTS, KEYPOINT_DIM)
+from src.v1.ai.model_providers import ModelProvider
+from src.v1.ai.model_service import predict_skeleton
+from benchmark.synthetic import generate_videos
+from benchmark.memory_mongo import MemoryDatabase
+from benchmark.stats import summarize, peak_rss_mb, environment
+
+
+def parse_resolution(value):
+    width, _, height = value.lower().partition("x")
+    return int(width), int(height)
+
+
+def sample_frames(video_path):
+    """Decode the frames selected by the serving sampling policy."""
+    cap = cv2.VideoCapture(video_path)
+    try:
+        total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        indices = select_frame_indices(total_frames, Config.SAMPLING_POLICY, cap.get(cv2.CAP_PROP_FPS),
+                                       Config.SAMPLING_FPS, Config.MAX_FRAMES)
+        return [frame for _, frame in iter_video_frames(cap, indices)]
+    finally:
+        cap.release()
+
+
+def estimate_skeleton(frames, pose):
+    skeleton = []
+    for frame in frames:
+        keypoints = estimate_keypoints(frame, pose)
+        skeleton.append(keypoints if keypoints is not None else np.zeros((NUM_KEYPOINTS, KEYPOINT_DIM), dtype=np.float32))
+    return np.array(skeleton, dtype=np.float32).reshape(-1, NUM_KEYPOINTS, KEYPOINT_DIM)
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, (time.perf_counter() - start) * 1000
+
+
+def benchmark_layers(video, model_names, warmup, repeats):
+    """Time sampling, pose estimation, normalization and inference of every model on one video."""
+    pose = get_pose_estimator()
+    models = {name: ModelProvider.get_model(name) for name in model_names}
+    classes = ModelProvider.get_classes()
+
+    times = {"sampling": [], "pose": [], "normalize": []}
+    times.update({f"model/{name}": [] for name in model_names})
+    num_frames = 0
+    for i in range(warmup + repeats):
+        frames, sampling_ms = timed(sample_frames, video["path"])
+        skeleton, pose_ms = timed(estimate_skeleton, frames, pose)
+        _, normalize_ms = timed(lambda s: normalize_skeleton(pad_skeleton(s, Config.MAX_FRAMES)), skeleton)
+        model_ms = {name: timed(predict_skeleton, skeleton, model, name, classes)[1] for name, model in models.items()}
+        if i < warmup:
+            continue
+        num_frames = len(frames)
+        times["sampling"].append(sampling_ms)
+        times["pose"].append(pose_ms)
+        times["normalize"].append(normalize_ms)
+        for name, ms in model_ms.items():
+            times[f"model/{name}"].append(ms)
+
+    layers = {layer: summarize(values) for layer, values in times.items()}
+    for layer in ("sampling", "pose"):
+        layers[layer]["frames_per_s"] = round(num_frames / (layers[layer]["p50_ms"] / 1000), 2) if num_frames else 0.0
+    return {"sampled_frames": num_frames, "layers": layers}
+
+
+async def seed_database(db):
+    """Insert a doctor, a patient and one exercise assigned to the patient; return their ids."""
+    from src.v1.models.user import UserInDB
+    from src.v1.models.exercise import ExerciseInDB
+
+    doctor = UserInDB(email="doctor@example.com", full_name="Benchmark Doctor", role="Doctor", hashed_password="-")
+    patient = UserInDB(email="patient@example.com", full_name="Benchmark Patient", role="Patient", hashed_password="-")
+    exercise = ExerciseInDB(name=Config.CLASS_LABELS[0], description="Synthetic benchmark exercise",
+                            assigned_by=doctor.id, assigned_to=patient.id)
+    await db["users"].insert_many([doctor.dict(by_alias=True), patient.dict(by_alias=True)])
+    await db["exercises"].insert_one(exercise.dict(by_alias=True))
+    return {"doctor_id": doctor.id, "patient_id": patient.id, "exercise_id": exercise.id}
+
+
+def benchmark_endpoint(videos, warmup, repeats, db_latency_ms):
+    """Time `POST /api/v1/predict/` for every video and count database round trips per request."""
+    import asyncio
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+    from src import api_v1_router
+    from src.v1.configs.database import MongoDB
+    from src.v1.configs.app_config import settings
+
+    db = MemoryDatabase(latency_ms=db_latency_ms)
+    MongoDB.db = db
+    ids = asyncio.run(seed_database(db))
+
+    # No lifespan: the app would otherwise try to connect to a real MongoDB server
+    app = FastAPI()
+    app.include_router(api_v1_router, prefix="/api")
+
+    results = {}
+    upload_dir = settings.UPLOAD_DIR
+    with tempfile.TemporaryDirectory() as tmp_dir, TestClient(app) as client:
+        settings.UPLOAD_DIR = tmp_dir
+        try:
+            for video in videos:
+                with open(video["path"], "rb") as f:
+                    content = f.read()
+                times, round_trips = [], []
+                for i in range(warmup + repeats):
+                    db.reset_counters()
+                    start = time.perf_counter()
+                    response = client.post(
+                        "/api/v1/predict/",
+                        files={"video_file": (os.path.basename(video["path"]), content, "video/mp4")},
+                        data={"patient_id": ids["patient_id"], "exercise_id": ids["exercise_id"]},
+                    )
+                    elapsed = (time.perf_counter() - start) * 1000
+                    if response.status_code != 201:
+                        raise RuntimeError(f"/predict failed for {video['name']}: {response.status_code} {response.text}")
+                    if i >= warmup:
+                        times.append(elapsed)
+                        round_trips.append(db.round_trips)
+                results[video["name"]] = summarize(times) | {"db_round_trips": max(round_trips)}
+                print(f"\t{video['name']} /predict: {results[video['name']]}")
+        finally:
+            settings.UPLOAD_DIR = upload_dir
+    return {"model": ModelProvider.get_model_name(), "db_latency_ms": db_latency_ms, "videos": results}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="End-to-end benchmark of the prediction pipeline on synthetic videos")
+    parser.add_argument("--resolutions", nargs="+", default=["640x360", "1280x720"], help="WIDTHxHEIGHT")
+    parser.add_argument("--seconds", nargs="+", type=float, default=[3, 10], help="Video lengths in seconds")
+    parser.add_argument("--fps", type=int, default=30)
+    parser.add_argument("--models", nargs="+", default=["gcn", "spoter"])
+    parser.add_argument("--video-dir", default="benchmark/videos")
+    parser.add_argument("--warmup", type=int, default=1)
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--threads", type=int, default=None, help="torch CPU threads (torch default if unset)")
+    parser.add_argument("--db-latency-ms", type=float, default=0.0, help="Simulated latency per database round trip")
+    parser.add_argument("--skip-endpoint", action="store_true", help="Only time the individual layers")
+    parser.add_argument("--output", default="benchmark/results/e2e.json")
+    args = parser.parse_args()
+
+    if args.threads:
+        torch.set_num_threads(args.threads)
+    videos = generate_videos(args.video_dir, [parse_resolution(r) for r in args.resolutions], args.seconds, args.fps)
+
+    report = {"benchmark": "e2e", "environment": environment(), "videos": []}
+    for video in videos:
+        print(f"[*] {video['name']} ({video['frames']} frames)")
+        result = benchmark_layers(video, args.models, args.warmup, args.repeats)
+        for layer, stats in result["layers"].items():
+            print(f"\t{layer}: {stats}")
+        report["videos"].append(video | result)
+
+    if not args.skip_endpoint:
+        print("[*] POST /api/v1/predict/")
+        report["endpoint"] = benchmark_endpoint(videos, args.warmup, args.repeats, args.db_latency_ms)
+    report["peak_rss_mb"] = peak_rss_mb()
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=4)
+    print(f"[+] Report saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,442 @@
+"""
+In-memory stand-in for the subset of the Motor API used by the services.
+
+It lets the FastAPI app run end to end without a MongoDB server. Every call that
+would be a server round trip increments `MemoryDatabase.round_trips`, so
+benchmarks can report how many trips a request costs. An optional per-trip
+`latency_ms` simulates network distance to the database.
+"""
+import re
+import copy
+import asyncio
+from bson import ObjectId
+from pymongo import ASCENDING
+from pymongo.errors import DuplicateKeyError
+from pymongo.results import InsertOneResult, InsertManyResult, UpdateResult, DeleteResult
+
+_MISSING = object()
+
+
+def get_path(document, path):
+    """Value at a dotted `path`, or `_MISSING`."""
+    value = document
+    for key in path.split("."):
+        if isinstance(value, dict) and key in value:
+            value = value[key]
+        else:
+            return _MISSING
+    return value
+
+
+def set_path(document, path, value):
+    keys = path.split(".")
+    for key in keys[:-1]:
+        document = document.setdefault(key, {})
+    document[keys[-1]] = value
+
+
+def unset_path(document, path):
+    keys = path.split(".")
+    for key in keys[:-1]:
+        document = document.get(key)
+        if not isinstance(document, dict):
+            return
+    document.pop(keys[-1], None)
+
+
+def _sort_key(value):
+    # Order values of different types deterministically (None first, like MongoDB)
+    if value is _MISSING or value is None:
+        return (0, 0)
+    if isinstance(value, (int, float)):
+        return (1, value)
+    if isinstance(value, str):
+        return (2, value)
+    return (3, str(value))
+
+
+def _equals(value, expected):
+    # An array field matches when any of its elements matches, as in MongoDB
+    if isinstance(value, list) and not isinstance(expected, list):
+        return any(_equals(v, expected) for v in value)
+    if value is _MISSING:
+        return expected is None
+    if isinstance(value, (int, float)) and isinstance(expected, (int, float)):
+        return value == expected
+    # Different BSON types never match (e.g. a string id against an ObjectId)
+    return type(value) is type(expected) and value == expected
+
+
+def _compare(value, op, operand):
+    if value is _MISSING or value is None or operand is None:
+        return False
+    try:
+        if op == "$gt":
+            return value > operand
+        if op == "$gte":
+            return value >= operand
+        if op == "$lt":
+            return value < operand
+        return value <= operand
+    except TypeError:
+        return False
+
+
+def _match_operator(value, op, operand, spec):
+    if op == "$eq":
+        return _equals(value, operand)
+    if op == "$ne":
+        return not _equals(value, operand)
+    if op in ("$gt", "$gte", "$lt", "$lte"):
+        return _compare(value, op, operand)
+    if op == "$in":
+        return any(_equals(value, v) for v in operand)
+    if op == "$nin":
+        return not any(_equals(value, v) for v in operand)
+    if op == "$exists":
+        return (value is not _MISSING) == bool(operand)
+    if op == "$regex":
+        flags = re.IGNORECASE if "i" in spec.get("$options", "") else 0
+        return isinstance(value, str) and re.search(operand, value, flags) is not None
+    if op == "$options":
+        return True
+    raise NotImplementedError(f"Query operator {op} is not supported by the in-memory database")
+
+
+def matches(document, query):
+    """Whether `document` matches a MongoDB `query` (equality, comparison, $in, $regex, $or/$and)."""
+    for key, spec in (query or {}).items():
+        if key == "$or":
+            if not any(matches(document, q) for q in spec):
+                return False
+        elif key == "$and":
+            if not all(matches(document, q) for q in spec):
+                return False
+        else:
+            value = get_path(document, key)
+            if isinstance(spec, dict) and spec and all(k.startswith("$") for k in spec):
+                if not all(_match_operator(value, op, operand, spec) for op, operand in spec.items()):
+                    return False
+            elif not _equals(value, spec):
+                return False
+    return True
+
+
+def sort_documents(documents, keys):
+    for key, direction in reversed(keys):
+        documents.sort(key=lambda d: _sort_key(get_path(d, key)), reverse=direction < 0)
+    return documents
+
+
+def _normalize_sort(key_or_list, direction=None):
+    if isinstance(key_or_list, str):
+        return [(key_or_list, direction or ASCENDING)]
+    if isinstance(key_or_list, dict):
+        return list(key_or_list.items())
+    return list(key_or_list)
+
+
+def _evaluate(document, expression, variables=None):
+    """
+    Evaluate a small subset of aggregation expressions: field paths, `$$` variables, arrays,
+    literals, $first, $ifNull, $ne, $toString, $convert (to objectId) and $filter.
+    """
+    if isinstance(expression, str) and expression.startswith("$$"):
+        return (variables or {}).get(expression[2:])
+    if isinstance(expression, str) and expression.startswith("$"):
+        value = get_path(document, expression[1:])
+        return None if value is _MISSING else value
+    if isinstance(expression, list):
+        return [_evaluate(document, item, variables) for item in expression]
+    if isinstance(expression, dict) and len(expression) == 1:
+        (op, args), = expression.items()
+        if op == "$first":
+            value = _evaluate(document, args, variables)
+            return value[0] if isinstance(value, list) and value else None
+        if op == "$ifNull":
+            value = _evaluate(document, args[0], variables)
+            return _evaluate(document, args[1], variables) if value is None else value
+        if op == "$literal":
+            return args
+        if op == "$ne":
+            left, right = _evaluate(document, args, variables)
+            return left != right
+        if op == "$toString":
+            value = _evaluate(document, args, variables)
+            return None if value is None else str(value)
+        if op == "$convert" and args.get("to") == "objectId":
+            value = _evaluate(document, args["input"], variables)
+            if value is None:
+                return args.get("onNull")
+            if isinstance(value, ObjectId):
+                return value
+            return ObjectId(value) if isinstance(value, str) and ObjectId.is_valid(value) else args.get("onError")
+        if op == "$filter":
+            items = _evaluate(document, args["input"], variables) or []
+            name = args.get("as", "this")
+            return [item for item in items
+                    if _evaluate(document, args["cond"], {**(variables or {}), name: item})]
+    return expression
+
+
+def project(document, projection):
+    """Apply an inclusion or exclusion projection (computed fields allowed in inclusion mode)."""
+    if not projection:
+        return document
+    include = {k: v for k, v in projection.items() if k != "_id"}
+    if include and all(v in (0, False) for v in include.values()):
+        result = copy.deepcopy(document)
+        for key in projection:
+            unset_path(result, key)
+        return result
+
+    result = {}
+    if projection.get("_id", 1) not in (0, False) and "_id" in document:
+        result["_id"] = document["_id"]
+    for key, spec in include.items():
+        if spec in (1, True):
+            value = get_path(document, key)
+            if value is not _MISSING:
+                set_path(result, key, copy.deepcopy(value))
+        else:
+            set_path(result, key, _evaluate(document, spec))
+    return result
+
+
+class MemoryCursor:
+    """Lazy cursor supporting sort / skip / limit, `async for` and `to_list` (one round trip)."""
+
+    def __init__(self, collection, query=None, projection=None, pipeline=None):
+        self.collection = collection
+        self.query = query
+        self.projection = projection
+        self.pipeline = pipeline
+        self._sort = []
+        self._skip = 0
+        self._limit = 0
+        self._results = None
+
+    def sort(self, key_or_list, direction=None):
+        self._sort = _normalize_sort(key_or_list, direction)
+        return self
+
+    def skip(self, count):
+        self._skip = count
+        return self
+
+    def limit(self, count):
+        self._limit = count
+        return self
+
+    async def _execute(self):
+        await self.collection.database.round_trip()
+        if self.pipeline is not None:
+            return self.collection.run_pipeline(self.pipeline)
+        documents = [d for d in self.collection.documents if matches(d, self.query)]
+        documents = sort_documents(documents, self._sort)[self._skip:]
+        if self._limit:
+            documents = documents[:self._limit]
+        return [project(copy.deepcopy(d), self.projection) for d in documents]
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if self._results is None:
+            self._results = iter(await self._execute())
+        try:
+            return next(self._results)
+        except StopIteration:
+            raise StopAsyncIteration
+
+    async def to_list(self, length=None):
+        results = await self._execute()
+        return results[:length] if length else results
+
+
+class MemoryCollection:
+    def __init__(self, database, name):
+        self.database = database
+        self.name = name
+        self.documents = []
+        self.unique_keys = [("_id",)]
+
+    def _check_unique(self, document, ignore=None):
+        for keys in self.unique_keys:
+            values = tuple(get_path(document, k) for k in keys)
+            if any(v is _MISSING for v in values):
+                continue
+            for other in self.documents:
+                if other is not ignore and tuple(get_path(other, k) for k in keys) == values:
+                    raise DuplicateKeyError(f"E11000 duplicate key error collection: {self.name} index: {'_'.join(keys)}")
+
+    async def create_indexes(self, indexes):
+        await self.database.round_trip()
+        for index in indexes:
+            document = index.document
+            if document.get("unique"):
+                self.unique_keys.append(tuple(document["key"].keys()))
+        return [index.document["name"] for index in indexes]
+
+    async def insert_one(self, document):
+        await self.database.round_trip()
+        document = copy.deepcopy(document)
+        self._check_unique(document)
+        self.documents.append(document)
+        return InsertOneResult(document["_id"], acknowledged=True)
+
+    async def insert_many(self, documents):
+        await self.database.round_trip()
+        inserted = []
+        for document in documents:
+            document = copy.deepcopy(document)
+            self._check_unique(document)
+            self.documents.append(document)
+            inserted.append(document["_id"])
+        return InsertManyResult(inserted, acknowledged=True)
+
+    async def find_one(self, query=None, projection=None, sort=None):
+        await self.database.round_trip()
+        documents = [d for d in self.documents if matches(d, query)]
+        if sort:
+            documents = sort_documents(documents, _normalize_sort(sort))
+        return project(copy.deepcopy(documents[0]), projection) if documents else None
+
+    def find(self, query=None, projection=None):
+        return MemoryCursor(self, query, projection)
+
+    def aggregate(self, pipeline, **kwargs):
+        return MemoryCursor(self, pipeline=list(pipeline))
+
+    async def count_documents(self, query=None, **kwargs):
+        await self.database.round_trip()
+        return sum(1 for d in self.documents if matches(d, query))
+
+    def _apply_update(self, document, update):
+        updated = copy.deepcopy(document)
+        for op, fields in update.items():
+            for key, value in fields.items():
+                if op == "$set":
+                    set_path(updated, key, copy.deepcopy(value))
+                elif op == "$unset":
+                    unset_path(updated, key)
+                elif op == "$inc":
+                    current = get_path(updated, key)
+                    set_path(updated, key, (0 if current is _MISSING else current) + value)
+                else:
+                    raise NotImplementedError(f"Update operator {op} is not supported by the in-memory database")
+        self._check_unique(updated, ignore=document)
+        return updated
+
+    async def update_one(self, query, update, upsert=False, **kwargs):
+        await self.database.round_trip()
+        for i, document in enumerate(self.documents):
+            if matches(document, query):
+                updated = self._apply_update(document, update)
+                modified = updated != document
+                self.documents[i] = updated
+                return UpdateResult({"n": 1, "nModified": int(modified)}, acknowledged=True)
+        return UpdateResult({"n": 0, "nModified": 0}, acknowledged=True)
+
+    async def update_many(self, query, update, **kwargs):
+        await self.database.round_trip()
+        matched = modified = 0
+        for i, document in enumerate(self.documents):
+            if matches(document, query):
+                updated = self._apply_update(document, update)
+                matched += 1
+                modified += int(updated != document)
+                self.documents[i] = updated
+        return UpdateResult({"n": matched, "nModified": modified}, acknowledged=True)
+
+    async def delete_one(self, query):
+        await self.database.round_trip()
+        for i, document in enumerate(self.documents):
+            if matches(document, query):
+                del self.documents[i]
+                return DeleteResult({"n": 1}, acknowledged=True)
+        return DeleteResult({"n": 0}, acknowledged=True)
+
+    async def delete_many(self, query):
+        await self.database.round_trip()
+        before = len(self.documents)
+        self.documents = [d for d in self.documents if not matches(d, query)]
+        return DeleteResult({"n": before - len(self.documents)}, acknowledged=True)
+
+    def run_pipeline(self, pipeline):
+        """Run an aggregation pipeline in memory ($match, $sort, $skip, $limit, $project, $addFields, $lookup, $unwind, $count, $facet)."""
+        documents = [copy.deepcopy(d) for d in self.documents]
+        return self.database.run_stages(documents, pipeline)
+
+
+class MemoryDatabase:
+    """Drop-in for `MongoDB.db`: `db[name]` returns a collection, created on first use."""
+
+    def __init__(self, latency_ms=0.0):
+        self.latency_ms = latency_ms
+        self.round_trips = 0
+        self.collections = {}
+
+    def __getitem__(self, name):
+        if name not in self.collections:
+            self.collections[name] = MemoryCollection(self, name)
+        return self.collections[name]
+
+    def reset_counters(self):
+        self.round_trips = 0
+
+    async def round_trip(self):
+        self.round_trips += 1
+        if self.latency_ms:
+            await asyncio.sleep(self.latency_ms / 1000)
+
+    def run_stages(self, documents, pipeline):
+        for stage in pipeline:
+            (name, spec), = stage.items()
+            if name == "$match":
+                documents = [d for d in documents if matches(d, spec)]
+            elif name == "$sort":
+                documents = sort_documents(documents, list(spec.items()))
+            elif name == "$skip":
+                documents = documents[spec:]
+            elif name == "$limit":
+                documents = documents[:spec]
+            elif name in ("$project", "$addFields", "$set"):
+                if name == "$project":
+                    documents = [project(d, spec) for d in documents]
+                else:
+                    for d in documents:
+                        for key, expression in spec.items():
+                            set_path(d, key, _evaluate(d, expression))
+            elif name == "$lookup":
+                foreign = self[spec["from"]].documents
+                for d in documents:
+                    local = get_path(d, spec["localField"])
+                    # An array localField matches on any of its elements
+                    values = [] if local is _MISSING else local if isinstance(local, list) else [local]
+                    d[spec["as"]] = [copy.deepcopy(f) for f in foreign
+                                     if any(_equals(get_path(f, spec["foreignField"]), value) for value in values)]
+            elif name == "$unwind":
+                path = spec if isinstance(spec, str) else spec["path"]
+                keep_empty = isinstance(spec, dict) and spec.get("preserveNullAndEmptyArrays", False)
+                unwound = []
+                for d in documents:
+                    values = get_path(d, path[1:])
+                    if isinstance(values, list) and values:
+                        for value in values:
+                            item = copy.deepcopy(d)
+                            set_path(item, path[1:], value)
+                            unwound.append(item)
+                    elif keep_empty:
+                        item = copy.deepcopy(d)
+                        unset_path(item, path[1:])
+                        unwound.append(item)
+                documents = unwound
+            elif name == "$count":
+                documents = [{spec: len(documents)}] if documents else []
+            elif name == "$facet":
+                documents = [{key: self.run_stages([copy.deepcopy(d) for d in documents], sub)
+                              for key, sub in spec.items()}]
+            else:
+                raise NotImplementedError(f"Aggregation stage {name} is not supported by the in-memory database")
+        return documents
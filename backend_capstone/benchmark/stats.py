@@ -0,0 +1,59 @@
+"""Timing summaries and run metadata shared by the benchmark scripts."""
+import os
+import sys
+import time
+import platform
+import resource
+import statistics
+import subprocess
+
+
+def percentile(values, q):
+    """Linear-interpolated percentile (`q` in [0, 100]) of a non-empty list."""
+    ordered = sorted(values)
+    position = (len(ordered) - 1) * q / 100
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+def summarize(times_ms):
+    """p50 / p95 / mean / min / max (ms) of repeated timings."""
+    return {
+        "p50_ms": round(percentile(times_ms, 50), 3),
+        "p95_ms": round(percentile(times_ms, 95), 3),
+        "mean_ms": round(statistics.fmean(times_ms), 3),
+        "min_ms": round(min(times_ms), 3),
+        "max_ms": round(max(times_ms), 3),
+        "runs": len(times_ms),
+    }
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process (ru_maxrss is KB on Linux, bytes on macOS)."""
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(rss / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              check=True, cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def environment():
+    """Where and on what the benchmark ran, so reports from different commits can be compared."""
+    import cv2
+    import torch
+    return {
+        "commit": git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "torch": torch.__version__,
+        "torch_threads": torch.get_num_threads(),
+        "opencv": cv2.__version__,
+    }
@@ -0,0 +1,102 @@
+"""
+Deterministic synthetic exercise videos: a stick figure rendered with OpenCV.
+
+The figure bends forward and raises its arms on a fixed cycle, so every run with
+the same parameters writes identical frames. This keeps benchmarks reproducible
+without shipping real patient videos.
+"""
+import os
+import math
+import cv2
+import numpy as np
+
+# (x, y) of each joint in a unit box for the neutral pose, origin at the top left
+NEUTRAL_POSE = {
+    "head": (0.50, 0.15),
+    "neck": (0.50, 0.25),
+    "left_shoulder": (0.42, 0.27), "right_shoulder": (0.58, 0.27),
+    "left_elbow": (0.38, 0.40), "right_elbow": (0.62, 0.40),
+    "left_wrist": (0.36, 0.52), "right_wrist": (0.64, 0.52),
+    "left_hip": (0.45, 0.55), "right_hip": (0.55, 0.55),
+    "left_knee": (0.44, 0.72), "right_knee": (0.56, 0.72),
+    "left_ankle": (0.44, 0.90), "right_ankle": (0.56, 0.90),
+}
+
+BONES = [
+    ("neck", "left_shoulder"), ("neck", "right_shoulder"),
+    ("left_shoulder", "left_elbow"), ("left_elbow", "left_wrist"),
+    ("right_shoulder", "right_elbow"), ("right_elbow", "right_wrist"),
+    ("neck", "left_hip"), ("neck", "right_hip"), ("left_hip", "right_hip"),
+    ("left_hip", "left_knee"), ("left_knee", "left_ankle"),
+    ("right_hip", "right_knee"), ("right_knee", "right_ankle"),
+]
+
+
+def pose_at(t, period_s=2.0):
+    """Joint positions at time `t` (seconds): arms swing up and the torso leans on a fixed cycle."""
+    phase = 0.5 - 0.5 * math.cos(2 * math.pi * t / period_s)  # 0 -> 1 -> 0
+    pose = dict(NEUTRAL_POSE)
+    for side, sign in (("left", -1), ("right", 1)):
+        sx, sy = pose[f"{side}_shoulder"]
+        # Rotate the arm from hanging down (90 degrees) to raised (-60 degrees)
+        angle = math.radians(90 - 150 * phase)
+        pose[f"{side}_elbow"] = (sx + sign * 0.13 * math.cos(angle), sy + 0.13 * math.sin(angle))
+        ex, ey = pose[f"{side}_elbow"]
+        pose[f"{side}_wrist"] = (ex + sign * 0.12 * math.cos(angle), ey + 0.12 * math.sin(angle))
+
+    # Lean the upper body sideways around the hips
+    lean = 0.06 * phase
+    for joint in ("head", "neck", "left_shoulder", "right_shoulder", "left_elbow", "right_elbow", "left_wrist", "right_wrist"):
+        x, y = pose[joint]
+        pose[joint] = (x + lean, y)
+    return pose
+
+
+def render_frame(pose, width, height):
+    frame = np.full((height, width, 3), 235, dtype=np.uint8)
+    scale = min(width, height)
+    offset_x = (width - scale) // 2
+
+    def to_pixel(point):
+        return int(offset_x + point[0] * scale), int(point[1] * scale)
+
+    thickness = max(2, scale // 60)
+    for a, b in BONES:
+        cv2.line(frame, to_pixel(pose[a]), to_pixel(pose[b]), (40, 40, 40), thickness, cv2.LINE_AA)
+    cv2.circle(frame, to_pixel(pose["head"]), max(4, scale // 16), (40, 40, 40), thickness, cv2.LINE_AA)
+    return frame
+
+
+def write_video(path, width, height, seconds, fps=30):
+    """Write one synthetic MP4 (mp4v) and return its frame count."""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"mp4v"), fps, (width, height))
+    if not writer.isOpened():
+        raise RuntimeError(f"Cannot open video writer for {path}")
+    num_frames = int(round(seconds * fps))
+    try:
+        for i in range(num_frames):
+            writer.write(render_frame(pose_at(i / fps), width, height))
+    finally:
+        writer.release()
+    return num_frames
+
+
+def generate_videos(output_dir, resolutions, durations, fps=30):
+    """
+    Generate one video per (resolution, duration) pair, reusing files that already exist.
+
+    Returns a list of dicts with the name, path, size, length and frame count of each video.
+    """
+    videos = []
+    for width, height in resolutions:
+        for seconds in durations:
+            name = f"stick_{width}x{height}_{seconds:g}s_{fps}fps"
+            path = os.path.join(output_dir, f"{name}.mp4")
+            if os.path.exists(path):
+                num_frames = int(round(seconds * fps))
+            else:
+                num_frames = write_video(path, width, height, seconds, fps)
+            videos.append({"name": name, "path": path, "width": width, "height": height,
+                           "seconds": seconds, "fps": fps, "frames": num_frames})
+    return videos
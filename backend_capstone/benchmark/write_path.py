@@ -0,0 +1,116 @@
+"""
+Database round trips of the prediction write path (`create_prediction`).
+
+Runs `create_prediction` against the in-memory MongoDB stand-in and counts the
+round trips of each scenario:
+- cold: the exercise is not cached, so `get_exercise` reads it first
+- warm: the exercise was just read, as `POST /api/v1/predict/` does when it validates the request
+- duplicate: a second prediction for the same video, rejected with 409 by the unique video_id index
+
+Exits with code 1 when a scenario needs more trips than its budget.
+
+Run from the backend_capstone directory:
+    python -m benchmark.write_path --runs 20 --db-latency-ms 2
+"""
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from fastapi import HTTPException
+from bson import ObjectId
+from src.v1.configs.database import MongoDB
+from src.v1.models.exercise import ExerciseInDB
+from src.v1.services import prediction_service
+from src.v1.services.exercise_service import get_exercise, exercise_cache
+from benchmark.memory_mongo import MemoryDatabase
+from benchmark.stats import summarize, environment
+
+# Maximum round trips per scenario: exercise read (cold only), prediction insert, exercise status update
+BUDGET = {"cold": 3, "warm": 2, "duplicate": 1}
+
+
+async def create(exercise_id, patient_id, video_id):
+    return await prediction_service.create_prediction(
+        video_id=video_id,
+        exercise_id=exercise_id,
+        patient_id=patient_id,
+        predicted_motion="Sodatvuonlen",
+        confidence_score=0.9,
+        model_name="benchmark",
+    )
+
+
+async def run(runs, db_latency_ms):
+    db = MemoryDatabase(latency_ms=db_latency_ms)
+    MongoDB.db = db
+    patient_id = str(ObjectId())
+    exercise = ExerciseInDB(name="Sodatvuonlen", description="Synthetic benchmark exercise",
+                            assigned_by=str(ObjectId()), assigned_to=patient_id)
+    await db["exercises"].insert_one(exercise.dict(by_alias=True))
+    await prediction_service.ensure_indexes()
+
+    round_trips = {scenario: [] for scenario in BUDGET}
+    times = {scenario: [] for scenario in BUDGET}
+    for _ in range(runs):
+        for scenario in ("cold", "warm"):
+            if scenario == "cold":
+                await exercise_cache.delete(exercise.id)
+            else:
+                await get_exercise(exercise.id)
+            video_id = str(ObjectId())
+            db.reset_counters()
+            start = time.perf_counter()
+            await create(exercise.id, patient_id, video_id)
+            times[scenario].append((time.perf_counter() - start) * 1000)
+            round_trips[scenario].append(db.round_trips)
+
+        await get_exercise(exercise.id)
+        db.reset_counters()
+        start = time.perf_counter()
+        try:
+            await create(exercise.id, patient_id, video_id)
+            raise RuntimeError("Duplicate prediction was not rejected")
+        except HTTPException as e:
+            if e.status_code != 409:
+                raise
+        times["duplicate"].append((time.perf_counter() - start) * 1000)
+        round_trips["duplicate"].append(db.round_trips)
+
+    return {
+        scenario: summarize(times[scenario]) | {"db_round_trips": max(round_trips[scenario]), "budget": BUDGET[scenario]}
+        for scenario in BUDGET
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Count database round trips of the prediction write path")
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--db-latency-ms", type=float, default=0.0, help="Simulated latency per database round trip")
+    parser.add_argument("--output", default=None, help="Optional JSON report path")
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args.runs, args.db_latency_ms))
+    over_budget = []
+    for scenario, result in results.items():
+        print(f"{scenario}: {result}")
+        if result["db_round_trips"] > result["budget"]:
+            over_budget.append(scenario)
+
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"benchmark": "write_path", "environment": environment(),
+                       "db_latency_ms": args.db_latency_ms, "scenarios": results}, f, indent=4)
+        print(f"[+] Report saved to {args.output}")
+
+    if over_budget:
+        print(f"[!] Over the round-trip budget: {', '.join(over_budget)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,215 @@
+#!/usr/bin/env python
+"""
+One-time ID migration
+Converts every `_id` and ID reference stored as ObjectId to its string form, the canonical
+format written by the models. Once it reports nothing left to convert, set
+LEGACY_OBJECT_ID_LOOKUP=False so the services use single exact-match lookups.
+
+    python migrate_ids.py --dry-run                 # count values that still need converting (exit code 1 while any remain)
+    python migrate_ids.py                           # convert (safe to re-run, also after an interruption)
+    python migrate_ids.py --restore BACKUP.jsonl    # put the original ObjectId documents back
+"""
+import os
+import sys
+import asyncio
+import argparse
+from datetime import datetime
+from bson import json_util
+
+# Make sure we can import from the current directory
+sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
+
+from src.v1.configs.database import MongoDB
+
+# Collection -> reference fields holding IDs of other documents
+ID_FIELDS = {
+    "users": [],
+    "exercises": ["assigned_by", "assigned_to"],
+    "videos": ["patient_id", "exercise_id"],
+    "predictions": ["video_id", "exercise_id", "patient_id"],
+}
+OBJECT_ID = {"$type": "objectId"}
+# String-ID copies written before their original is deleted, so an interrupted batch can be finished
+STAGING_COLLECTION = "id_migration_staging"
+
+async def count_pending(db):
+    """Number of documents per collection and field that still hold an ObjectId"""
+    pending = {}
+    for name, fields in ID_FIELDS.items():
+        collection = db[name]
+        for field in ["_id"] + fields:
+            pending[f"{name}.{field}"] = await collection.count_documents({field: OBJECT_ID})
+    pending[STAGING_COLLECTION] = await db[STAGING_COLLECTION].count_documents({})
+    return pending
+
+async def convert_references(collection, field):
+    """Rewrite a reference field in place with one pipeline update ($toString, MongoDB 4.2+)"""
+    result = await collection.update_many({field: OBJECT_ID}, [{"$set": {field: {"$toString": f"${field}"}}}])
+    return result.modified_count
+
+async def unique_indexes(collection):
+    """Key fields and sparse flag of every unique index except the one on `_id`"""
+    indexes = []
+    for name, info in (await collection.index_information()).items():
+        if info.get("unique") and name != "_id_":
+            indexes.append(([key for key, _ in info["key"]], info.get("sparse", False)))
+    return indexes
+
+async def find_conflict(collection, original, copy, indexes):
+    """
+    Why the string-ID copy of `original` cannot be written, or None if it can
+
+    A copy identical to a document already stored under the string ID is not a conflict
+    (the original is a leftover duplicate and is simply removed).
+    """
+    existing = await collection.find_one({"_id": copy["_id"]})
+    if existing is not None:
+        return None if existing == copy else f"a different document already has _id {copy['_id']!r}"
+
+    for keys, sparse in indexes:
+        if sparse and any(key not in copy for key in keys):
+            continue
+        query = {key: copy.get(key) for key in keys}
+        query["_id"] = {"$nin": [original["_id"], copy["_id"]]}
+        other = await collection.find_one(query, {"_id": 1})
+        if other is not None:
+            return f"unique index on {keys} is already used by {other['_id']!r}"
+    return None
+
+async def finish_staged(db, name):
+    """
+    Complete copies left in the staging collection by an interrupted run
+    A copy is inserted only when neither its original nor the string-ID document exists any more.
+    """
+    collection, staging = db[name], db[STAGING_COLLECTION]
+    finished = 0
+    async for staged in staging.find({"collection": name}):
+        copy = staged["document"]
+        original = await collection.find_one({"_id": staged["original_id"]}, {"_id": 1})
+        if original is None and await collection.find_one({"_id": copy["_id"]}, {"_id": 1}) is None:
+            await collection.insert_one(copy)
+            finished += 1
+        await staging.delete_one({"_id": staged["_id"]})
+    return finished
+
+async def convert_ids(db, name, backup_file, batch_size):
+    """
+    `_id` is immutable, so each document is re-inserted under its string ID and the original deleted
+
+    For every batch the originals are appended to `backup_file`, the string-ID copies are written
+    to the staging collection, and only then are the originals deleted and the copies inserted.
+    An interrupted run is finished by `finish_staged` on the next run. Delete runs before insert so
+    unique indexes (e.g. users.email) do not reject the copy; copies that would still conflict with
+    another document are skipped, reported and their original kept.
+
+    Returns:
+        (converted, skipped) where skipped lists (original _id, reason)
+    """
+    collection, staging = db[name], db[STAGING_COLLECTION]
+    indexes = await unique_indexes(collection)
+    converted, skipped = 0, []
+    skipped_ids = []
+    while True:
+        query = {"_id": {**OBJECT_ID, "$nin": skipped_ids}} if skipped_ids else {"_id": OBJECT_ID}
+        batch = await collection.find(query).limit(batch_size).to_list(length=batch_size)
+        if not batch:
+            return converted, skipped
+
+        to_insert, to_delete = [], []
+        for document in batch:
+            copy = {**document, "_id": str(document["_id"])}
+            reason = await find_conflict(collection, document, copy, indexes)
+            if reason is not None:
+                skipped.append((document["_id"], reason))
+                skipped_ids.append(document["_id"])
+                continue
+            to_delete.append(document["_id"])
+            if await collection.find_one({"_id": copy["_id"]}, {"_id": 1}) is None:
+                to_insert.append((document["_id"], copy))
+        if not to_delete:
+            continue
+
+        for document in batch:
+            if document["_id"] in to_delete:
+                backup_file.write(json_util.dumps({"collection": name, "document": document}) + "\n")
+        backup_file.flush()
+
+        staged = [{"_id": f"{name}:{copy['_id']}", "collection": name, "original_id": original_id, "document": copy}
+                  for original_id, copy in to_insert]
+        if staged:
+            await staging.insert_many(staged)
+        await collection.delete_many({"_id": {"$in": to_delete}})
+        if to_insert:
+            await collection.insert_many([copy for _, copy in to_insert])
+        if staged:
+            await staging.delete_many({"_id": {"$in": [document["_id"] for document in staged]}})
+        converted += len(to_delete)
+
+async def restore(db, backup_path):
+    """
+    Put the original documents from a backup file back under their ObjectId
+    The string-ID copy is removed first; documents are restored as they were at migration time.
+    References rewritten by `convert_references` stay strings, which the services still match
+    while LEGACY_OBJECT_ID_LOOKUP is on.
+    """
+    restored = 0
+    with open(backup_path, "r", encoding="utf-8") as backup_file:
+        for line in backup_file:
+            if not line.strip():
+                continue
+            entry = json_util.loads(line)
+            collection, document = db[entry["collection"]], entry["document"]
+            await collection.delete_one({"_id": str(document["_id"])})
+            await collection.replace_one({"_id": document["_id"]}, document, upsert=True)
+            restored += 1
+    return restored
+
+async def migrate(args):
+    await MongoDB.connect_to_mongo()
+    db = MongoDB.db
+    try:
+        if args.restore:
+            print(f"Restored {await restore(db, args.restore)} document(s) from {args.restore}")
+            return 0
+
+        pending = await count_pending(db)
+        for key, count in pending.items():
+            print(f"{key}: {count} ObjectId value(s)" if key != STAGING_COLLECTION else f"{key}: {count} unfinished copy(ies)")
+        if args.dry_run or not any(pending.values()):
+            return sum(pending.values())
+
+        skipped = []
+        with open(args.backup, "a", encoding="utf-8") as backup_file:
+            for name, fields in ID_FIELDS.items():
+                collection = db[name]
+                finished = await finish_staged(db, name)
+                if finished:
+                    print(f"Finished {finished} interrupted {name} copy(ies)")
+                if pending[f"{name}._id"]:
+                    converted, conflicts = await convert_ids(db, name, backup_file, args.batch_size)
+                    print(f"Converting {name}._id ... {converted} document(s)")
+                    skipped += [(name, original_id, reason) for original_id, reason in conflicts]
+                for field in fields:
+                    if pending[f"{name}.{field}"]:
+                        print(f"Converting {name}.{field} ... {await convert_references(collection, field)} document(s)")
+        print(f"Originals saved to {args.backup}")
+
+        for name, original_id, reason in skipped:
+            print(f"Skipped {name} {original_id}: {reason}")
+        remaining = sum((await count_pending(db)).values())
+        print("Migration complete." if not remaining else f"{remaining} value(s) left, resolve the skipped documents and re-run the migration.")
+        return remaining
+    finally:
+        await MongoDB.close_mongo_connection()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Convert ObjectId IDs and references to strings")
+    parser.add_argument("--dry-run", action="store_true", help="Only count the values that need converting")
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--backup", default=f"id_migration_backup_{datetime.utcnow():%Y%m%d%H%M%S}.jsonl",
+                        help="JSON lines file receiving the original documents before they are re-inserted")
+    parser.add_argument("--restore", metavar="BACKUP", default=None,
+                        help="Restore the original documents from a backup file instead of migrating")
+    args = parser.parse_args()
+    remaining = asyncio.run(migrate(args))
+    sys.exit(0 if not remaining else 1)
@@ -9,6 +9,8 @@ from .v1.configs.middleware import setup_middlewares
 from .v1.configs.exceptions import setup_exception_handlers
 from .v1.configs.logging_config import setup_logging
 from .v1.configs.app_config import settings
+from .v1.services import user_service, exercise_service, video_service, prediction_service
+from .v1.core.cache import cache_stats
 
 logger = logging.getLogger(__name__)
 
@@ -25,6 +27,13 @@ async def lifespan(app: FastAPI):
     logger.info("Connecting to MongoDB...")
     await MongoDB.connect_to_mongo()
     
+    # Create the indexes the list and feed queries rely on (no-op when they already exist)
+    for service in (user_service, exercise_service, video_service, prediction_service):
+        try:
+            await service.ensure_indexes()
+        except Exception as e:
+            logger.warning(f"Failed to create indexes for {service.COLLECTION_NAME}: {str(e)}")
+    
     # Yield control to the application
     yield
     
@@ -59,6 +68,6 @@ def create_app():
     @app.get("/health", tags=["Health"])
     async def health_check():
         """Health check endpoint for Kubernetes/monitoring"""
-        return {"status": "healthy", "version": settings.APP_VERSION}
+        return {"status": "healthy", "version": settings.APP_VERSION, "caches": cache_stats()}
     
     return app
\ No newline at end of file
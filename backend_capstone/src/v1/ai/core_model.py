@@ -1,4 +1,5 @@
 import copy
+import math
 import torch
 import os
 import torch.nn as nn
@@ -6,6 +7,7 @@ from typing import Optional
 from dataclasses import dataclass
 from torch import Tensor
 import torch_geometric.nn as gnn
+from .graph import NUM_JOINTS, SKELETON_EDGES
 
 def _get_clones(mod, n):
     return nn.ModuleList([copy.deepcopy(mod) for _ in range(n)])
@@ -82,6 +84,69 @@ class SPOTER(nn.Module):
         res = self.linear_class(h)
         return res
 
+def lengths_to_mask(lengths, max_len):
+    """
+    Padding mask (B, max_len) from per-sample frame counts, True at padded positions.
+    """
+    positions = torch.arange(max_len, device=lengths.device)
+    return positions[None, :] >= lengths[:, None]
+
+def infer_padding_mask(inputs):
+    """
+    Padding mask for an already padded (B, T, 33, 3) batch: padded frames have 33 identical keypoints.
+    The first frame is always kept so attention is never fully masked.
+    """
+    mask = (inputs - inputs[:, :, :1]).abs().amax(dim=(2, 3)) == 0
+    mask[:, 0] = False
+    return mask
+
+def sinusoidal_encoding(max_len, dim):
+    position = torch.arange(max_len, dtype=torch.float32)[:, None]
+    div_term = torch.exp(torch.arange(0, dim, 2, dtype=torch.float32) * (-math.log(10000.0) / dim))
+    encoding = torch.zeros(max_len, dim)
+    encoding[:, 0::2] = torch.sin(position * div_term)
+    encoding[:, 1::2] = torch.cos(position * div_term)[:, :dim // 2]
+    return encoding
+
+class FrameSPOTER(nn.Module):
+    """
+    SPOTER variant with one token per frame, positional encodings and key padding masks.
+    """
+    def __init__(self, num_classes, hidden_dim, max_frame, num_heads, encoder_layers, decoder_layers):
+        super().__init__()
+        self.max_frame = max_frame
+        self.input_projection = nn.Linear(33 * 3, hidden_dim)
+        self.register_buffer("pos_encoding", sinusoidal_encoding(max_frame, hidden_dim))
+        self.class_query = nn.Parameter(torch.rand(1, hidden_dim))
+        self.transformer = nn.Transformer(
+            d_model=hidden_dim,
+            nhead=num_heads,
+            num_encoder_layers=encoder_layers,
+            num_decoder_layers=decoder_layers
+        )
+        self.linear_class = nn.Linear(hidden_dim, num_classes)
+
+        custom_decoder_layer = SPOTERTransformerDecoderLayer(
+            self.transformer.d_model, self.transformer.nhead, 2048, 0.1, "relu"
+        )
+        self.transformer.decoder.layers = _get_clones(custom_decoder_layer, self.transformer.decoder.num_layers)
+
+    def forward(self, inputs, lengths=None, mask=None):
+        batch_size, num_frames = inputs.shape[:2]
+        if num_frames > self.max_frame:
+            raise ValueError(f"Clip has {num_frames} frames, more than max_frame={self.max_frame}")
+        if mask is None:
+            mask = lengths_to_mask(lengths, num_frames) if lengths is not None else infer_padding_mask(inputs)
+
+        # One token per frame: (B, T, 99) -> (T, B, hidden_dim)
+        h = self.input_projection(inputs.flatten(start_dim=2).float())
+        h = h + self.pos_encoding[:num_frames]
+        h = h.permute(1, 0, 2)
+
+        class_query = self.class_query.unsqueeze(1).repeat(1, batch_size, 1)
+        h = self.transformer(h, class_query, src_key_padding_mask=mask, memory_key_padding_mask=mask)
+        return self.linear_class(h.squeeze(0))
+
 class YogaGCN(nn.Module):
     """
     Simple GCN-based model for yoga pose classification.
@@ -101,4 +166,77 @@ class YogaGCN(nn.Module):
         x = self.conv4(x, edge_index).relu()
         x = gnn.global_mean_pool(x, batch)
         x = self.fc(x)
-        return x
\ No newline at end of file
+        return x
+
+def normalized_adjacency(num_joints=NUM_JOINTS, edges=SKELETON_EDGES):
+    """
+    Normalized skeleton adjacency D^-1/2 (A + I) D^-1/2 (undirected, with self-loops).
+    """
+    adjacency = torch.eye(num_joints)
+    for i, j in edges:
+        adjacency[i, j] = adjacency[j, i] = 1
+    degree = adjacency.sum(dim=1).pow(-0.5)
+    return degree[:, None] * adjacency * degree[None, :]
+
+class STGCNBlock(nn.Module):
+    """
+    Spatial graph conv over the fixed adjacency followed by a temporal conv, with a residual.
+    """
+    def __init__(self, in_channels, out_channels, temporal_kernel=9, stride=1, dropout=0.1):
+        super().__init__()
+        padding = (temporal_kernel - 1) // 2
+        self.spatial = nn.Conv2d(in_channels, out_channels, kernel_size=1)
+        self.spatial_bn = nn.BatchNorm2d(out_channels)
+        self.temporal = nn.Sequential(
+            nn.Conv2d(out_channels, out_channels, kernel_size=(temporal_kernel, 1), stride=(stride, 1), padding=(padding, 0)),
+            nn.BatchNorm2d(out_channels),
+            nn.Dropout(dropout)
+        )
+        if in_channels == out_channels and stride == 1:
+            self.residual = nn.Identity()
+        else:
+            self.residual = nn.Sequential(
+                nn.Conv2d(in_channels, out_channels, kernel_size=1, stride=(stride, 1)),
+                nn.BatchNorm2d(out_channels)
+            )
+
+    def forward(self, x, adjacency):
+        res = self.residual(x)
+        x = torch.einsum("nctv,vw->nctw", self.spatial(x), adjacency)
+        x = self.spatial_bn(x).relu()
+        x = self.temporal(x)
+        return (x + res).relu()
+
+class STGCN(nn.Module):
+    """
+    Dense spatio-temporal GCN over (B, C, T, V) tensors; also accepts (B, T, 33, 3).
+    """
+    def __init__(self, in_channels=3, hidden_dim=64, num_classes=4, num_layers=4, temporal_kernel=9, dropout=0.1):
+        super().__init__()
+        self.register_buffer("adjacency", normalized_adjacency())
+        self.data_bn = nn.BatchNorm1d(in_channels * NUM_JOINTS)
+
+        blocks = []
+        channels = in_channels
+        for i in range(num_layers):
+            stride = 2 if num_layers > 1 and i == num_layers // 2 else 1
+            blocks.append(STGCNBlock(channels, hidden_dim, temporal_kernel, stride, dropout))
+            channels = hidden_dim
+        self.blocks = nn.ModuleList(blocks)
+        self.fc = nn.Linear(hidden_dim, num_classes)
+
+    def forward(self, inputs):
+        x = inputs.float()
+        if x.shape[-1] != NUM_JOINTS:
+            x = x.permute(0, 3, 1, 2)  # (B, T, V, C) -> (B, C, T, V)
+        batch_size, channels, num_frames, num_joints = x.shape
+
+        # Normalize each (joint, channel) over time
+        x = x.permute(0, 3, 1, 2).reshape(batch_size, num_joints * channels, num_frames)
+        x = self.data_bn(x)
+        x = x.view(batch_size, num_joints, channels, num_frames).permute(0, 2, 3, 1).contiguous()
+
+        for block in self.blocks:
+            x = block(x, self.adjacency)
+        x = x.mean(dim=(2, 3))
+        return self.fc(x)
@@ -1,9 +1,10 @@
 import torch
-from typing import Dict
+from typing import Dict, Optional
 # Adjust import as needed based on your folder structure:
 from ..configs.config_model import Config
 from .model_service import load_model
-from ..ai.core_model import SPOTER, YogaGCN 
+from .precision import maybe_compile
+from ..ai.core_model import SPOTER, FrameSPOTER, YogaGCN, STGCN
 
 class ModelProvider:
     """
@@ -14,29 +15,41 @@ class ModelProvider:
     _classes = Config.CLASS_LABELS
 
     @classmethod
-    def get_model(cls) -> torch.nn.Module:
+    def get_model(cls, model_name: Optional[str] = None) -> torch.nn.Module:
         """
         Return a loaded model instance, caching it so we only load once.
+        Defaults to the configured model; `model_name` loads another one (e.g. for benchmarks).
         """
-        if cls._model_name not in cls._models:
+        model_name = model_name or cls._model_name
+        if model_name not in cls._models:
             # If your model name is "gcn", build a GCN instance:
-            if cls._model_name == "gcn":
+            if model_name == "gcn":
                 model = YogaGCN(in_channels=3, hidden_dim=256, num_classes=len(cls._classes))
                 checkpoint_path = Config.CHECKPOINT_PATH_GCN
 
             # If you also have "spoter", you could do:
-            elif cls._model_name == "spoter":
+            elif model_name == "spoter":
                 model = SPOTER(hidden_dim=18, num_classes=len(cls._classes), max_frame=100, num_heads=9, encoder_layers=1, decoder_layers=1)
                 checkpoint_path = Config.CHECKPOINT_PATH_SPOTER
 
+            # SPOTER with one token per frame and padding masks
+            elif model_name == "frame_spoter":
+                model = FrameSPOTER(hidden_dim=72, num_classes=len(cls._classes), max_frame=Config.MAX_FRAMES, num_heads=9, encoder_layers=2, decoder_layers=1)
+                checkpoint_path = Config.CHECKPOINT_PATH_FRAME_SPOTER
+
+            # Dense spatio-temporal GCN
+            elif model_name == "stgcn":
+                model = STGCN(in_channels=3, hidden_dim=64, num_classes=len(cls._classes), num_layers=4, temporal_kernel=9)
+                checkpoint_path = Config.CHECKPOINT_PATH_STGCN
+
             else:
-                raise ValueError(f"Unknown model name: {cls._model_name}")
+                raise ValueError(f"Unknown model name: {model_name}")
 
             # Load the checkpoint from config
             model = load_model(checkpoint_path, model)
-            cls._models[cls._model_name] = model
+            cls._models[model_name] = maybe_compile(model, Config.COMPILE)
 
-        return cls._models[cls._model_name]
+        return cls._models[model_name]
 
     @classmethod
     def get_model_name(cls) -> str:
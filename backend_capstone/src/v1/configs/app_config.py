@@ -16,6 +16,16 @@ class AppSettings(BaseSettings):
     # MongoDB settings
     MONGO_URI: str = os.environ.get("MONGO_URI", "mongodb://localhost:27017")
     DB_NAME: str = os.environ.get("DB_NAME", "exercise_tracker_db")
+    # Also match IDs stored as ObjectId; turn off once migrate_ids.py has run
+    LEGACY_OBJECT_ID_LOOKUP: bool = os.environ.get("LEGACY_OBJECT_ID_LOOKUP", "True").lower() in ("true", "1", "t")
+    # Write a prediction and its exercise status in one transaction (requires a replica set)
+    USE_TRANSACTIONS: bool = os.environ.get("USE_TRANSACTIONS", "False").lower() in ("true", "1", "t")
+    
+    # Cache settings (users / exercises, see core/cache.py)
+    CACHE_BACKEND: str = os.environ.get("CACHE_BACKEND", "memory")  # "memory", "redis" or "off"
+    CACHE_TTL_SECONDS: float = float(os.environ.get("CACHE_TTL_SECONDS", "30"))
+    CACHE_MAX_ENTRIES: int = int(os.environ.get("CACHE_MAX_ENTRIES", "1024"))
+    CACHE_REDIS_URL: str = os.environ.get("CACHE_REDIS_URL", "redis://localhost:6379/0")
     
     # Security settings
     SECRET_KEY: str = os.environ.get("SECRET_KEY", "your-secret-key-for-development-only")
@@ -21,7 +21,35 @@ class Config:
         "best_checkpoint.pt"
     )
 
-    MODEL_NAME = "gcn" # or "gcn"
+    CHECKPOINT_PATH_FRAME_SPOTER = os.path.join(
+        BASE_DIR, 
+        "checkpoints", 
+        "frame_spoter", 
+        "finetune", 
+        "best_checkpoint.pt"
+    )
+
+    CHECKPOINT_PATH_STGCN = os.path.join(
+        BASE_DIR, 
+        "checkpoints", 
+        "stgcn", 
+        "finetune", 
+        "best_checkpoint.pt"
+    )
+
+    MODEL_NAME = "gcn" # "spoter", "frame_spoter", "gcn" or "stgcn"
+
+    # Frame sampling, must match the policy used to extract the training keypoints
+    SAMPLING_POLICY = "fps_stride"  # "fps_stride", "uniform_k" or "all"
+    SAMPLING_FPS = 10
+    MAX_FRAMES = 100
+
+    # GCN graph: must match model.temporal_edges used for training
+    GCN_TEMPORAL_EDGES = False
+
+    # Inference mode: "fp32" or "autocast" (bf16 on CPU, fp16 on CUDA), optionally torch.compile'd
+    PRECISION = os.environ.get("MODEL_PRECISION", "fp32")
+    COMPILE = os.environ.get("MODEL_COMPILE", "False").lower() in ("true", "1", "t")
 
     # For example, if you have 4 classes:
     CLASS_LABELS = ["Dangchanraxanghiengminh", "Ngoithangbangtrengot", "Sodatvuonlen", "Xemxaxemgan"]
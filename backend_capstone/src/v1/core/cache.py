@@ -0,0 +1,139 @@
+"""
+Read-through caches for documents that are read far more often than they change (users, exercises)
+
+Backends, selected with CACHE_BACKEND:
+- "memory" (default): per-process LRU with a TTL. Other uvicorn workers may serve a stale copy
+  for up to CACHE_TTL_SECONDS after an update.
+- "redis": entries shared by all workers (requires the `redis` package and CACHE_REDIS_URL),
+  so an invalidation is seen everywhere immediately.
+- "off": no caching.
+"""
+import time
+import logging
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional
+from ..configs.app_config import settings
+
+logger = logging.getLogger(__name__)
+
+class MemoryCache:
+    """In-process LRU cache whose entries expire `ttl` seconds after they were stored"""
+
+    def __init__(self, name: str, ttl: float, max_entries: int):
+        self.name = name
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    async def get(self, key: str) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None or entry[0] < time.monotonic():
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    async def set(self, key: str, value: Any) -> None:
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    async def delete(self, key: str) -> None:
+        if self._entries.pop(key, None) is not None:
+            self.invalidations += 1
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "backend": "memory",
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations
+        }
+
+class RedisCache(MemoryCache):
+    """Cache shared by every worker through Redis (JSON values, expiry handled by Redis)"""
+
+    def __init__(self, name: str, ttl: float, client, loads: Callable[[str], Any]):
+        super().__init__(name, ttl, max_entries=0)
+        self.client = client
+        self.loads = loads
+
+    def _key(self, key: str) -> str:
+        return f"cache:{self.name}:{key}"
+
+    async def get(self, key: str) -> Optional[Any]:
+        data = await self.client.get(self._key(key))
+        if data is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return self.loads(data)
+
+    async def set(self, key: str, value: Any) -> None:
+        await self.client.set(self._key(key), value.model_dump_json(by_alias=True), ex=max(1, int(self.ttl)))
+
+    async def delete(self, key: str) -> None:
+        self.invalidations += await self.client.delete(self._key(key))
+
+    def stats(self) -> Dict[str, Any]:
+        return super().stats() | {"backend": "redis", "entries": None}
+
+class DisabledCache(MemoryCache):
+    """Cache that never stores anything (CACHE_BACKEND=off)"""
+
+    async def set(self, key: str, value: Any) -> None:
+        pass
+
+    def stats(self) -> Dict[str, Any]:
+        return super().stats() | {"backend": "off"}
+
+_caches: Dict[str, MemoryCache] = {}
+_redis_client = None
+
+def _get_redis_client():
+    global _redis_client
+    if _redis_client is None:
+        import redis.asyncio as redis
+        _redis_client = redis.from_url(settings.CACHE_REDIS_URL)
+    return _redis_client
+
+def get_cache(name: str, loads: Callable[[str], Any]) -> MemoryCache:
+    """
+    Get (or create) the cache called `name` for the configured backend
+
+    Args:
+        name: Cache name, also the Redis key prefix
+        loads: Rebuilds a cached value from its JSON form (Redis backend only),
+            e.g. `User.model_validate_json`
+    """
+    if name not in _caches:
+        backend = settings.CACHE_BACKEND.lower()
+        ttl, max_entries = settings.CACHE_TTL_SECONDS, settings.CACHE_MAX_ENTRIES
+        if backend == "redis":
+            try:
+                _caches[name] = RedisCache(name, ttl, _get_redis_client(), loads)
+            except ImportError:
+                logger.warning("CACHE_BACKEND=redis but the redis package is not installed, using the in-process cache")
+                _caches[name] = MemoryCache(name, ttl, max_entries)
+        elif backend == "off":
+            _caches[name] = DisabledCache(name, ttl, max_entries)
+        else:
+            _caches[name] = MemoryCache(name, ttl, max_entries)
+    return _caches[name]
+
+def cache_stats() -> Dict[str, Dict[str, Any]]:
+    """Hit / miss counters of every cache in this process"""
+    return {name: cache.stats() for name, cache in _caches.items()}
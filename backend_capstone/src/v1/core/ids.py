@@ -0,0 +1,68 @@
+"""
+Query helpers for document IDs
+
+IDs and references (`_id`, `assigned_to`, `video_id`, ...) are stored as strings, the form
+written by the PyObjectId models. Older databases may still hold ObjectIds: while
+LEGACY_OBJECT_ID_LOOKUP is on, filters also match that form. Run `migrate_ids.py` once,
+then turn the flag off so every lookup is a plain exact match.
+"""
+from typing import Any, Dict, Iterable, List
+from bson import ObjectId
+from ..configs.app_config import settings
+
+# Temporary field holding every form of a local ID while joining (see id_lookup)
+LOOKUP_IDS = "_lookup_ids"
+
+def id_filter(field: str, value: Any) -> Dict[str, Any]:
+    """
+    Filter matching one ID in a single query
+
+    Args:
+        field: The ID field, e.g. "_id" or "assigned_to"
+        value: The ID as a string or ObjectId
+
+    Returns:
+        {field: id}, or {field: {"$in": [id, ObjectId(id)]}} in legacy mode
+    """
+    value = str(value)
+    if settings.LEGACY_OBJECT_ID_LOOKUP and ObjectId.is_valid(value):
+        return {field: {"$in": [value, ObjectId(value)]}}
+    return {field: value}
+
+def ids_filter(field: str, values: Iterable[Any]) -> Dict[str, Any]:
+    """Filter matching any of several IDs (both forms of each in legacy mode)"""
+    ids = list(dict.fromkeys(str(value) for value in values))
+    if settings.LEGACY_OBJECT_ID_LOOKUP:
+        ids += [ObjectId(value) for value in ids if ObjectId.is_valid(value)]
+    return {field: {"$in": ids}}
+
+def id_lookup(from_collection: str, local_field: str, foreign_field: str, as_field: str) -> List[Dict[str, Any]]:
+    """
+    Aggregation stages joining another collection on an ID field
+
+    In legacy mode one side may hold a string and the other an ObjectId, which a plain
+    localField/foreignField join never matches. Every form of the local ID is then put in a
+    temporary array: `$lookup` matches any element of an array localField, still through the
+    index on the foreign field.
+
+    Args:
+        from_collection: Collection to join
+        local_field: ID field of the input documents, e.g. "_id"
+        foreign_field: ID field of the joined collection, e.g. "video_id"
+        as_field: Output array field
+
+    Returns:
+        The stages to splice into the pipeline
+    """
+    if not settings.LEGACY_OBJECT_ID_LOOKUP:
+        return [{"$lookup": {"from": from_collection, "localField": local_field,
+                             "foreignField": foreign_field, "as": as_field}}]
+
+    value = f"${local_field}"
+    forms = [value, {"$toString": value}, {"$convert": {"input": value, "to": "objectId", "onError": None, "onNull": None}}]
+    return [
+        # Drop nulls, which would otherwise match every document missing the foreign field
+        {"$addFields": {LOOKUP_IDS: {"$filter": {"input": forms, "cond": {"$ne": ["$$this", None]}}}}},
+        {"$lookup": {"from": from_collection, "localField": LOOKUP_IDS, "foreignField": foreign_field, "as": as_field}},
+        {"$project": {LOOKUP_IDS: 0}},
+    ]
@@ -4,8 +4,8 @@ from typing import Dict, Any, List, Optional
 from fastapi import APIRouter, UploadFile, File, HTTPException, status, Form, Path, Query, Depends
 from ..ai.model_providers import ModelProvider
 from ..ai.model_service import predict_action
-from ..services.video_service import save_video_file, create_video_record, get_exercise_videos
-from ..services.prediction_service import analyze_video, get_video_prediction, update_prediction_feedback
+from ..services.video_service import save_video_file, create_video_record, get_videos_with_predictions
+from ..services.prediction_service import analyze_video, update_prediction_feedback
 from ..services.exercise_service import update_exercise_status, get_exercise
 from ..services.user_service import get_user
 from ..models.prediction import Prediction, PredictionStatus
@@ -190,12 +190,14 @@ async def get_videos_for_exercise(
         # Verify exercise exists
         await get_exercise(exercise_id)
         
-        # Get videos with filtering
-        videos = await get_exercise_videos(
-            exercise_id, 
+        # Get videos joined with their predictions in one query
+        videos = await get_videos_with_predictions(
+            exercise_id=exercise_id,
             start_date=start_date,
             end_date=end_date,
-            status=status,
+            prediction_status=status,
+            video_fields=["patient_id", "file_name", "upload_date", "file_path", "file_size", "content_type"],
+            prediction_fields=["predicted_motion", "is_match", "confidence_score", "status", "created_at"],
             skip=pagination.skip,
             limit=pagination.limit
         )
@@ -203,25 +205,25 @@ async def get_videos_for_exercise(
         result = []
         
         for video in videos:
-            prediction = await get_video_prediction(str(video.id))
+            prediction = video.get("prediction")
             result.append({
                 "video": {
-                    "id": str(video.id),
-                    "filename": video.file_name,
-                    "upload_date": video.upload_date,
-                    "file_path": video.file_path,
-                    "file_size": video.file_size,
-                    "content_type": video.content_type
+                    "id": str(video["_id"]),
+                    "filename": video.get("file_name"),
+                    "upload_date": video.get("upload_date"),
+                    "file_path": video.get("file_path"),
+                    "file_size": video.get("file_size"),
+                    "content_type": video.get("content_type")
                 },
                 "prediction": {
-                    "id": str(prediction.id) if prediction else None,
-                    "predicted_motion": prediction.predicted_motion if prediction else None,
-                    "is_match": prediction.is_match if prediction else None,
-                    "confidence_score": prediction.confidence_score if prediction else None,
-                    "status": prediction.status if prediction else None,
-                    "created_at": prediction.created_at if prediction else None
+                    "id": str(prediction["_id"]) if prediction else None,
+                    "predicted_motion": prediction.get("predicted_motion") if prediction else None,
+                    "is_match": prediction.get("is_match") if prediction else None,
+                    "confidence_score": prediction.get("confidence_score") if prediction else None,
+                    "status": prediction.get("status") if prediction else None,
+                    "created_at": prediction.get("created_at") if prediction else None
                 },
-                "patient_id": str(video.patient_id)
+                "patient_id": str(video.get("patient_id"))
             })
         
         return result
@@ -2,9 +2,9 @@ from typing import List, Dict, Any, Optional
 from fastapi import APIRouter, HTTPException, status, Query, Depends
 from datetime import datetime
 from ..models.prediction import Prediction
-from ..services.prediction_service import get_prediction, get_exercise_predictions, get_patient_predictions
+from ..services.prediction_service import get_prediction, get_exercise_predictions, get_patient_predictions, get_doctor_prediction_feed
 from ..services.user_service import get_user
-from ..services.exercise_service import get_doctor_assigned_exercises, get_exercise
+from ..services.exercise_service import get_exercise
 from ..core.pagination import PaginationParams, get_pagination_params
 
 router = APIRouter(prefix="/predictions", tags=["Predictions"])
@@ -131,7 +131,7 @@ async def get_predictions_for_doctor_patients(
     doctor_id: str,
     start_date: Optional[datetime] = None,
     end_date: Optional[datetime] = None,
-    status: Optional[str] = None,
+    prediction_status: Optional[str] = Query(None, alias="status"),
     pagination: PaginationParams = Depends(get_pagination_params)
 ):
     """
@@ -141,11 +141,11 @@ async def get_predictions_for_doctor_patients(
         doctor_id: The doctor's unique identifier
         start_date: Optional filter for predictions after this date
         end_date: Optional filter for predictions before this date
-        status: Optional filter for prediction status
-        pagination: Pagination parameters
+        prediction_status: Optional filter for prediction status (`status` query parameter)
+        pagination: Pagination parameters (applied across all of the doctor's exercises)
         
     Returns:
-        List of predictions with exercise details
+        List of predictions with exercise details, newest first
         
     Raises:
         HTTPException: If doctor not found or other errors occur
@@ -159,38 +159,35 @@ async def get_predictions_for_doctor_patients(
                 detail="User is not a doctor"
             )
         
-        # Get all exercises assigned by this doctor
-        doctor_exercises = await get_doctor_assigned_exercises(doctor_id)
+        # One query over all exercises assigned by this doctor, paginated globally
+        predictions = await get_doctor_prediction_feed(
+            doctor_id,
+            start_date=start_date,
+            end_date=end_date,
+            prediction_status=prediction_status,
+            skip=pagination.skip,
+            limit=pagination.limit
+        )
         
         result = []
-        for exercise in doctor_exercises:
-            # Get filtered predictions for each exercise
-            predictions = await get_exercise_predictions(
-                str(exercise.id),
-                start_date=start_date,
-                end_date=end_date,
-                status=status,
-                skip=pagination.skip,
-                limit=pagination.limit
-            )
-            
-            for prediction in predictions:
-                result.append({
-                    "exercise": {
-                        "id": str(exercise.id),
-                        "name": exercise.name,
-                        "description": exercise.description,
-                        "status": exercise.status
-                    },
-                    "prediction": {
-                        "id": str(prediction.id),
-                        "predicted_motion": prediction.predicted_motion,
-                        "confidence_score": prediction.confidence_score,
-                        "is_match": prediction.is_match,
-                        "created_at": prediction.created_at
-                    },
-                    "patient_id": str(prediction.patient_id)
-                })
+        for prediction in predictions:
+            exercise = prediction.get("exercise") or {}
+            result.append({
+                "exercise": {
+                    "id": str(prediction["exercise_id"]),
+                    "name": exercise.get("name"),
+                    "description": exercise.get("description"),
+                    "status": exercise.get("status")
+                },
+                "prediction": {
+                    "id": str(prediction["_id"]),
+                    "predicted_motion": prediction.get("predicted_motion"),
+                    "confidence_score": prediction.get("confidence_score"),
+                    "is_match": prediction.get("is_match"),
+                    "created_at": prediction.get("created_at")
+                },
+                "patient_id": str(prediction.get("patient_id"))
+            })
         
         return result
     except HTTPException:
@@ -207,7 +204,7 @@ async def get_predictions_by_doctor_and_patient(
     patient_id: str,
     start_date: Optional[datetime] = None,
     end_date: Optional[datetime] = None,
-    status: Optional[str] = None,
+    prediction_status: Optional[str] = Query(None, alias="status"),
     pagination: PaginationParams = Depends(get_pagination_params)
 ):
     """
@@ -218,11 +215,11 @@ async def get_predictions_by_doctor_and_patient(
         patient_id: The patient's unique identifier
         start_date: Optional filter for predictions after this date
         end_date: Optional filter for predictions before this date
-        status: Optional filter for prediction status
-        pagination: Pagination parameters
+        prediction_status: Optional filter for prediction status (`status` query parameter)
+        pagination: Pagination parameters (applied across all of the patient's exercises)
         
     Returns:
-        List of predictions with exercise details
+        List of predictions with exercise details, newest first
         
     Raises:
         HTTPException: If doctor/patient not found or other errors occur
@@ -239,41 +236,36 @@ async def get_predictions_by_doctor_and_patient(
         # Verify patient exists
         await get_user(patient_id)
         
-        # Get all exercises assigned by this doctor to this patient
-        doctor_exercises = await get_doctor_assigned_exercises(doctor_id)
-        patient_exercises = [e for e in doctor_exercises if str(e.assigned_to) == patient_id]
+        # One query over the exercises this doctor assigned to this patient, paginated globally
+        predictions = await get_doctor_prediction_feed(
+            doctor_id,
+            patient_id=patient_id,
+            start_date=start_date,
+            end_date=end_date,
+            prediction_status=prediction_status,
+            skip=pagination.skip,
+            limit=pagination.limit
+        )
         
         result = []
-        for exercise in patient_exercises:
-            # Get filtered predictions for each exercise
-            predictions = await get_exercise_predictions(
-                str(exercise.id),
-                start_date=start_date,
-                end_date=end_date,
-                status=status,
-                skip=pagination.skip,
-                limit=pagination.limit
-            )
-            
-            for prediction in predictions:
-                # Double check this prediction belongs to the patient
-                if str(prediction.patient_id) == patient_id:
-                    result.append({
-                        "exercise": {
-                            "id": str(exercise.id),
-                            "name": exercise.name,
-                            "description": exercise.description,
-                            "status": exercise.status,
-                            "assigned_date": exercise.assigned_date
-                        },
-                        "prediction": {
-                            "id": str(prediction.id),
-                            "predicted_motion": prediction.predicted_motion,
-                            "confidence_score": prediction.confidence_score,
-                            "is_match": prediction.is_match,
-                            "created_at": prediction.created_at
-                        }
-                    })
+        for prediction in predictions:
+            exercise = prediction.get("exercise") or {}
+            result.append({
+                "exercise": {
+                    "id": str(prediction["exercise_id"]),
+                    "name": exercise.get("name"),
+                    "description": exercise.get("description"),
+                    "status": exercise.get("status"),
+                    "assigned_date": exercise.get("assigned_date")
+                },
+                "prediction": {
+                    "id": str(prediction["_id"]),
+                    "predicted_motion": prediction.get("predicted_motion"),
+                    "confidence_score": prediction.get("confidence_score"),
+                    "is_match": prediction.get("is_match"),
+                    "created_at": prediction.get("created_at")
+                }
+            })
         
         return result
     except HTTPException:
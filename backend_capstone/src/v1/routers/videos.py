@@ -1,8 +1,9 @@
 from typing import List, Dict, Any
-from fastapi import APIRouter, HTTPException, status
+from fastapi import APIRouter, HTTPException, status, Depends
 from ..models.video import Video, VideoUpdate
-from ..services.video_service import get_video, get_patient_videos, update_video_status, delete_video
+from ..services.video_service import get_video, update_video_status, delete_video, get_videos_with_predictions
 from ..services.prediction_service import get_video_prediction
+from ..core.pagination import PaginationParams, get_pagination_params
 
 router = APIRouter(prefix="/videos", tags=["Videos"])
 
@@ -45,28 +46,34 @@ async def remove_video(video_id: str):
     return None
 
 @router.get("/patient/{patient_id}", response_model=List[Dict[str, Any]])
-async def get_videos_by_patient(patient_id: str):
+async def get_videos_by_patient(patient_id: str, pagination: PaginationParams = Depends(get_pagination_params)):
     """
-    Get all videos uploaded by a patient with their predictions
+    Get videos uploaded by a patient with their predictions (newest first, paginated)
     """
-    videos = await get_patient_videos(patient_id)
+    videos = await get_videos_with_predictions(
+        patient_id=patient_id,
+        video_fields=["file_name", "upload_date", "status"],
+        prediction_fields=["predicted_motion", "confidence_score", "is_match", "created_at"],
+        skip=pagination.skip,
+        limit=pagination.limit
+    )
     result = []
     
     for video in videos:
-        prediction = await get_video_prediction(str(video.id))
+        prediction = video.get("prediction") or {}
         result.append({
             "video": {
-                "id": str(video.id),
-                "file_name": video.file_name,
-                "upload_date": video.upload_date,
-                "status": video.status
+                "id": str(video["_id"]),
+                "file_name": video.get("file_name"),
+                "upload_date": video.get("upload_date"),
+                "status": video.get("status")
             },
             "prediction": {
-                "predicted_motion": prediction.predicted_motion if prediction else None,
-                "confidence_score": prediction.confidence_score if prediction else None,
-                "is_match": prediction.is_match if prediction else None,
-                "created_at": prediction.created_at if prediction else None
+                "predicted_motion": prediction.get("predicted_motion"),
+                "confidence_score": prediction.get("confidence_score"),
+                "is_match": prediction.get("is_match"),
+                "created_at": prediction.get("created_at")
             }
         })
     
-    return result 
\ No newline at end of file
+    return result
\ No newline at end of file
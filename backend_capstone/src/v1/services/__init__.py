@@ -4,7 +4,8 @@ from .user_service import (
 )
 from .exercise_service import (
     create_exercise, get_exercise, update_exercise, 
-    get_patient_exercises, get_doctor_assigned_exercises, update_exercise_status
+    get_patient_exercises, get_doctor_assigned_exercises, update_exercise_status,
+    set_exercise_status
 )
 from .video_service import (
     save_video_file, create_video_record, get_video, update_video_status,
@@ -3,7 +3,8 @@ from fastapi import HTTPException, status
 from ..models.exercise import Exercise, ExerciseCreate, ExerciseInDB, ExerciseUpdate
 from ..models.user import User
 from ..configs.database import MongoDB
-from bson import ObjectId
+from ..core.ids import id_filter
+from ..core.cache import get_cache
 from datetime import datetime
 from motor.motor_asyncio import AsyncIOMotorClient
 from pymongo import DESCENDING, IndexModel, ASCENDING
@@ -18,9 +19,13 @@ INDEXES = [
     IndexModel([("assigned_to", ASCENDING)], background=True),
     IndexModel([("status", ASCENDING)], background=True),
     IndexModel([("assigned_date", ASCENDING)], background=True),
-    IndexModel([("assigned_to", ASCENDING), ("assigned_date", DESCENDING)], background=True)
+    IndexModel([("assigned_to", ASCENDING), ("assigned_date", DESCENDING)], background=True),
+    IndexModel([("assigned_by", ASCENDING), ("assigned_to", ASCENDING)], background=True)
 ]
 
+# Read-through cache of get_exercise, invalidated by update_exercise / delete_exercise / set_exercise_status
+exercise_cache = get_cache(COLLECTION_NAME, Exercise.model_validate_json)
+
 async def ensure_indexes():
     """
     Ensure all required indexes exist in the MongoDB collection
@@ -89,37 +94,25 @@ async def create_exercise(exercise: ExerciseCreate) -> Exercise:
     return Exercise(**created_exercise)
 
 async def get_exercise(exercise_id: str) -> Exercise:
-    """Get an exercise by ID (handles string and ObjectId)"""
+    """Get an exercise by ID (cached, single exact-match lookup on a miss, see core/ids.py)"""
+    cached = await exercise_cache.get(str(exercise_id))
+    if cached is not None:
+        return cached.model_copy()
+    
     collection = MongoDB.get_collection(COLLECTION_NAME)
+    exercise = await collection.find_one(id_filter("_id", exercise_id))
+    if not exercise:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Exercise not found"
+        )
     
-    # 1. Thử tìm bằng string ID
-    print(f"DEBUG EXERCISE: Searching with string ID: '{exercise_id}'")
-    exercise = await collection.find_one({"_id": exercise_id})
-    if exercise:
-        print("DEBUG EXERCISE: Found by string ID")
-        return Exercise(**exercise)
-
-    # 2. Thử tìm bằng ObjectId nếu hợp lệ
-    if ObjectId.is_valid(exercise_id):
-        print(f"DEBUG EXERCISE: String ID not found, trying ObjectId: {exercise_id}")
-        try:
-            obj_id = ObjectId(exercise_id)
-            exercise = await collection.find_one({"_id": obj_id})
-            if exercise:
-                print("DEBUG EXERCISE: Found by ObjectId")
-                return Exercise(**exercise)
-        except Exception as e:
-            print(f"DEBUG EXERCISE: Error searching with ObjectId: {str(e)}")
-
-    # Không tìm thấy
-    print(f"DEBUG EXERCISE: Not found with ID: {exercise_id}")
-    raise HTTPException(
-        status_code=status.HTTP_404_NOT_FOUND,
-        detail="Exercise not found"
-    )
+    exercise = Exercise(**exercise)
+    await exercise_cache.set(str(exercise_id), exercise)
+    return exercise.model_copy()
 
 async def update_exercise(exercise_id: str, exercise_update: ExerciseUpdate) -> Exercise:
-    """Update an exercise (handles string and ObjectId)"""
+    """Update an exercise"""
     collection = MongoDB.get_collection(COLLECTION_NAME)
     
     # Remove None values
@@ -131,15 +124,13 @@ async def update_exercise(exercise_id: str, exercise_update: ExerciseUpdate) ->
     else:
         return await get_exercise(exercise_id)
 
-    # Xây dựng query filter
-    filter_query = {"_id": exercise_id}
-    if ObjectId.is_valid(exercise_id):
-        filter_query = {"$or": [{"_id": exercise_id}, {"_id": ObjectId(exercise_id)}]}
+    filter_query = id_filter("_id", exercise_id)
 
     print(f"DEBUG EXERCISE: Update filter query: {filter_query}")
 
     # Update the exercise
     result = await collection.update_one(filter_query, {"$set": update_data})
+    await exercise_cache.delete(str(exercise_id))
 
     if result.matched_count == 0:
         raise HTTPException(
@@ -151,18 +142,16 @@ async def update_exercise(exercise_id: str, exercise_update: ExerciseUpdate) ->
     return await get_exercise(exercise_id)
 
 async def delete_exercise(exercise_id: str) -> None:
-    """Delete an exercise by ID (handles string and ObjectId)"""
+    """Delete an exercise by ID"""
     collection = MongoDB.get_collection(COLLECTION_NAME)
     
-    # Xây dựng query filter
-    filter_query = {"_id": exercise_id}
-    if ObjectId.is_valid(exercise_id):
-        filter_query = {"$or": [{"_id": exercise_id}, {"_id": ObjectId(exercise_id)}]}
+    filter_query = id_filter("_id", exercise_id)
 
     print(f"DEBUG EXERCISE: Delete filter query: {filter_query}")
 
     # Delete the exercise
     result = await collection.delete_one(filter_query)
+    await exercise_cache.delete(str(exercise_id))
 
     if result.deleted_count == 0:
         raise HTTPException(
@@ -171,14 +160,11 @@ async def delete_exercise(exercise_id: str) -> None:
         )
 
 async def get_patient_exercises(patient_id: str) -> List[Exercise]:
-    """Get all exercises assigned to a patient (handles string/ObjectId ID)"""
+    """Get all exercises assigned to a patient"""
     collection = MongoDB.get_collection(COLLECTION_NAME)
     exercises = []
     
-    # Xây dựng query filter cho patient_id
-    filter_query = {"assigned_to": patient_id}
-    if ObjectId.is_valid(patient_id):
-        filter_query = {"$or": [{"assigned_to": patient_id}, {"assigned_to": ObjectId(patient_id)}]}
+    filter_query = id_filter("assigned_to", patient_id)
 
     print(f"DEBUG EXERCISE: Get patient exercises filter: {filter_query}")
     cursor = collection.find(filter_query).sort("assigned_date", DESCENDING)
@@ -195,14 +181,11 @@ async def get_patient_exercises(patient_id: str) -> List[Exercise]:
     return exercises
 
 async def get_doctor_assigned_exercises(doctor_id: str) -> List[Exercise]:
-    """Get all exercises assigned by a doctor (handles string/ObjectId ID)"""
+    """Get all exercises assigned by a doctor"""
     collection = MongoDB.get_collection(COLLECTION_NAME)
     exercises = []
     
-    # Xây dựng query filter cho doctor_id
-    filter_query = {"assigned_by": doctor_id}
-    if ObjectId.is_valid(doctor_id):
-        filter_query = {"$or": [{"assigned_by": doctor_id}, {"assigned_by": ObjectId(doctor_id)}]}
+    filter_query = id_filter("assigned_by", doctor_id)
 
     print(f"DEBUG EXERCISE: Get doctor exercises filter: {filter_query}")
     cursor = collection.find(filter_query).sort("assigned_date", DESCENDING)
@@ -212,39 +195,47 @@ async def get_doctor_assigned_exercises(doctor_id: str) -> List[Exercise]:
     
     return exercises
 
-async def update_exercise_status(exercise_id: str, status: str) -> Exercise:
-    """Update the status of an exercise (handles string/ObjectId ID)"""
+async def get_doctor_exercise_ids(doctor_id: str, patient_id: Optional[str] = None) -> List[Any]:
+    """Get the IDs of the exercises assigned by a doctor, optionally only to one patient (only the IDs are fetched)"""
     collection = MongoDB.get_collection(COLLECTION_NAME)
     
-    # Xây dựng query filter
-    filter_query = {"_id": exercise_id}
-    if ObjectId.is_valid(exercise_id):
-        filter_query = {"$or": [{"_id": exercise_id}, {"_id": ObjectId(exercise_id)}]}
-
-    print(f"DEBUG EXERCISE: Update status filter query: {filter_query}")
+    filter_query = id_filter("assigned_by", doctor_id)
+    if patient_id is not None:
+        filter_query.update(id_filter("assigned_to", patient_id))
+    
+    cursor = collection.find(filter_query, {"_id": 1})
+    return [exercise["_id"] async for exercise in cursor]
 
-    # Update the exercise status
+async def set_exercise_status(exercise_id: str, status_value: str, session=None) -> None:
+    """
+    Set the status of an exercise with a single write (the document is not read back)
+    
+    Args:
+        exercise_id: ID of the exercise
+        status_value: New exercise status
+        session: Optional client session, to run the write inside a transaction
+        
+    Raises:
+        HTTPException: If the exercise does not exist
+    """
+    collection = MongoDB.get_collection(COLLECTION_NAME)
+    
     result = await collection.update_one(
-        filter_query,
-        {"$set": {"status": status, "updated_at": datetime.utcnow()}}
+        id_filter("_id", exercise_id),
+        {"$set": {"status": status_value, "updated_at": datetime.utcnow()}},
+        session=session
     )
-
+    await exercise_cache.delete(str(exercise_id))
+    
     if result.matched_count == 0:
-        try:
-            await get_exercise(exercise_id)
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Exercise not found to update status"
-            )
-        except HTTPException as e:
-            if e.status_code == 404:
-                raise HTTPException(
-                    status_code=status.HTTP_404_NOT_FOUND,
-                    detail="Exercise not found to update status"
-                )
-            else: raise e
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Exercise not found to update status"
+        )
 
-    # Get the updated exercise using the corrected get_exercise function
+async def update_exercise_status(exercise_id: str, status: str) -> Exercise:
+    """Update the status of an exercise and return the updated exercise"""
+    await set_exercise_status(exercise_id, status)
     return await get_exercise(exercise_id)
 
 async def get_patients_assigned_by_doctor(doctor_id: str) -> List[User]:
@@ -252,10 +243,7 @@ async def get_patients_assigned_by_doctor(doctor_id: str) -> List[User]:
     collection = MongoDB.get_collection(COLLECTION_NAME)
     patients = []
     
-    # Build query filter for doctor_id
-    filter_query = {"assigned_by": doctor_id}
-    if ObjectId.is_valid(doctor_id):
-        filter_query = {"$or": [{"assigned_by": doctor_id}, {"assigned_by": ObjectId(doctor_id)}]}
+    filter_query = id_filter("assigned_by", doctor_id)
     
     print(f"DEBUG EXERCISE: Get doctor patients filter: {filter_query}")
     
@@ -2,14 +2,17 @@ from typing import List, Dict, Any, Optional
 from fastapi import HTTPException, status
 from ..models.prediction import Prediction, PredictionCreate, PredictionInDB, PredictionStatus, PredictionUpdate
 from ..configs.database import MongoDB
-from bson import ObjectId
+from ..configs.app_config import settings
+from ..core.ids import id_filter, ids_filter, id_lookup
 from datetime import datetime
-from .exercise_service import get_exercise, update_exercise_status
+from .exercise_service import get_exercise, set_exercise_status, get_doctor_exercise_ids
 from pymongo import DESCENDING, IndexModel, ASCENDING
+from pymongo.errors import DuplicateKeyError
 from ..ai.model_providers import ModelProvider
 from ..ai.model_service import predict_action
 
 COLLECTION_NAME = "predictions"
+EXERCISES_COLLECTION = "exercises"
 
 # Define MongoDB indexes for optimization
 INDEXES = [
@@ -55,20 +58,12 @@ async def create_prediction(
         Created Prediction object
         
     Raises:
-        HTTPException: If database operation fails
+        HTTPException: If a prediction already exists for the video (409) or database operation fails
     """
     try:
         collection = MongoDB.get_collection(COLLECTION_NAME)
         
-        # Check if a prediction already exists for this video
-        existing = await collection.find_one({"video_id": ObjectId(video_id)})
-        if existing:
-            raise HTTPException(
-                status_code=status.HTTP_409_CONFLICT,
-                detail=f"Prediction already exists for video {video_id}"
-            )
-        
-        # Get the exercise to check if prediction matches
+        # Get the exercise to check if prediction matches (usually served from the cache)
         exercise = await get_exercise(exercise_id)
         
         # Check if the predicted motion matches the exercise name
@@ -95,17 +90,27 @@ async def create_prediction(
             created_at=datetime.utcnow(),
             updated_at=datetime.utcnow()
         )
+        document = prediction_in_db.dict(by_alias=True)
+        
+        # Insert the prediction and update the exercise status: one write each.
+        # A second prediction for the same video is rejected by the unique video_id index.
+        try:
+            if settings.USE_TRANSACTIONS:
+                async with await MongoDB.client.start_session() as session:
+                    async with session.start_transaction():
+                        await collection.insert_one(document, session=session)
+                        await set_exercise_status(exercise_id, status_value.value, session=session)
+            else:
+                await collection.insert_one(document)
+                await set_exercise_status(exercise_id, status_value.value)
+        except DuplicateKeyError:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=f"Prediction already exists for video {video_id}"
+            )
         
-        # Insert into database
-        result = await collection.insert_one(prediction_in_db.dict(by_alias=True))
-        
-        # Update exercise status based on prediction
-        await update_exercise_status(exercise_id, status_value.value)
-        
-        # Get the created prediction
-        created_prediction = await collection.find_one({"_id": result.inserted_id})
-        
-        return Prediction(**created_prediction)
+        # The stored document is the one just written, no need to read it back
+        return Prediction(**document)
     except HTTPException:
         raise
     except Exception as e:
@@ -129,7 +134,7 @@ async def get_prediction(prediction_id: str) -> Prediction:
     """
     try:
         collection = MongoDB.get_collection(COLLECTION_NAME)
-        prediction = await collection.find_one({"_id": ObjectId(prediction_id)})
+        prediction = await collection.find_one(id_filter("_id", prediction_id))
         
         if not prediction:
             raise HTTPException(
@@ -161,7 +166,7 @@ async def get_video_prediction(video_id: str) -> Optional[Prediction]:
     """
     try:
         collection = MongoDB.get_collection(COLLECTION_NAME)
-        prediction = await collection.find_one({"video_id": ObjectId(video_id)})
+        prediction = await collection.find_one(id_filter("video_id", video_id))
         
         if not prediction:
             return None
@@ -204,7 +209,7 @@ async def get_exercise_predictions(
         collection = MongoDB.get_collection(COLLECTION_NAME)
         
         # Build query with filters
-        query = {"exercise_id": ObjectId(exercise_id)}
+        query = id_filter("exercise_id", exercise_id)
         
         if start_date:
             query["created_at"] = {"$gte": start_date}
@@ -258,7 +263,7 @@ async def get_patient_predictions(
         collection = MongoDB.get_collection(COLLECTION_NAME)
         
         # Build query with filters
-        query = {"patient_id": ObjectId(patient_id)}
+        query = id_filter("patient_id", patient_id)
         
         if start_date:
             query["created_at"] = {"$gte": start_date}
@@ -281,6 +286,75 @@ async def get_patient_predictions(
             detail=f"Failed to get patient predictions: {str(e)}"
         )
 
+async def get_doctor_prediction_feed(
+    doctor_id: str,
+    patient_id: Optional[str] = None,
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+    prediction_status: Optional[str] = None,
+    skip: int = 0,
+    limit: int = 20
+) -> List[Dict[str, Any]]:
+    """
+    Get the predictions for every exercise a doctor assigned, newest first, paginated across all exercises
+    
+    The doctor's exercise IDs are fetched once, then a single aggregation matches the predictions with
+    `exercise_id $in` those IDs, sorts by `created_at` (merged from the `{exercise_id, created_at}` index),
+    applies skip/limit and joins the exercise fields of the returned page only.
+    
+    Args:
+        doctor_id: The unique identifier of the doctor
+        patient_id: Only predictions of exercises assigned to this patient
+        start_date: Filter for predictions after this date
+        end_date: Filter for predictions before this date
+        prediction_status: Filter for predictions with specific status
+        skip: Number of records to skip for pagination
+        limit: Maximum number of records to return
+        
+    Returns:
+        List of prediction documents, each with an `exercise` sub-document
+        
+    Raises:
+        HTTPException: If database operation fails
+    """
+    try:
+        collection = MongoDB.get_collection(COLLECTION_NAME)
+        
+        exercise_ids = await get_doctor_exercise_ids(doctor_id, patient_id)
+        if not exercise_ids:
+            return []
+        
+        query = ids_filter("exercise_id", exercise_ids)
+        if patient_id is not None:
+            query.update(id_filter("patient_id", patient_id))
+        if start_date:
+            query["created_at"] = {"$gte": start_date}
+        if end_date:
+            query.setdefault("created_at", {}).update({"$lte": end_date})
+        if prediction_status:
+            query["status"] = prediction_status
+        
+        pipeline = [
+            {"$match": query},
+            {"$sort": {"created_at": DESCENDING}},
+            {"$skip": skip},
+            {"$limit": limit},
+            *id_lookup(EXERCISES_COLLECTION, "exercise_id", "_id", "exercise"),
+            {"$unwind": {"path": "$exercise", "preserveNullAndEmptyArrays": True}},
+            {"$project": {
+                "patient_id": 1, "exercise_id": 1, "predicted_motion": 1, "confidence_score": 1, "is_match": 1,
+                "status": 1, "created_at": 1,
+                "exercise._id": 1, "exercise.name": 1, "exercise.description": 1, "exercise.status": 1,
+                "exercise.assigned_date": 1
+            }}
+        ]
+        return [prediction async for prediction in collection.aggregate(pipeline)]
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to get doctor predictions: {str(e)}"
+        )
+
 async def update_prediction_feedback(
     prediction_id: str,
     feedback: str,
@@ -316,7 +390,7 @@ async def update_prediction_feedback(
         }
         
         result = await collection.update_one(
-            {"_id": ObjectId(prediction_id)},
+            id_filter("_id", prediction_id),
             update_data
         )
         
@@ -383,6 +457,8 @@ async def analyze_video(
         )
         
         return prediction
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
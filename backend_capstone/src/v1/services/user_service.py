@@ -2,7 +2,8 @@ from typing import List, Optional
 from fastapi import HTTPException, status
 from ..models.user import User, UserCreate, UserInDB, UserUpdate
 from ..configs.database import MongoDB
-from bson import ObjectId
+from ..core.ids import id_filter
+from ..core.cache import get_cache
 from datetime import datetime
 import hashlib
 from pymongo import IndexModel, ASCENDING, TEXT
@@ -16,6 +17,9 @@ INDEXES = [
     IndexModel([("created_at", ASCENDING)], background=True)
 ]
 
+# Read-through cache of get_user, invalidated by update_user / delete_user
+user_cache = get_cache(COLLECTION_NAME, User.model_validate_json)
+
 async def get_password_hash(password: str) -> str:
     """Generate a hashed password"""
     return hashlib.sha256(password.encode()).hexdigest()
@@ -53,34 +57,22 @@ async def create_user(user: UserCreate) -> User:
     return User(**created_user)
 
 async def get_user(user_id: str):
-    """Get a user by ID (handles both string and ObjectId formats)"""
-    collection = MongoDB.get_collection(COLLECTION_NAME)
+    """Get a user by ID (cached, single exact-match lookup on a miss, see core/ids.py)"""
+    cached = await user_cache.get(str(user_id))
+    if cached is not None:
+        return cached.model_copy()
     
-    # 1. Ưu tiên tìm kiếm bằng ID string nguyên gốc
-    print(f"DEBUG: Searching with string ID: '{user_id}'")
-    user = await collection.find_one({"_id": user_id})
-    if user:
-        print("DEBUG: Found user by string ID")
-        return User(**user)
+    collection = MongoDB.get_collection(COLLECTION_NAME)
+    user = await collection.find_one(id_filter("_id", user_id))
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="User not found"
+        )
     
-    # 2. Nếu không tìm thấy bằng string và ID hợp lệ, thử tìm bằng ObjectId
-    if ObjectId.is_valid(user_id):
-        print(f"DEBUG: String ID not found, trying ObjectId: {user_id}")
-        try:
-            obj_id = ObjectId(user_id)
-            user = await collection.find_one({"_id": obj_id})
-            if user:
-                print("DEBUG: Found user by ObjectId")
-                return User(**user)
-        except Exception as e:
-            print(f"DEBUG: Error converting to ObjectId or searching: {str(e)}")
-
-    # 3. Nếu vẫn không tìm thấy, báo lỗi
-    print(f"DEBUG: User not found with ID: {user_id} (tried string and ObjectId)")
-    raise HTTPException(
-        status_code=status.HTTP_404_NOT_FOUND,
-        detail="User not found"
-    )
+    user = User(**user)
+    await user_cache.set(str(user_id), user)
+    return user.model_copy()
 
 async def get_user_by_email(email: str) -> UserInDB:
     """Get a user by email (including password hash)"""
@@ -96,7 +88,7 @@ async def get_user_by_email(email: str) -> UserInDB:
     return UserInDB(**user)
 
 async def update_user(user_id: str, user_update: UserUpdate) -> User:
-    """Update a user (handles both string and ObjectId IDs)"""
+    """Update a user"""
     collection = MongoDB.get_collection(COLLECTION_NAME)
     
     # Remove None values
@@ -109,15 +101,13 @@ async def update_user(user_id: str, user_update: UserUpdate) -> User:
     # Add updated_at timestamp
     update_data["updated_at"] = datetime.utcnow()
     
-    # Xây dựng query để tìm kiếm cả string và ObjectId
-    filter_query = {"_id": user_id}
-    if ObjectId.is_valid(user_id):
-        filter_query = {"$or": [{"_id": user_id}, {"_id": ObjectId(user_id)}]}
+    filter_query = id_filter("_id", user_id)
 
     print(f"DEBUG: Update filter query: {filter_query}")
     
     # Update the user
     result = await collection.update_one(filter_query, {"$set": update_data})
+    await user_cache.delete(str(user_id))
     
     if result.matched_count == 0:
          raise HTTPException(
@@ -129,18 +119,16 @@ async def update_user(user_id: str, user_update: UserUpdate) -> User:
     return await get_user(user_id)
 
 async def delete_user(user_id: str) -> None:
-    """Delete a user by ID (handles both string and ObjectId IDs)"""
+    """Delete a user by ID"""
     collection = MongoDB.get_collection(COLLECTION_NAME)
     
-    # Xây dựng query để tìm kiếm cả string và ObjectId
-    filter_query = {"_id": user_id}
-    if ObjectId.is_valid(user_id):
-        filter_query = {"$or": [{"_id": user_id}, {"_id": ObjectId(user_id)}]}
+    filter_query = id_filter("_id", user_id)
 
     print(f"DEBUG: Delete filter query: {filter_query}")
     
     # Delete the user
     result = await collection.delete_one(filter_query)
+    await user_cache.delete(str(user_id))
     
     if result.deleted_count == 0:
         raise HTTPException(
@@ -167,10 +155,8 @@ async def authenticate_user(email: str, password: str) -> User:
             detail="Invalid credentials"
         )
     
-    # Trả về User model (không có password)
-    # Cần truy vấn lại bằng ID để lấy đúng kiểu User model
-    # Vì user_db có thể có ID dạng string hoặc ObjectId
-    return await get_user(user_db.id) # Sử dụng get_user đã sửa
+    # Trả về User model (không có password), dựng từ document đã đọc thay vì truy vấn lại
+    return User(**user_db.dict(by_alias=True, exclude={"hashed_password"}))
 
 async def ensure_indexes():
     """
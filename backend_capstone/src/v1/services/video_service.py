@@ -1,21 +1,41 @@
 import logging
-from typing import List, Optional
+from typing import List, Optional, Dict, Any
 from fastapi import HTTPException, status, UploadFile
 from ..models.video import Video, VideoCreate, VideoInDB, VideoUpdate
 from ..configs.database import MongoDB
 from ..configs.app_config import settings
 from ..configs.exceptions import VideoProcessingError, ResourceNotFoundError, DatabaseOperationError
+from ..core.ids import id_filter, id_lookup
 from bson import ObjectId
 from datetime import datetime
 import os
 import uuid
 import shutil
 import aiofiles
-from pymongo import DESCENDING
+from pymongo import DESCENDING, IndexModel, ASCENDING
 
 logger = logging.getLogger(__name__)
 
 COLLECTION_NAME = "videos"
+PREDICTIONS_COLLECTION = "predictions"
+
+# Define MongoDB indexes for optimization
+INDEXES = [
+    IndexModel([("patient_id", ASCENDING), ("upload_date", DESCENDING)], background=True),
+    IndexModel([("exercise_id", ASCENDING), ("upload_date", DESCENDING)], background=True)
+]
+
+# Fields returned by the video list endpoints (everything else, e.g. raw_results, stays on the server)
+VIDEO_LIST_FIELDS = ["patient_id", "exercise_id", "file_name", "file_path", "file_size", "content_type", "upload_date", "status"]
+PREDICTION_LIST_FIELDS = ["predicted_motion", "confidence_score", "is_match", "status", "created_at"]
+
+async def ensure_indexes():
+    """
+    Ensure all required indexes exist in the MongoDB collection
+    This function should be called during application startup
+    """
+    collection = MongoDB.get_collection(COLLECTION_NAME)
+    await collection.create_indexes(INDEXES)
 
 async def save_video_file(video_file: UploadFile, patient_id: str) -> str:
     """Save an uploaded video file to disk and return the file path"""
@@ -97,7 +117,7 @@ async def get_video(video_id: str) -> Video:
         if not ObjectId.is_valid(video_id):
             raise ResourceNotFoundError(f"Invalid video ID format: {video_id}")
             
-        video = await collection.find_one({"_id": ObjectId(video_id)})
+        video = await collection.find_one(id_filter("_id", video_id))
         
         if not video:
             logger.warning(f"Video not found: {video_id}")
@@ -121,20 +141,20 @@ async def update_video_status(video_id: str, new_status: str) -> Video:
             
         # Update the video
         result = await collection.update_one(
-            {"_id": ObjectId(video_id)},
+            id_filter("_id", video_id),
             {"$set": {"status": new_status, "updated_at": datetime.utcnow()}}
         )
         
         if result.modified_count == 0:
             # Check if record exists but wasn't modified
-            video = await collection.find_one({"_id": ObjectId(video_id)})
+            video = await collection.find_one(id_filter("_id", video_id))
             if not video:
                 logger.warning(f"Video not found for status update: {video_id}")
                 raise ResourceNotFoundError(f"Video not found: {video_id}")
             # If we got here, the video exists but wasn't modified (e.g., same status)
         
         # Get the updated video
-        updated_video = await collection.find_one({"_id": ObjectId(video_id)})
+        updated_video = await collection.find_one(id_filter("_id", video_id))
         if not updated_video:
             raise DatabaseOperationError("Failed to retrieve updated video record")
         
@@ -155,7 +175,7 @@ async def delete_video(video_id: str) -> None:
             raise ResourceNotFoundError(f"Invalid video ID format: {video_id}")
             
         # Check if video exists
-        video = await collection.find_one({"_id": ObjectId(video_id)})
+        video = await collection.find_one(id_filter("_id", video_id))
         if not video:
             logger.warning(f"Video not found for deletion: {video_id}")
             raise ResourceNotFoundError(f"Video not found: {video_id}")
@@ -164,7 +184,7 @@ async def delete_video(video_id: str) -> None:
         file_path = video["file_path"]
         
         # Delete the video record
-        result = await collection.delete_one({"_id": ObjectId(video_id)})
+        result = await collection.delete_one(id_filter("_id", video_id))
         if result.deleted_count == 0:
             raise DatabaseOperationError(f"Failed to delete video record: {video_id}")
         
@@ -196,7 +216,7 @@ async def get_patient_videos(patient_id: str) -> List[Video]:
             logger.warning(f"Invalid patient ID format for video query: {patient_id}")
             return []  # Return empty list for invalid IDs
             
-        cursor = collection.find({"patient_id": ObjectId(patient_id)}).sort("upload_date", DESCENDING)
+        cursor = collection.find(id_filter("patient_id", patient_id)).sort("upload_date", DESCENDING)
         
         async for video in cursor:
             videos.append(Video(**video))
@@ -217,7 +237,7 @@ async def get_exercise_videos(exercise_id: str) -> List[Video]:
             logger.warning(f"Invalid exercise ID format for video query: {exercise_id}")
             return []  # Return empty list for invalid IDs
             
-        cursor = collection.find({"exercise_id": ObjectId(exercise_id)}).sort("upload_date", DESCENDING)
+        cursor = collection.find(id_filter("exercise_id", exercise_id)).sort("upload_date", DESCENDING)
         
         async for video in cursor:
             videos.append(Video(**video))
@@ -226,4 +246,76 @@ async def get_exercise_videos(exercise_id: str) -> List[Video]:
         return videos
     except Exception as e:
         logger.error(f"Error retrieving videos for exercise {exercise_id}: {str(e)}")
-        raise DatabaseOperationError(f"Failed to retrieve exercise videos: {str(e)}") 
\ No newline at end of file
+        raise DatabaseOperationError(f"Failed to retrieve exercise videos: {str(e)}") 
+
+async def get_videos_with_predictions(
+    patient_id: Optional[str] = None,
+    exercise_id: Optional[str] = None,
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+    prediction_status: Optional[str] = None,
+    video_fields: List[str] = VIDEO_LIST_FIELDS,
+    prediction_fields: List[str] = PREDICTION_LIST_FIELDS,
+    skip: int = 0,
+    limit: int = 20
+) -> List[Dict[str, Any]]:
+    """
+    Get videos joined with their prediction in a single aggregation, newest first
+
+    Args:
+        patient_id: Only videos uploaded by this patient
+        exercise_id: Only videos for this exercise
+        start_date: Filter for videos uploaded after this date
+        end_date: Filter for videos uploaded before this date
+        prediction_status: Only videos whose prediction has this status
+        video_fields: Video fields to return (besides _id)
+        prediction_fields: Prediction fields to return (besides _id)
+        skip: Number of records to skip for pagination
+        limit: Maximum number of records to return
+
+    Returns:
+        List of video documents with a `prediction` sub-document (absent when the video has no prediction)
+
+    Raises:
+        DatabaseOperationError: If the aggregation fails
+    """
+    collection = MongoDB.get_collection(COLLECTION_NAME)
+    query: Dict[str, Any] = {}
+
+    for field, value in (("patient_id", patient_id), ("exercise_id", exercise_id)):
+        if value is None:
+            continue
+        if not ObjectId.is_valid(value):
+            logger.warning(f"Invalid {field} format for video query: {value}")
+            return []
+        query.update(id_filter(field, value))
+    if start_date:
+        query["upload_date"] = {"$gte": start_date}
+    if end_date:
+        query.setdefault("upload_date", {}).update({"$lte": end_date})
+
+    page = [{"$skip": skip}, {"$limit": limit}]
+    join = [
+        *id_lookup(PREDICTIONS_COLLECTION, "_id", "video_id", "prediction"),
+        # video_id is unique on predictions, so there is at most one match
+        {"$unwind": {"path": "$prediction", "preserveNullAndEmptyArrays": True}},
+    ]
+    projection = {field: 1 for field in video_fields}
+    projection.update({f"prediction.{field}": 1 for field in ["_id"] + prediction_fields})
+
+    pipeline = [{"$match": query}, {"$sort": {"upload_date": DESCENDING}}]
+    if prediction_status:
+        # The filter needs the joined prediction, so paginate after the join
+        pipeline += join + [{"$match": {"prediction.status": prediction_status}}] + page
+    else:
+        # Otherwise only join the requested page
+        pipeline += page + join
+    pipeline.append({"$project": projection})
+
+    try:
+        videos = [video async for video in collection.aggregate(pipeline)]
+        logger.debug(f"Retrieved {len(videos)} videos with predictions (patient={patient_id}, exercise={exercise_id})")
+        return videos
+    except Exception as e:
+        logger.error(f"Error retrieving videos with predictions: {str(e)}")
+        raise DatabaseOperationError(f"Failed to retrieve videos: {str(e)}")
@@ -0,0 +1,176 @@
+#!/usr/bin/env python
+"""
+Database round-trip tests of the prediction write path and the doctor prediction feed
+The services run against the in-memory MongoDB stand-in (benchmark/memory_mongo.py), which counts
+every call that would be a server round trip. Each test checks that the current code needs fewer
+trips than the query sequence it replaced, and stays within the write-path budget.
+
+    python -m pytest test_round_trips.py
+    python test_round_trips.py
+"""
+import os
+import sys
+import asyncio
+from datetime import datetime, timedelta
+
+# Add the current directory to the path
+sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
+
+from bson import ObjectId
+from fastapi import HTTPException
+from src.v1.configs.database import MongoDB
+from src.v1.core.ids import id_filter
+from src.v1.models.exercise import ExerciseInDB
+from src.v1.models.prediction import Prediction, PredictionInDB, PredictionStatus
+from src.v1.services import prediction_service
+from src.v1.services.exercise_service import (
+    get_exercise, update_exercise_status, get_doctor_assigned_exercises, exercise_cache
+)
+from benchmark.memory_mongo import MemoryDatabase
+from benchmark.write_path import BUDGET
+
+MOTION = "Sodatvuonlen"
+
+def new_id() -> str:
+    return str(ObjectId())
+
+async def setup_database(num_exercises=1, predictions_per_exercise=0, object_id_exercises=False):
+    """Fresh in-memory database with one doctor's exercises (and predictions); returns (db, doctor_id, exercise_ids)"""
+    db = MemoryDatabase()
+    MongoDB.db = db
+    await prediction_service.ensure_indexes()
+
+    doctor_id, patient_id = new_id(), new_id()
+    exercise_ids = []
+    created_at = datetime.utcnow()
+    for i in range(num_exercises):
+        exercise = ExerciseInDB(name=MOTION, description=f"Exercise {i}", assigned_by=doctor_id, assigned_to=patient_id)
+        document = exercise.dict(by_alias=True)
+        if object_id_exercises:
+            # Stored by an older version, before IDs were strings
+            document["_id"] = ObjectId(exercise.id)
+        await db["exercises"].insert_one(document)
+        exercise_ids.append(exercise.id)
+
+        for j in range(predictions_per_exercise):
+            prediction = PredictionInDB(
+                video_id=new_id(), exercise_id=exercise.id, patient_id=patient_id, predicted_motion=MOTION,
+                confidence_score=0.9, model_name="test", is_match=True,
+                created_at=created_at - timedelta(minutes=i * predictions_per_exercise + j)
+            )
+            await db["predictions"].insert_one(prediction.dict(by_alias=True))
+    return db, doctor_id, exercise_ids
+
+async def count_round_trips(db, awaitable):
+    """Run `awaitable` and return (round trips, result)"""
+    db.reset_counters()
+    result = await awaitable
+    return db.round_trips, result
+
+async def legacy_create_prediction(video_id, exercise_id, patient_id):
+    """
+    The write path before it was collapsed: duplicate pre-check, exercise read, insert,
+    status update followed by an exercise read, and a re-read of the inserted prediction
+    """
+    collection = MongoDB.get_collection(prediction_service.COLLECTION_NAME)
+    if await collection.find_one(id_filter("video_id", video_id)):
+        raise HTTPException(status_code=409, detail=f"Prediction already exists for video {video_id}")
+
+    exercise = await get_exercise(exercise_id)
+    is_match = MOTION.lower() == exercise.name.lower()
+    status_value = PredictionStatus.COMPLETED if is_match else PredictionStatus.NOT_COMPLETED
+    prediction_in_db = PredictionInDB(
+        video_id=video_id, exercise_id=exercise_id, patient_id=patient_id, predicted_motion=MOTION,
+        confidence_score=0.9, model_name="test", is_match=is_match, status=status_value
+    )
+    result = await collection.insert_one(prediction_in_db.dict(by_alias=True))
+    await update_exercise_status(exercise_id, status_value.value)
+    return Prediction(**await collection.find_one({"_id": result.inserted_id}))
+
+def create_prediction(video_id, exercise_id, patient_id):
+    return prediction_service.create_prediction(
+        video_id=video_id, exercise_id=exercise_id, patient_id=patient_id,
+        predicted_motion=MOTION, confidence_score=0.9, model_name="test"
+    )
+
+async def legacy_doctor_feed(doctor_id, limit):
+    """The doctor feed before it was one query: the doctor's exercises, then one query per exercise"""
+    predictions = []
+    for exercise in await get_doctor_assigned_exercises(doctor_id):
+        predictions += await prediction_service.get_exercise_predictions(str(exercise.id), limit=limit)
+    return predictions
+
+def test_create_prediction_round_trips():
+    """create_prediction needs fewer round trips than the old path, with and without the exercise cached"""
+    async def run():
+        db, _, (exercise_id,) = await setup_database()
+        patient_id = new_id()
+        for scenario in ("cold", "warm"):
+            trips = {}
+            for name, create in (("legacy", legacy_create_prediction), ("current", create_prediction)):
+                if scenario == "cold":
+                    await exercise_cache.delete(exercise_id)
+                else:
+                    await get_exercise(exercise_id)  # /predict validates the exercise first
+                video_id = new_id()
+                trips[name], prediction = await count_round_trips(db, create(video_id, exercise_id, patient_id))
+
+                # The returned prediction is the stored document
+                stored = await db["predictions"].find_one({"_id": prediction.id})
+                assert Prediction(**stored) == prediction
+                assert (await db["exercises"].find_one({"_id": exercise_id}))["status"] == PredictionStatus.COMPLETED.value
+
+            print(f"create_prediction ({scenario}): {trips['legacy']} -> {trips['current']} round trips")
+            assert trips["current"] < trips["legacy"]
+            assert trips["current"] <= BUDGET[scenario]
+    asyncio.run(run())
+
+def test_duplicate_prediction_is_rejected():
+    """A second prediction for the same video is rejected by the unique index with 409, in one round trip"""
+    async def run():
+        db, _, (exercise_id,) = await setup_database()
+        video_id, patient_id = new_id(), new_id()
+        await create_prediction(video_id, exercise_id, patient_id)
+
+        await get_exercise(exercise_id)
+        db.reset_counters()
+        try:
+            await create_prediction(video_id, exercise_id, patient_id)
+            raise AssertionError("Duplicate prediction was not rejected")
+        except HTTPException as e:
+            assert e.status_code == 409
+        assert db.round_trips <= BUDGET["duplicate"]
+        assert await db["predictions"].count_documents(id_filter("video_id", video_id)) == 1
+    asyncio.run(run())
+
+def test_doctor_feed_round_trips():
+    """The doctor feed is two round trips however many exercises the doctor assigned"""
+    async def run():
+        db, doctor_id, _ = await setup_database(num_exercises=5, predictions_per_exercise=3)
+        legacy_trips, legacy = await count_round_trips(db, legacy_doctor_feed(doctor_id, limit=20))
+        trips, feed = await count_round_trips(db, prediction_service.get_doctor_prediction_feed(doctor_id, limit=20))
+
+        print(f"get_doctor_prediction_feed: {legacy_trips} -> {trips} round trips")
+        assert trips == 2
+        assert trips < legacy_trips
+        assert {prediction["_id"] for prediction in feed} == {str(prediction.id) for prediction in legacy}
+        assert all(prediction["exercise"]["name"] == MOTION for prediction in feed)
+        created = [prediction["created_at"] for prediction in feed]
+        assert created == sorted(created, reverse=True)
+    asyncio.run(run())
+
+def test_doctor_feed_joins_object_id_exercises():
+    """Exercises still stored under an ObjectId are joined while LEGACY_OBJECT_ID_LOOKUP is on"""
+    async def run():
+        _, doctor_id, _ = await setup_database(num_exercises=2, predictions_per_exercise=2, object_id_exercises=True)
+        feed = await prediction_service.get_doctor_prediction_feed(doctor_id, limit=20)
+        assert len(feed) == 4
+        assert all(prediction.get("exercise", {}).get("name") == MOTION for prediction in feed)
+    asyncio.run(run())
+
+if __name__ == "__main__":
+    test_create_prediction_round_trips()
+    test_duplicate_prediction_is_rejected()
+    test_doctor_feed_round_trips()
+    test_doctor_feed_joins_object_id_exercises()
+    print("All round-trip tests passed.")